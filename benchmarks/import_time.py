@@ -0,0 +1,97 @@
+"""
+Contrôle du temps d'import des chemins de calcul (lecteurs, GroundTruth, CLI).
+
+Chaque module est importé dans un interpréteur neuf (`python -X importtime`).
+Le contrôle échoue si un module dépasse son budget de temps d'import, ou s'il
+charge une bibliothèque de visualisation ou d'analyse (matplotlib, pandas,
+geopandas, pyarrow) dont les calculs n'ont pas besoin. Le même contrôle est
+exécuté par la suite de tests (`tests/test_import_time.py`).
+
+Usage (depuis la racine du dépôt) :
+    python -m benchmarks.import_time
+    python -m benchmarks.import_time --budget 0.5 --repeat 5
+"""
+import argparse
+import subprocess
+import sys
+
+# Modules dont l'import doit rester léger
+MODULES = (
+    "src.sat_image_reader",
+    "src.classes_reader",
+    "src.ground_truth",
+    "src.prefetch",
+    "src.zonal_stats",
+)
+# Bibliothèques à ne charger qu'à la demande (affichage, CSV, Parquet)
+FORBIDDEN = ("matplotlib", "pandas", "geopandas", "pyarrow")
+
+
+def import_profile(module):
+    """
+    Importe un module dans un interpréteur neuf.
+
+    Args:
+        module (str): Nom du module.
+
+    Returns:
+        float: Temps d'import cumulé du module (secondes).
+        set[str]: Paquets de premier niveau chargés pendant l'import.
+    """
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    seconds = 0.0
+    loaded = set()
+    # Lignes "import time: <propre> | <cumulé> | <module>", en microsecondes
+    for line in completed.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        loaded.add(name.strip().split(".")[0])
+        if name.strip() == module:
+            seconds = int(cumulative) / 1e6
+    return seconds, loaded
+
+
+def check(budget, repeat):
+    """
+    Mesure chaque module (meilleur temps sur `repeat` imports) et liste les dépassements.
+
+    Args:
+        budget (float): Temps d'import maximal par module (secondes).
+        repeat (int): Nombre d'imports par module.
+
+    Returns:
+        list[str]: Description de chaque dépassement (vide si tout est dans le budget).
+    """
+    failures = []
+    for module in MODULES:
+        measures = [import_profile(module) for _ in range(repeat)]
+        seconds = min(seconds for seconds, _ in measures)
+        heavy = sorted(set(FORBIDDEN) & measures[0][1])
+        print(f"{module:<24} {seconds * 1000:8.1f} ms  {', '.join(heavy)}")
+        if seconds > budget:
+            failures.append(f"{module} : {seconds:.3f} s > {budget:.3f} s")
+        if heavy:
+            failures.append(f"{module} importe {', '.join(heavy)}")
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--budget", type=float, default=0.5, help="Temps d'import maximal par module (secondes)")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    failures = check(args.budget, args.repeat)
+    for failure in failures:
+        print(f"DÉPASSEMENT {failure}")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,416 @@
+"""
+Banc de mesure des chemins critiques des lecteurs et de GroundTruth.
+
+Écrit des GeoTIFF synthétiques, exécute chaque méthode publique dans un
+processus neuf et mesure le temps, le pic de mémoire (RSS) et les octets lus.
+Le rapport JSON peut être comparé à une référence pour signaler les régressions.
+
+Usage (depuis la racine du dépôt) :
+    python -m benchmarks.run_benchmarks --output bench_report.json
+    python -m benchmarks.run_benchmarks --baseline bench_baseline.json --output bench_report.json
+"""
+import argparse
+import json
+import os
+import platform
+import resource
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from benchmarks.synthetic import write_image, write_label_folder, write_labels
+
+# Configurations des fichiers synthétiques : "quick" pour un passage rapide, "full" pour tout
+IMAGE_CONFIGS = {
+    "quick": [
+        {"size": 1024, "count": 4, "dtype": "uint16", "tiled": True, "compress": None},
+        {"size": 1024, "count": 4, "dtype": "uint16", "tiled": False, "compress": "deflate"},
+    ],
+    "full": [
+        {"size": size, "count": count, "dtype": dtype, "tiled": tiled, "compress": compress}
+        for size in (1024, 4096)
+        for count in (4, 8)
+        for dtype in ("uint8", "uint16", "float32")
+        for tiled in (True, False)
+        for compress in (None, "deflate")
+    ],
+}
+LABEL_CONFIGS = {
+    "quick": [
+        {"size": 1024, "density": "dense", "encoding": "onehot"},
+        {"size": 1024, "density": "sparse", "encoding": "onehot"},
+        {"size": 1024, "density": "dense", "encoding": "index"},
+    ],
+    "full": [
+        {"size": size, "density": density, "encoding": encoding}
+        for size in (1024, 4096)
+        for density in ("dense", "sparse")
+        for encoding in ("onehot", "index")
+    ],
+}
+FOLDER_CONFIGS = {
+    "quick": [{"n_dates": 5, "size": 512, "density": "dense", "encoding": "onehot"}],
+    "full": [
+        {"n_dates": 20, "size": size, "density": density, "encoding": "onehot"}
+        for size in (512, 2048)
+        for density in ("dense", "sparse")
+    ],
+}
+
+
+# --- Cas mesurés (fonctions de module pour être exécutées dans un processus neuf) ---
+
+def sat_show_band(path):
+    from src.sat_image_reader import SatImageReader
+    SatImageReader(path).show_band(1)
+
+
+def sat_show_band_preview(path):
+    from src.sat_image_reader import SatImageReader
+    SatImageReader(path).show_band(1, target_size=512)
+
+
+def sat_show_rgb(path):
+    from src.sat_image_reader import SatImageReader
+    SatImageReader(path).show_rgb()
+
+
+def sat_show_rgb_streaming(path):
+    from src.sat_image_reader import SatImageReader
+    SatImageReader(path, streaming=True).show_rgb()
+
+
+def sat_show_band_hist(path):
+    from src.sat_image_reader import SatImageReader
+    SatImageReader(path).show_band_hist(1)
+
+
+def sat_show_rgb_hist(path):
+    from src.sat_image_reader import SatImageReader
+    SatImageReader(path).show_rgb_hist()
+
+
+def sat_show_metadata(path):
+    from src.sat_image_reader import SatImageReader
+    SatImageReader(path).show_metadata()
+
+
+def sat_calculate_ndvi(path):
+    from src.sat_image_reader import SatImageReader
+    SatImageReader(path).calculate_ndvi()
+
+
+def sat_show_ndvi(path):
+    from src.sat_image_reader import SatImageReader
+    SatImageReader(path).show_ndvi()
+
+
+def sat_write_ndvi(path):
+    from src.sat_image_reader import SatImageReader
+    SatImageReader(path).write_ndvi(path + ".ndvi.tif")
+
+
+def sat_calculate_indices(path):
+    from src.sat_image_reader import SatImageReader
+    SatImageReader(path).calculate_indices(("ndvi", "ndwi", "savi", "evi"), reflectance_scale=1e-4)
+
+
+def classes_detect_classes(path):
+    from src.classes_reader import ClassesReader
+    ClassesReader(path).detect_classes(use_index=False)
+
+
+def classes_show_band(path):
+    from src.classes_reader import ClassesReader
+    from src.rendering import Renderer
+    with Renderer() as renderer:
+        ClassesReader(path).show_band(1, ax=renderer.axes())
+
+
+def classes_show_class(path):
+    from src.classes_reader import ClassesReader
+    from src.rendering import Renderer
+    with Renderer() as renderer:
+        ClassesReader(path).show_class(2, ax=renderer.axes())
+
+
+def classes_show_class_list(path):
+    from src.classes_reader import ClassesReader
+    ClassesReader(path).show_class_list()
+
+
+def classes_read_class_index(path):
+    from src.classes_reader import ClassesReader
+    ClassesReader(path).read_class_index()
+
+
+def classes_class_pixel_counts(path):
+    from src.classes_reader import ClassesReader
+    ClassesReader(path).class_pixel_counts(write=False)
+
+
+def gt_mask_evolution(path):
+    from src.ground_truth import GroundTruth
+    GroundTruth().mask_evolution(path)
+
+
+def gt_batch_mask_evolution(path):
+    from src.ground_truth import GroundTruth
+    GroundTruth().batch_mask_evolution([path], max_workers=2)
+
+
+def _folder_evolution(path):
+    """Matrice d'évolution synthétique et dates d'un dossier (hors mesure du calcul des masques)."""
+    import numpy as np
+    from src.catalog import extract_date, list_tif_files
+    dates = [extract_date(tif_path) for tif_path in list_tif_files(path)]
+    return np.random.default_rng(0).random((len(dates), 7)) * 100, dates
+
+
+def gt_store_mask_evol(path):
+    from src.evolution_store import EvolutionStore
+    from src.ground_truth import GroundTruth
+    evol_matrix, dates = _folder_evolution(path)
+    with tempfile.TemporaryDirectory() as output_dir:
+        GroundTruth().store_mask_evol(evol_matrix, dates, "aoi", EvolutionStore(output_dir))
+
+
+def gt_store_mask_evol_csv(path):
+    from src.ground_truth import GroundTruth
+    evol_matrix, dates = _folder_evolution(path)
+    with tempfile.TemporaryDirectory() as output_dir:
+        GroundTruth().store_mask_evol(evol_matrix, dates, os.path.join(output_dir, "aoi"))
+
+
+def gt_show_mask_evol(path):
+    from src.ground_truth import GroundTruth
+    from src.rendering import Renderer
+    evol_matrix, dates = _folder_evolution(path)
+    with tempfile.TemporaryDirectory() as output_dir, Renderer() as renderer:
+        GroundTruth().show_mask_evol(evol_matrix, dates, os.path.join(output_dir, "aoi"), renderer)
+
+
+# Cas par type de fichier synthétique
+CASES = {
+    "image": [
+        sat_show_band,
+        sat_show_band_preview,
+        sat_show_rgb,
+        sat_show_rgb_streaming,
+        sat_show_band_hist,
+        sat_show_rgb_hist,
+        sat_show_metadata,
+        sat_calculate_ndvi,
+        sat_show_ndvi,
+        sat_write_ndvi,
+        sat_calculate_indices,
+    ],
+    "labels": [
+        classes_detect_classes,
+        classes_show_band,
+        classes_show_class,
+        classes_show_class_list,
+        classes_read_class_index,
+        classes_class_pixel_counts,
+    ],
+    "folder": [
+        gt_mask_evolution,
+        gt_batch_mask_evolution,
+        gt_store_mask_evol,
+        gt_store_mask_evol_csv,
+        gt_show_mask_evol,
+    ],
+}
+
+
+def _bytes_read():
+    """Octets lus par le processus (Linux : /proc/self/io), ou None si indisponible."""
+    try:
+        with open("/proc/self/io") as f:
+            for line in f:
+                if line.startswith("rchar:"):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return None
+
+
+def _max_rss_mb():
+    """Pic de mémoire résidente du processus, en Mo."""
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss est en octets sous macOS, en kilo-octets sous Linux
+    return max_rss / 1e6 if sys.platform == "darwin" else max_rss / 1024
+
+
+def measure(func, path):
+    """
+    Exécute un cas et mesure temps, mémoire et octets lus (dans le processus courant).
+
+    Args:
+        func (callable): Cas à exécuter.
+        path (str): Fichier ou dossier synthétique.
+
+    Returns:
+        dict: "wall_s", "peak_rss_mb", "rss_delta_mb" et "bytes_read".
+    """
+    import matplotlib
+
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+    import pandas  # noqa: F401  (imports hors mesure)
+    import src.classes_reader  # noqa: F401
+    import src.evolution_store  # noqa: F401
+    import src.ground_truth  # noqa: F401
+    import src.rendering  # noqa: F401
+    import src.sat_image_reader  # noqa: F401
+
+    rss_before = _max_rss_mb()
+    read_before = _bytes_read()
+    start = time.perf_counter()
+    func(path)
+    wall = time.perf_counter() - start
+    read_after = _bytes_read()
+    plt.close("all")
+    peak = _max_rss_mb()
+    return {
+        "wall_s": wall,
+        "peak_rss_mb": peak,
+        "rss_delta_mb": peak - rss_before,
+        "bytes_read": read_after - read_before if read_before is not None else None,
+    }
+
+
+def make_fixtures(workdir, profile):
+    """
+    Écrit les fichiers synthétiques d'un profil.
+
+    Args:
+        workdir (str): Dossier de travail.
+        profile (str): "quick" ou "full".
+
+    Returns:
+        list[tuple]: (type, identifiant de configuration, chemin).
+    """
+    fixtures = []
+    for i, config in enumerate(IMAGE_CONFIGS[profile]):
+        config_id = "image-{size}x{count}-{dtype}-{tiled}-{compress}".format(**config)
+        path = os.path.join(workdir, f"image_{i}.tif")
+        write_image(path, seed=i, **config)
+        fixtures.append(("image", config_id, path))
+    for i, config in enumerate(LABEL_CONFIGS[profile]):
+        config_id = "labels-{size}-{density}-{encoding}".format(**config)
+        path = os.path.join(workdir, f"labels_{i}.tif")
+        write_labels(path, seed=i, **config)
+        fixtures.append(("labels", config_id, path))
+    for i, config in enumerate(FOLDER_CONFIGS[profile]):
+        config_id = "folder-{n_dates}x{size}-{density}-{encoding}".format(**config)
+        path = os.path.join(workdir, f"folder_{i}")
+        write_label_folder(path, **config)
+        fixtures.append(("folder", config_id, path))
+    return fixtures
+
+
+def compare(results, baseline, tolerance, min_seconds=0.01):
+    """
+    Signale les régressions par rapport à une référence.
+
+    Un cas régresse si son temps (au-delà de `min_seconds`) ou son pic de
+    mémoire dépasse la référence de plus de `tolerance` (fraction).
+
+    Args:
+        results (dict): Mesures courantes, par identifiant de cas.
+        baseline (dict): Mesures de référence, par identifiant de cas.
+        tolerance (float): Tolérance relative (ex. 0.2 pour 20 %).
+        min_seconds (float, optional): Écart de temps absolu ignoré. Par défaut : 0.01.
+
+    Returns:
+        list[dict]: Régressions ("case", "metric", "baseline", "current", "ratio").
+    """
+    regressions = []
+    for case_id, current in results.items():
+        reference = baseline.get(case_id)
+        if reference is None:
+            continue
+        for metric, slack in (("wall_s", min_seconds), ("peak_rss_mb", 1.0)):
+            base, value = reference.get(metric), current.get(metric)
+            if base is None or value is None:
+                continue
+            if value > base * (1 + tolerance) and value - base > slack:
+                regressions.append(
+                    {"case": case_id, "metric": metric, "baseline": base, "current": value, "ratio": value / base}
+                )
+    return regressions
+
+
+def run(workdir, profile="quick", repeat=3):
+    """
+    Exécute tous les cas, chacun dans un processus neuf, et garde la meilleure mesure.
+
+    Args:
+        workdir (str): Dossier des fichiers synthétiques.
+        profile (str, optional): "quick" ou "full". Par défaut : "quick".
+        repeat (int, optional): Nombre d'exécutions par cas. Par défaut : 3.
+
+    Returns:
+        dict: Mesures par identifiant de cas "<fonction>[<configuration>]".
+    """
+    results = {}
+    fixtures = make_fixtures(workdir, profile)
+    # Un processus neuf par exécution : le pic de mémoire mesuré est celui du cas seul
+    with ProcessPoolExecutor(max_workers=1, max_tasks_per_child=1) as executor:
+        for kind, config_id, path in fixtures:
+            for func in CASES[kind]:
+                case_id = f"{func.__name__}[{config_id}]"
+                runs = [executor.submit(measure, func, path).result() for _ in range(repeat)]
+                best = min(runs, key=lambda r: r["wall_s"])
+                best["peak_rss_mb"] = min(r["peak_rss_mb"] for r in runs)
+                results[case_id] = best
+                print(f"{case_id}: {best['wall_s'] * 1000:.1f} ms, {best['peak_rss_mb']:.0f} Mo")
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--profile", choices=("quick", "full"), default="quick")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--workdir", help="Dossier des fichiers synthétiques (temporaire par défaut)")
+    parser.add_argument("--output", default="bench_report.json", help="Rapport JSON à écrire")
+    parser.add_argument("--baseline", help="Rapport de référence pour détecter les régressions")
+    parser.add_argument("--tolerance", type=float, default=0.2)
+    args = parser.parse_args()
+
+    if args.workdir:
+        os.makedirs(args.workdir, exist_ok=True)
+        results = run(args.workdir, args.profile, args.repeat)
+    else:
+        with tempfile.TemporaryDirectory() as workdir:
+            results = run(workdir, args.profile, args.repeat)
+
+    regressions = []
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare(results, json.load(f)["results"], args.tolerance)
+
+    report = {
+        "environment": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+        },
+        "profile": args.profile,
+        "results": results,
+        "regressions": regressions,
+    }
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"Rapport enregistré : {args.output}")
+    for regression in regressions:
+        print(
+            f"RÉGRESSION {regression['case']} ({regression['metric']}) : "
+            f"{regression['baseline']:.3g} -> {regression['current']:.3g} (x{regression['ratio']:.2f})"
+        )
+    sys.exit(1 if regressions else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+import os
+import numpy as np
+import rasterio
+from rasterio.transform import from_origin
+from src.class_index import encode_class_index
+
+CRS = "EPSG:32631"
+
+
+def _profile(size, count, dtype, tiled, compress):
+    profile = {
+        "driver": "GTiff",
+        "width": size,
+        "height": size,
+        "count": count,
+        "dtype": dtype,
+        "crs": CRS,
+        "transform": from_origin(500000, 4000000 + size * 3, 3, 3),
+    }
+    if tiled:
+        profile.update(tiled=True, blockxsize=256, blockysize=256)
+    if compress:
+        profile["compress"] = compress
+    return profile
+
+
+def write_image(path, size=1024, count=4, dtype="uint16", tiled=True, compress=None, seed=0):
+    """
+    Écrit une image satellitaire synthétique (bandes bleu, vert, rouge, proche infrarouge).
+
+    Les valeurs suivent des motifs lisses plus du bruit, pour que la compression
+    et les histogrammes se comportent comme sur des données réelles.
+
+    Args:
+        path (str): Chemin du GeoTIFF.
+        size (int, optional): Taille (pixels) du côté. Par défaut : 1024.
+        count (int, optional): Nombre de bandes. Par défaut : 4.
+        dtype (str, optional): "uint8", "uint16" ou "float32". Par défaut : "uint16".
+        tiled (bool, optional): Tuiles 256×256 (sinon bandes de lignes). Par défaut : True.
+        compress (str, optional): Compression GDAL ("deflate", "lzw"...). Par défaut : aucune.
+        seed (int, optional): Graine aléatoire.
+
+    Returns:
+        str: Chemin du fichier écrit.
+    """
+    rng = np.random.default_rng(seed)
+    scale = {"uint8": 255, "uint16": 10000, "float32": 1.0}[dtype]
+    y, x = np.mgrid[0:size, 0:size] / size
+    with rasterio.open(path, "w", **_profile(size, count, dtype, tiled, compress)) as dst:
+        for band in range(1, count + 1):
+            pattern = 0.5 + 0.25 * np.sin(2 * np.pi * (band * x + y)) + 0.1 * rng.standard_normal((size, size))
+            data = np.clip(pattern, 0, 1) * scale
+            dst.write(data.astype(dtype), band)
+    return path
+
+
+def write_labels(path, size=1024, density="dense", tiled=True, compress="deflate", encoding="onehot", seed=0):
+    """
+    Écrit un raster de labels synthétique à 7 classes.
+
+    Args:
+        path (str): Chemin du GeoTIFF.
+        size (int, optional): Taille (pixels) du côté. Par défaut : 1024.
+        density (str, optional): "dense" (toutes les classes, tout labellisé) ou "sparse"
+            (deux classes sur ~5 % des pixels). Par défaut : "dense".
+        tiled (bool, optional): Tuiles 256×256. Par défaut : True.
+        compress (str, optional): Compression GDAL. Par défaut : "deflate".
+        encoding (str, optional): "onehot" (7 bandes uint8) ou "index" (1 bande). Par défaut : "onehot".
+        seed (int, optional): Graine aléatoire.
+
+    Returns:
+        str: Chemin du fichier écrit.
+    """
+    rng = np.random.default_rng(seed)
+    # Classes en grandes plages, comme une carte d'occupation du sol
+    coarse = rng.integers(1, 8, (size // 32 + 1, size // 32 + 1))
+    index = np.kron(coarse, np.ones((32, 32), dtype=np.int64))[:size, :size].astype(np.uint8)
+    if density == "sparse":
+        keep = rng.random((size // 32 + 1, size // 32 + 1)) < 0.05
+        keep = np.kron(keep, np.ones((32, 32), dtype=bool))[:size, :size]
+        index = np.where(keep, np.where(index % 2 == 0, 2, 6), 0).astype(np.uint8)
+
+    onehot_path = path if encoding == "onehot" else path + ".onehot.tif"
+    with rasterio.open(onehot_path, "w", **_profile(size, 7, "uint8", tiled, compress)) as dst:
+        for classe in range(1, 8):
+            dst.write((index == classe).astype(np.uint8), classe)
+    if encoding == "index":
+        encode_class_index(onehot_path, path)
+        os.remove(onehot_path)
+    return path
+
+
+def write_label_folder(folder, n_dates=5, size=512, density="dense", encoding="onehot"):
+    """
+    Écrit un dossier de rasters de labels datés, comme un dossier d'AOI.
+
+    Args:
+        folder (str): Dossier de sortie.
+        n_dates (int, optional): Nombre de dates. Par défaut : 5.
+        size (int, optional): Taille (pixels) du côté. Par défaut : 512.
+        density (str, optional): "dense" ou "sparse". Par défaut : "dense".
+        encoding (str, optional): "onehot" ou "index". Par défaut : "onehot".
+
+    Returns:
+        list[str]: Chemins des fichiers écrits.
+    """
+    os.makedirs(folder, exist_ok=True)
+    return [
+        write_labels(
+            os.path.join(folder, f"labels_2020_01_{day:02d}.tif"),
+            size=size,
+            density=density,
+            encoding=encoding,
+            seed=day,
+        )
+        for day in range(1, n_dates + 1)
+    ]
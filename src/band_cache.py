@@ -0,0 +1,166 @@
+import threading
+from collections import OrderedDict
+from src.instrumentation import record_cache
+
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024  # 512 Mo
+
+
+def window_key(window):
+    """
+    Clé hachable d'une fenêtre rasterio (None pour la bande entière).
+
+    Args:
+        window (rasterio.windows.Window): Fenêtre lue, ou None.
+
+    Returns:
+        tuple: (colonne, ligne, largeur, hauteur), ou None.
+    """
+    if window is None:
+        return None
+    return tuple(int(value) for value in window.flatten())
+
+
+class BandCache:
+    """
+    Cache LRU, borné en octets, de bandes (ou fenêtres) décodées.
+
+    Les tableaux mis en cache sont en lecture seule : un appelant qui voudrait
+    les modifier doit en faire une copie, ce qui protège les autres lecteurs du
+    même tableau. Au-delà du budget, les entrées les moins récemment servies sont
+    retirées ; un tableau plus grand que le budget n'est pas conservé.
+    """
+
+    def __init__(self, max_bytes=DEFAULT_MAX_BYTES):
+        """
+        Initialise le cache.
+
+        Args:
+            max_bytes (int, optional): Budget mémoire en octets. Par défaut : 512 Mo.
+        """
+        self.max_bytes = max_bytes
+        self.current_bytes = 0
+        self._entries = OrderedDict()  # clé -> tableau en lecture seule
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key):
+        """
+        Renvoie le tableau associé à une clé.
+
+        Args:
+            key (tuple): Clé de la lecture.
+
+        Returns:
+            np.array: Tableau en lecture seule, ou None s'il n'est pas en cache.
+        """
+        with self._lock:
+            data = self._entries.get(key)
+            if data is None:
+                self.misses += 1
+            else:
+                self._entries.move_to_end(key)
+                self.hits += 1
+        record_cache("band_cache", data is not None)
+        return data
+
+    def put(self, key, data):
+        """
+        Ajoute un tableau au cache (il passe en lecture seule).
+
+        Args:
+            key (tuple): Clé de la lecture.
+            data (np.array): Tableau décodé.
+
+        Returns:
+            np.array: Le tableau, en lecture seule.
+        """
+        data.setflags(write=False)
+        if data.nbytes > self.max_bytes:
+            return data
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self.current_bytes -= previous.nbytes
+            self._entries[key] = data
+            self.current_bytes += data.nbytes
+            while self.current_bytes > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self.current_bytes -= evicted.nbytes
+                self.evictions += 1
+        return data
+
+    def get_or_read(self, key, read):
+        """
+        Renvoie le tableau en cache, ou le lit avec `read` et le met en cache.
+
+        Args:
+            key (tuple): Clé de la lecture.
+            read (callable): Fonction sans argument qui décode le tableau.
+
+        Returns:
+            np.array: Tableau en lecture seule.
+        """
+        data = self.get(key)
+        if data is None:
+            data = self.put(key, read())
+        return data
+
+    def invalidate(self, prefix):
+        """
+        Retire les entrées dont la clé commence par `prefix` (ex. un fichier modifié).
+
+        Args:
+            prefix (tuple): Début des clés à retirer.
+        """
+        with self._lock:
+            for key in [key for key in self._entries if key[:len(prefix)] == prefix]:
+                self.current_bytes -= self._entries.pop(key).nbytes
+
+    def clear(self):
+        """Vide le cache."""
+        with self._lock:
+            self._entries.clear()
+            self.current_bytes = 0
+
+    def get_stats(self):
+        """
+        Retourne les compteurs du cache.
+
+        Returns:
+            dict: Compteurs "hits", "misses", "evictions", "entries", "bytes" et "hit_rate".
+        """
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "entries": len(self._entries),
+            "bytes": self.current_bytes,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
+
+
+_shared_cache = None
+_shared_lock = threading.Lock()
+
+
+def shared_band_cache(max_bytes=None):
+    """
+    Cache commun au processus, créé au premier appel.
+
+    Args:
+        max_bytes (int, optional): Nouveau budget mémoire en octets. Par défaut : inchangé
+            (512 Mo à la création).
+
+    Returns:
+        BandCache: Cache partagé.
+    """
+    global _shared_cache
+    with _shared_lock:
+        if _shared_cache is None:
+            _shared_cache = BandCache()
+        if max_bytes is not None:
+            _shared_cache.max_bytes = max_bytes
+        return _shared_cache
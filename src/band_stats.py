@@ -0,0 +1,267 @@
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import rasterio
+from src.histograms import HistogramAccumulator, is_exact_dtype
+from src.raster_windows import iter_block_windows
+
+# Nombre de classes de l'esquisse de quantiles pour les types flottants
+QUANTILE_BINS = 4096
+
+
+class BandStatsAccumulator:
+    """
+    Statistiques globales par bande (min, max, moyenne, écart-type, percentiles), fusionnables.
+
+    La moyenne et la variance sont mises à jour par l'algorithme de Welford,
+    fenêtre par fenêtre (formule de Chan pour combiner deux états partiels).
+    Les percentiles proviennent d'une esquisse par histogramme : exacte pour les
+    entiers sur 8 ou 16 bits, approchée (à une largeur de classe près) sur
+    `value_range` pour les autres types. Les états partiels calculés par des
+    processus différents se fusionnent avec `merge` et s'enregistrent avec `save`.
+    """
+
+    def __init__(self, bands, value_range=None, quantile_bins=QUANTILE_BINS):
+        """
+        Initialise un accumulateur vide.
+
+        Args:
+            bands (list[int]): Numéros des bandes suivies.
+            value_range (tuple, optional): Intervalle (min, max) de l'esquisse de quantiles pour
+                les types flottants. Inutile pour les entiers sur 8 ou 16 bits.
+            quantile_bins (int, optional): Nombre de classes de l'esquisse flottante.
+        """
+        self.bands = list(bands)
+        self.value_range = value_range
+        self.quantile_bins = quantile_bins
+        n_bands = len(self.bands)
+        self.count = np.zeros(n_bands, dtype=np.int64)
+        self.mean = np.zeros(n_bands, dtype=np.float64)
+        self.m2 = np.zeros(n_bands, dtype=np.float64)
+        self.min = np.full(n_bands, np.inf)
+        self.max = np.full(n_bands, -np.inf)
+        self.sketches = [HistogramAccumulator(quantile_bins, value_range) for _ in self.bands]
+
+    def _combine(self, i, count, mean, m2, band_min, band_max):
+        """Combine un état partiel (count, mean, m2, min, max) dans la bande i."""
+        if count == 0:
+            return
+        total = self.count[i] + count
+        delta = mean - self.mean[i]
+        self.mean[i] += delta * count / total
+        self.m2[i] += m2 + delta * delta * self.count[i] * count / total
+        self.count[i] = total
+        self.min[i] = min(self.min[i], band_min)
+        self.max[i] = max(self.max[i], band_max)
+
+    def update(self, band, data, nodata=None):
+        """
+        Ajoute les valeurs d'une fenêtre d'une bande.
+
+        Args:
+            band (int): Numéro de la bande.
+            data (np.array): Valeurs de la fenêtre.
+            nodata (float, optional): Valeur ignorée (NaN accepté). Les NaN des rasters
+                flottants sont toujours ignorés.
+        """
+        i = self.bands.index(band)
+        if np.issubdtype(data.dtype, np.floating):
+            valid = ~np.isnan(data)
+            if nodata is not None and not np.isnan(nodata):
+                valid &= data != nodata
+            data = data[valid]
+        elif nodata is not None and not np.isnan(nodata):
+            data = data[data != nodata]
+        if data.size == 0:
+            return
+        mean = data.mean(dtype=np.float64)
+        m2 = data.var(dtype=np.float64) * data.size
+        self._combine(i, data.size, mean, m2, data.min(), data.max())
+        if is_exact_dtype(data.dtype) or self.value_range is not None:
+            self.sketches[i].update(data)
+
+    def update_dataset(self, dataset, windowed=True):
+        """
+        Ajoute toutes les valeurs d'un raster, fenêtre par fenêtre.
+
+        Args:
+            dataset (rasterio.DatasetReader): Raster ouvert.
+            windowed (bool, optional): Lecture bloc par bloc (mémoire bornée). Par défaut : True.
+        """
+        windows = iter_block_windows(dataset, self.bands[0]) if windowed else [None]
+        for window in windows:
+            for band in self.bands:
+                self.update(band, dataset.read(band, window=window), nodata=dataset.nodata)
+
+    def merge(self, other):
+        """
+        Fusionne l'état partiel d'un autre accumulateur (mêmes bandes).
+
+        Args:
+            other (BandStatsAccumulator): Accumulateur à fusionner.
+
+        Returns:
+            BandStatsAccumulator: L'accumulateur courant.
+        """
+        if other.bands != self.bands:
+            raise ValueError("Bandes différentes : fusion impossible")
+        for i in range(len(self.bands)):
+            self._combine(i, other.count[i], other.mean[i], other.m2[i], other.min[i], other.max[i])
+            if other.sketches[i].n:
+                self.sketches[i].merge(other.sketches[i])
+        return self
+
+    def std(self):
+        """Écart-type (population) de chaque bande."""
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return np.sqrt(np.where(self.count > 0, self.m2 / self.count, np.nan))
+
+    def percentile(self, band, q):
+        """
+        Percentile(s) approché(s) d'une bande, à partir de l'esquisse.
+
+        Args:
+            band (int): Numéro de la bande.
+            q (float | list[float]): Percentile(s) entre 0 et 100.
+
+        Returns:
+            float | np.array: Valeur(s) du percentile.
+        """
+        sketch = self.sketches[self.bands.index(band)]
+        if not sketch.n:
+            raise ValueError(f"Pas d'esquisse de quantiles pour la bande {band} (value_range requis)")
+        if sketch.value_counts is not None:
+            values = np.arange(sketch.value_counts.size) + sketch.offset
+            counts = sketch.value_counts
+        else:
+            counts, edges = sketch.result()
+            values = (edges[:-1] + edges[1:]) / 2
+        cumulative = np.cumsum(counts)
+        ranks = np.asarray(q, dtype=np.float64) / 100 * (cumulative[-1] - 1)
+        result = values[np.searchsorted(cumulative, ranks, side="right")]
+        return result if np.ndim(q) else float(result)
+
+    def value_range_for(self, band, percentiles=None):
+        """
+        Intervalle de normalisation global d'une bande.
+
+        Args:
+            band (int): Numéro de la bande.
+            percentiles (tuple, optional): Percentiles bas/haut (ex. (2, 98)). Par défaut : min/max.
+
+        Returns:
+            tuple: (bas, haut).
+        """
+        if percentiles is None:
+            i = self.bands.index(band)
+            return self.min[i], self.max[i]
+        low, high = self.percentile(band, list(percentiles))
+        return low, high
+
+    def result(self, percentiles=(2, 50, 98)):
+        """
+        Résumé des statistiques par bande.
+
+        Args:
+            percentiles (tuple, optional): Percentiles à inclure (si une esquisse existe).
+
+        Returns:
+            dict: Pour chaque bande, "count", "min", "max", "mean", "std" et "p<q>".
+        """
+        std = self.std()
+        summary = {}
+        for i, band in enumerate(self.bands):
+            summary[band] = {
+                "count": int(self.count[i]),
+                "min": float(self.min[i]),
+                "max": float(self.max[i]),
+                "mean": float(self.mean[i]),
+                "std": float(std[i]),
+            }
+            if self.sketches[i].n:
+                for q, value in zip(percentiles, self.percentile(band, list(percentiles))):
+                    summary[band][f"p{q}"] = float(value)
+        return summary
+
+    def save(self, path):
+        """
+        Enregistre l'état (fusionnable) de l'accumulateur dans un fichier .npz.
+
+        Args:
+            path (str): Chemin du fichier.
+        """
+        arrays = {
+            "bands": np.array(self.bands),
+            "value_range": np.array(self.value_range if self.value_range is not None else [], dtype=np.float64),
+            "quantile_bins": self.quantile_bins,
+            "count": self.count,
+            "mean": self.mean,
+            "m2": self.m2,
+            "min": self.min,
+            "max": self.max,
+        }
+        for i, sketch in enumerate(self.sketches):
+            arrays[f"offset_{i}"] = sketch.offset if sketch.offset is not None else 0
+            arrays[f"value_counts_{i}"] = sketch.value_counts if sketch.value_counts is not None else np.zeros(0, np.int64)
+            arrays[f"counts_{i}"] = sketch.counts if sketch.counts is not None else np.zeros(0, np.int64)
+            arrays[f"n_{i}"] = sketch.n
+        np.savez(path, **arrays)
+
+    @classmethod
+    def load(cls, path):
+        """
+        Charge un accumulateur enregistré avec `save`.
+
+        Args:
+            path (str): Chemin du fichier .npz.
+
+        Returns:
+            BandStatsAccumulator: Accumulateur chargé.
+        """
+        with np.load(path) as f:
+            value_range = tuple(f["value_range"]) if f["value_range"].size else None
+            stats = cls(f["bands"].tolist(), value_range, int(f["quantile_bins"]))
+            for name in ("count", "mean", "m2", "min", "max"):
+                setattr(stats, name, f[name].copy())
+            for i, sketch in enumerate(stats.sketches):
+                if f[f"value_counts_{i}"].size:
+                    sketch.offset = int(f[f"offset_{i}"])
+                    sketch.value_counts = f[f"value_counts_{i}"].copy()
+                if f[f"counts_{i}"].size:
+                    sketch.counts = f[f"counts_{i}"].copy()
+                sketch.n = int(f[f"n_{i}"])
+        return stats
+
+
+def _file_band_stats(file_path, bands, value_range, quantile_bins):
+    """Statistiques d'un fichier (fonction de module, exécutable dans un pool de processus)."""
+    stats = BandStatsAccumulator(bands, value_range, quantile_bins)
+    with rasterio.open(file_path) as dataset:
+        stats.update_dataset(dataset)
+    return stats
+
+
+def compute_dataset_stats(file_paths, bands, value_range=None, quantile_bins=QUANTILE_BINS, max_workers=None):
+    """
+    Statistiques globales par bande sur un ensemble de scènes, calculées en parallèle.
+
+    Chaque processus traite un fichier fenêtre par fenêtre, puis les états
+    partiels sont fusionnés dans l'ordre des fichiers.
+
+    Args:
+        file_paths (list[str]): Chemins des scènes.
+        bands (list[int]): Numéros des bandes.
+        value_range (tuple, optional): Intervalle de l'esquisse de quantiles (types flottants).
+        quantile_bins (int, optional): Nombre de classes de l'esquisse flottante.
+        max_workers (int, optional): Nombre de processus. Par défaut : nombre de cœurs.
+
+    Returns:
+        BandStatsAccumulator: Statistiques fusionnées.
+    """
+    total = BandStatsAccumulator(bands, value_range, quantile_bins)
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        futures = [
+            executor.submit(_file_band_stats, path, bands, value_range, quantile_bins) for path in file_paths
+        ]
+        for future in futures:
+            total.merge(future.result())
+    return total
@@ -0,0 +1,322 @@
+import os
+import re
+import sqlite3
+from concurrent.futures import ThreadPoolExecutor
+import rasterio
+
+DATE_PATTERN = re.compile(r'\d{4}[-_]\d{2}[-_]\d{2}')
+# Identifiant d'AOI dans les chemins, ex. 1311_3077_13_10N ou 2235_3403_13-17N
+AOI_PATTERN = re.compile(r'\d{4}_\d{4}_\d{2}[-_]\d{2}[NS]')
+# Zone UTM en fin d'identifiant d'AOI, ex. 10N
+UTM_ZONE_PATTERN = re.compile(r'(\d{2}[NS])$')
+# Codes EPSG WGS 84 / UTM : 326xx (nord) et 327xx (sud)
+UTM_EPSG_PATTERN = re.compile(r'EPSG:32([67])(\d{2})$')
+# Dossiers feuilles des séries de labels, ex. .../Labels/Raster/49N-113E-22N-L3H-SR
+LABEL_FOLDER_SUFFIX = "-L3H-SR"
+# Nombre de bandes des rasters de labels (une par classe)
+LABEL_BAND_COUNT = 7
+
+
+def list_tif_files(folder_path):
+    """
+    Liste triée des fichiers .tif d'un dossier.
+
+    Args:
+        folder_path (str): Chemin vers le dossier.
+
+    Returns:
+        list[str]: Chemins complets des fichiers .tif, triés.
+    """
+    return sorted([os.path.join(folder_path, f) for f in os.listdir(folder_path) if f.endswith(".tif")])
+
+
+def extract_date(tif_path):
+    """
+    Extrait la date (AAAA-MM-JJ) du nom d'un fichier.
+
+    Args:
+        tif_path (str): Chemin du fichier .tif.
+
+    Returns:
+        str: Date au format AAAA-MM-JJ, ou None si aucune date n'est trouvée.
+    """
+    match = DATE_PATTERN.search(os.path.basename(tif_path))
+    if match:
+        return match.group(0).replace("_", "-")
+    return None
+
+
+def extract_aoi(folder_path):
+    """
+    Extrait l'identifiant de l'AOI d'un chemin de dossier.
+
+    Args:
+        folder_path (str): Chemin du dossier de labels.
+
+    Returns:
+        str: Identifiant de l'AOI (ex. 1311_3077_13_10N), ou le nom du dossier s'il n'en contient pas.
+    """
+    matches = AOI_PATTERN.findall(folder_path)
+    if matches:
+        return matches[-1]
+    return os.path.basename(os.path.normpath(folder_path))
+
+
+def extract_utm_zone(aoi):
+    """
+    Extrait la zone UTM (ex. 10N) d'un identifiant d'AOI.
+
+    Args:
+        aoi (str): Identifiant de l'AOI.
+
+    Returns:
+        str: Zone UTM, ou None si l'identifiant n'en contient pas.
+    """
+    match = UTM_ZONE_PATTERN.search(aoi)
+    return match.group(1) if match else None
+
+
+def utm_zone_from_crs(crs):
+    """
+    Zone UTM d'un CRS WGS 84 / UTM (ex. "EPSG:32610" -> "10N").
+
+    Args:
+        crs (str): CRS au format "EPSG:xxxxx".
+
+    Returns:
+        str: Zone UTM, ou None si le CRS n'est pas UTM.
+    """
+    match = UTM_EPSG_PATTERN.match(crs or "")
+    if match is None:
+        return None
+    return match.group(2) + ("N" if match.group(1) == "6" else "S")
+
+
+def _scan_dir(dir_path):
+    """Sous-dossiers et fichiers .tif (chemin, mtime en ns, taille) d'un dossier."""
+    subdirs = []
+    tif_files = []
+    try:
+        with os.scandir(dir_path) as entries:
+            for entry in entries:
+                if entry.name.startswith("."):
+                    continue
+                if entry.is_dir(follow_symlinks=False):
+                    subdirs.append(entry.path)
+                elif entry.name.endswith(".tif") and entry.is_file():
+                    stat = entry.stat()
+                    tif_files.append((entry.path, stat.st_mtime_ns, stat.st_size))
+    except OSError as e:
+        print(f"Dossier illisible {dir_path} : {e}")
+    return subdirs, tif_files
+
+
+def _read_header(tif_path):
+    """En-tête d'un raster : (largeur, hauteur, bandes, type, CRS, erreur)."""
+    try:
+        with rasterio.open(tif_path) as src:
+            crs = src.crs.to_string() if src.crs else None
+            return src.width, src.height, src.count, src.dtypes[0], crs, None
+    except Exception as e:
+        # Un fichier illisible est enregistré avec son erreur, sans interrompre le parcours
+        return None, None, None, None, None, f"{type(e).__name__}: {e}"
+
+
+class DatasetCatalog:
+    """
+    Catalogue persistant (SQLite) des rasters d'un dossier racine.
+
+    `scan` parcourt l'arborescence en parallèle (`os.scandir`), extrait l'AOI, la
+    zone UTM et la date des chemins et lit les en-têtes (taille, CRS, type, nombre
+    de bandes) des seuls fichiers nouveaux ou modifiés (mtime, taille). Les
+    requêtes (`folders`, `files`, `aois`) ne lisent que la base : la planification
+    des traitements ne touche pas aux données.
+    """
+
+    def __init__(self, db_path, root_dir=None):
+        """
+        Ouvre (ou crée) le catalogue.
+
+        Args:
+            db_path (str): Chemin du fichier SQLite.
+            root_dir (str, optional): Dossier racine des données, pour `scan`.
+        """
+        self.db_path = db_path
+        self.root_dir = root_dir
+        self.connection = sqlite3.connect(db_path)
+        self.connection.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS files (
+                path TEXT PRIMARY KEY,
+                folder TEXT NOT NULL,
+                aoi TEXT,
+                utm_zone TEXT,
+                date TEXT,
+                mtime_ns INTEGER NOT NULL,
+                size INTEGER NOT NULL,
+                width INTEGER,
+                height INTEGER,
+                count INTEGER,
+                dtype TEXT,
+                crs TEXT,
+                error TEXT
+            );
+            CREATE INDEX IF NOT EXISTS files_folder ON files (folder);
+            CREATE INDEX IF NOT EXISTS files_aoi_date ON files (aoi, date);
+            """
+        )
+        self.connection.commit()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def close(self):
+        """Ferme la base."""
+        if self.connection is None:
+            return
+        self.connection.close()
+        self.connection = None
+
+    def walk(self, max_workers=8):
+        """
+        Parcourt l'arborescence en parallèle, niveau par niveau.
+
+        Args:
+            max_workers (int, optional): Nombre de threads. Par défaut : 8.
+
+        Returns:
+            list[tuple]: (chemin, mtime en ns, taille) de chaque fichier .tif.
+        """
+        tif_files = []
+        level = [os.path.abspath(self.root_dir)]
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            while level:
+                next_level = []
+                for subdirs, files in executor.map(_scan_dir, level):
+                    next_level.extend(subdirs)
+                    tif_files.extend(files)
+                level = next_level
+        return tif_files
+
+    def scan(self, max_workers=8):
+        """
+        Met à jour le catalogue : seuls les fichiers nouveaux ou modifiés sont ouverts.
+
+        Args:
+            max_workers (int, optional): Nombre de threads (parcours et lecture des en-têtes).
+                Par défaut : 8.
+
+        Returns:
+            dict: Nombre de fichiers "added", "updated", "removed" et "unchanged".
+
+        Raises:
+            ValueError: Si aucun dossier racine n'a été fourni.
+        """
+        if self.root_dir is None:
+            raise ValueError("Aucun dossier racine à parcourir")
+        root = os.path.abspath(self.root_dir)
+        known = {
+            path: (mtime_ns, size)
+            for path, mtime_ns, size in self.connection.execute(
+                "SELECT path, mtime_ns, size FROM files WHERE substr(path, 1, ?) = ?",
+                (len(root) + 1, root + os.sep),
+            )
+        }
+        found = self.walk(max_workers)
+        changed = [(path, mtime_ns, size) for path, mtime_ns, size in found if known.get(path) != (mtime_ns, size)]
+
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            headers = list(executor.map(_read_header, [path for path, _, _ in changed]))
+        rows = []
+        for (path, mtime_ns, size), header in zip(changed, headers):
+            folder = os.path.dirname(path)
+            aoi = extract_aoi(folder)
+            utm_zone = extract_utm_zone(aoi) or utm_zone_from_crs(header[4])
+            rows.append((path, folder, aoi, utm_zone, extract_date(path), mtime_ns, size) + header)
+        self.connection.executemany("INSERT OR REPLACE INTO files VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", rows)
+
+        found_paths = {path for path, _, _ in found}
+        removed = [(path,) for path in known if path not in found_paths]
+        self.connection.executemany("DELETE FROM files WHERE path = ?", removed)
+        self.connection.commit()
+        added = sum(1 for path, _, _ in changed if path not in known)
+        return {
+            "added": added,
+            "updated": len(changed) - added,
+            "removed": len(removed),
+            "unchanged": len(found) - len(changed),
+        }
+
+    def folders(self, dated_only=True, suffix=None, count=None):
+        """
+        Dossiers contenant des rasters, depuis le catalogue.
+
+        Args:
+            dated_only (bool, optional): Seulement les dossiers dont au moins un fichier est daté
+                (dossiers de séries temporelles). Par défaut : True.
+            suffix (str, optional): Seulement les dossiers dont le nom se termine par ce suffixe.
+            count (int, optional): Seulement les dossiers dont tous les rasters lisibles ont ce
+                nombre de bandes (les fichiers en erreur ne sont pas pris en compte).
+
+        Returns:
+            list[str]: Chemins des dossiers, triés.
+        """
+        query = "SELECT folder FROM files WHERE 1 = 1"
+        params = []
+        if dated_only:
+            query += " AND date IS NOT NULL"
+        if suffix is not None:
+            query += " AND substr(folder, -?) = ?"
+            params += [len(suffix), suffix]
+        query += " GROUP BY folder"
+        if count is not None:
+            query += " HAVING SUM(count = ?) > 0 AND SUM(count != ?) = 0"
+            params += [count, count]
+        return [row[0] for row in self.connection.execute(query + " ORDER BY folder", params)]
+
+    def label_folders(self):
+        """
+        Dossiers des séries de labels : dossiers feuilles `*-L3H-SR` de rasters datés à 7 bandes.
+
+        Les dossiers parents (`.../Labels/Raster`) et les autres séries datées
+        (images, composites...) sont exclus.
+
+        Returns:
+            list[str]: Chemins des dossiers, triés.
+        """
+        return self.folders(dated_only=True, suffix=LABEL_FOLDER_SUFFIX, count=LABEL_BAND_COUNT)
+
+    def aois(self):
+        """
+        Identifiants des AOI du catalogue.
+
+        Returns:
+            list[str]: Identifiants triés.
+        """
+        return [row[0] for row in self.connection.execute("SELECT DISTINCT aoi FROM files ORDER BY aoi")]
+
+    def files(self, aoi=None, folder=None):
+        """
+        Fichiers du catalogue, triés par dossier et par date.
+
+        Args:
+            aoi (str, optional): Filtre sur l'AOI.
+            folder (str, optional): Filtre sur le dossier.
+
+        Returns:
+            list[dict]: Une entrée par fichier (colonnes du catalogue).
+        """
+        query = "SELECT * FROM files WHERE 1 = 1"
+        params = []
+        if aoi is not None:
+            query += " AND aoi = ?"
+            params.append(aoi)
+        if folder is not None:
+            query += " AND folder = ?"
+            params.append(folder)
+        cursor = self.connection.execute(query + " ORDER BY folder, date, path", params)
+        columns = [description[0] for description in cursor.description]
+        return [dict(zip(columns, row)) for row in cursor]
@@ -0,0 +1,176 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import rasterio
+from src.class_index import is_class_index, onehot_to_class_index
+from src.catalog import extract_date, list_tif_files
+from src.raster_windows import iter_block_windows
+
+N_CLASSES = 7
+
+
+def read_class_index_window(dataset, window, n_classes=N_CLASSES):
+    """
+    Lit une fenêtre d'un raster de labels sous forme d'indices de classe (0 = aucune classe).
+
+    Args:
+        dataset (rasterio.DatasetReader): Raster de labels (one-hot ou indices de classe).
+        window (rasterio.windows.Window): Fenêtre à lire.
+        n_classes (int, optional): Nombre de classes. Par défaut : 7.
+
+    Returns:
+        np.array: Indices de classe (uint8).
+    """
+    if is_class_index(dataset):
+        return dataset.read(1, window=window)
+    return onehot_to_class_index(dataset.read(list(range(1, n_classes + 1)), window=window))
+
+
+def pair_transitions(path_from, path_to, mask_path=None, n_classes=N_CLASSES):
+    """
+    Matrice de transition entre deux rasters de labels consécutifs, calculée bloc par bloc.
+
+    Chaque pixel labellisé aux deux dates est codé (de - 1) * n_classes + (vers - 1),
+    puis tous les codes d'un bloc sont comptés en un seul `np.bincount`.
+
+    Args:
+        path_from (str): Raster de labels de la première date.
+        path_to (str): Raster de labels de la seconde date (même grille).
+        mask_path (str, optional): GeoTIFF du masque de changement à écrire (uint8) : 0 si la
+            classe est inchangée ou inconnue, sinon le code de transition + 1.
+        n_classes (int, optional): Nombre de classes. Par défaut : 7.
+
+    Returns:
+        dict: "matrix" (n_classes × n_classes, lignes = classe de départ), "unlabeled"
+            (pixels sans classe à l'une des dates), "changed" et "changed_fraction".
+
+    Raises:
+        ValueError: Si les deux rasters n'ont pas la même grille.
+    """
+    counts = np.zeros(n_classes * n_classes, dtype=np.int64)
+    unlabeled = 0
+    with rasterio.open(path_from) as src_from, rasterio.open(path_to) as src_to:
+        if (src_from.shape, src_from.transform) != (src_to.shape, src_to.transform):
+            raise ValueError(f"Grilles différentes : {path_from} et {path_to}")
+        dst = None
+        if mask_path is not None:
+            profile = src_from.profile.copy()
+            profile.update(
+                driver="GTiff",
+                count=1,
+                dtype="uint8",
+                nodata=None,
+                tiled=True,
+                blockxsize=256,
+                blockysize=256,
+                compress="deflate",
+            )
+            dst = rasterio.open(mask_path, "w", **profile)
+        try:
+            for window in iter_block_windows(src_from):
+                before = read_class_index_window(src_from, window, n_classes)
+                after = read_class_index_window(src_to, window, n_classes)
+                valid = (before > 0) & (after > 0)
+                codes = (before.astype(np.int16) - 1) * n_classes + (after.astype(np.int16) - 1)
+                counts += np.bincount(codes[valid], minlength=n_classes * n_classes)
+                unlabeled += valid.size - np.count_nonzero(valid)
+                if dst is not None:
+                    mask = np.where(valid & (before != after), codes + 1, 0).astype(np.uint8)
+                    dst.write(mask, 1, window=window)
+        finally:
+            if dst is not None:
+                dst.close()
+
+    matrix = counts.reshape(n_classes, n_classes)
+    labeled = int(matrix.sum())
+    changed = labeled - int(np.trace(matrix))
+    return {
+        "matrix": matrix,
+        "unlabeled": int(unlabeled),
+        "changed": changed,
+        "changed_fraction": changed / labeled if labeled else 0.0,
+    }
+
+
+class ChangeDetector:
+    """
+    Détection des changements d'occupation du sol entre dates consécutives d'une AOI.
+
+    Les rasters de labels du dossier sont triés par date (même expression que
+    `GroundTruth.mask_evolution`) et chaque paire de dates consécutives est
+    traitée dans un pool de processus.
+    """
+
+    def __init__(self, folder_path, n_classes=N_CLASSES):
+        """
+        Initialise le détecteur.
+
+        Args:
+            folder_path (str): Dossier contenant les rasters de labels datés.
+            n_classes (int, optional): Nombre de classes. Par défaut : 7.
+        """
+        self.folder_path = folder_path
+        self.n_classes = n_classes
+        dated = sorted(
+            (date, path)
+            for date, path in ((extract_date(path), path) for path in list_tif_files(folder_path))
+            if date is not None
+        )
+        self.dates = [date for date, _ in dated]
+        self.paths = [path for _, path in dated]
+
+    def pairs(self):
+        """
+        Paires de dates consécutives.
+
+        Returns:
+            list[tuple]: (date de départ, date d'arrivée, chemin de départ, chemin d'arrivée).
+        """
+        return [
+            (self.dates[i], self.dates[i + 1], self.paths[i], self.paths[i + 1])
+            for i in range(len(self.paths) - 1)
+        ]
+
+    def run(self, mask_dir=None, max_workers=None):
+        """
+        Calcule les transitions de toutes les paires de dates consécutives, en parallèle.
+
+        Args:
+            mask_dir (str, optional): Dossier où écrire un masque de changement par paire.
+            max_workers (int, optional): Nombre de processus. Par défaut : nombre de cœurs.
+
+        Returns:
+            list[dict]: Résultat de `pair_transitions` pour chaque paire, dans l'ordre des dates,
+                complété par "date_from" et "date_to".
+        """
+        pairs = self.pairs()
+        if mask_dir is not None:
+            os.makedirs(mask_dir, exist_ok=True)
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            futures = []
+            for date_from, date_to, path_from, path_to in pairs:
+                mask_path = None
+                if mask_dir is not None:
+                    mask_path = os.path.join(mask_dir, f"change_{date_from}_{date_to}.tif")
+                futures.append(executor.submit(pair_transitions, path_from, path_to, mask_path, self.n_classes))
+            results = []
+            for (date_from, date_to, _, _), future in zip(pairs, futures):
+                result = future.result()
+                result["date_from"] = date_from
+                result["date_to"] = date_to
+                results.append(result)
+        return results
+
+    def transition_stack(self, results):
+        """
+        Empile les matrices de transition.
+
+        Args:
+            results (list[dict]): Résultats de `run`.
+
+        Returns:
+            np.array: Matrices (paires, classes, classes).
+        """
+        if not results:
+            return np.zeros((0, self.n_classes, self.n_classes), dtype=np.int64)
+        return np.stack([result["matrix"] for result in results])
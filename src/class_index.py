@@ -0,0 +1,149 @@
+import os
+import numpy as np
+import rasterio
+from src.raster_windows import iter_block_windows
+
+# Tags GeoTIFF identifiant un raster d'indices de classe et permettant l'aller-retour
+ENCODING_TAG = "CLASS_ENCODING"
+ENCODING_VALUE = "class_index"
+N_CLASSES_TAG = "N_CLASSES"
+ONEHOT_VALUE_TAG = "ONEHOT_VALUE"
+ONEHOT_DTYPE_TAG = "ONEHOT_DTYPE"
+
+
+def is_class_index(dataset):
+    """
+    Indique si un raster ouvert est un raster d'indices de classe.
+
+    Args:
+        dataset (rasterio.DatasetReader): Raster ouvert.
+
+    Returns:
+        bool: True si le raster porte le tag d'encodage en indices de classe.
+    """
+    return dataset.count == 1 and dataset.tags().get(ENCODING_TAG) == ENCODING_VALUE
+
+
+def onehot_to_class_index(data):
+    """
+    Convertit des labels one-hot (classes, hauteur, largeur) en indices de classe.
+
+    Args:
+        data (np.array): Bandes one-hot, une par classe (classe 1 = bande 1).
+
+    Returns:
+        np.array: Indices de classe en uint8 (1 à 7), 0 là où aucune classe n'est présente.
+    """
+    index = np.argmax(data, axis=0).astype(np.uint8) + 1
+    index[~np.any(data, axis=0)] = 0
+    return index
+
+
+def class_index_to_onehot(index, n_classes=7, value=1, dtype=np.uint8):
+    """
+    Convertit des indices de classe en bandes one-hot.
+
+    Args:
+        index (np.array): Indices de classe (0 = aucune classe).
+        n_classes (int, optional): Nombre de classes. Par défaut : 7.
+        value (int, optional): Valeur des pixels présents. Par défaut : 1.
+        dtype (np.dtype, optional): Type des bandes. Par défaut : uint8.
+
+    Returns:
+        np.array: Bandes one-hot (classes, hauteur, largeur).
+    """
+    onehot = np.zeros((n_classes,) + index.shape, dtype=dtype)
+    for classe in range(1, n_classes + 1):
+        onehot[classe - 1][index == classe] = value
+    return onehot
+
+
+def encode_class_index(onehot_path, output_path, block_size=256):
+    """
+    Convertit un raster de labels one-hot (7 bandes) en un raster uint8 d'indices de classe.
+
+    Le raster produit est tuilé et compressé (deflate) ; la valeur et le type
+    des bandes one-hot sont conservés dans les tags pour un aller-retour sans perte.
+
+    Args:
+        onehot_path (str): Chemin du raster one-hot.
+        output_path (str): Chemin du raster d'indices à écrire.
+        block_size (int, optional): Taille des tuiles. Par défaut : 256.
+
+    Returns:
+        str: Chemin du fichier écrit.
+
+    Raises:
+        ValueError: Si les classes se chevauchent ou si les pixels présents n'ont pas tous
+            la même valeur (conversion avec perte).
+    """
+    with rasterio.open(onehot_path) as src:
+        profile = src.profile.copy()
+        profile.update(
+            driver="GTiff",
+            count=1,
+            dtype="uint8",
+            nodata=None,
+            tiled=True,
+            blockxsize=block_size,
+            blockysize=block_size,
+            compress="deflate",
+            predictor=2,
+        )
+        value = None
+        # Écriture dans un fichier temporaire : en cas d'erreur, aucun fichier partiel
+        # portant le tag d'encodage ne reste à la place de la sortie
+        tmp_path = os.path.join(os.path.dirname(output_path), f".{os.path.basename(output_path)}.tmp")
+        try:
+            with rasterio.open(tmp_path, "w", **profile) as dst:
+                for window in iter_block_windows(src):
+                    onehot = src.read(window=window)
+                    if (np.count_nonzero(onehot, axis=0) > 1).any():
+                        raise ValueError(f"Classes superposées dans {onehot_path} : conversion avec perte")
+                    present = onehot[onehot != 0]
+                    if present.size:
+                        values = np.unique(present)
+                        if value is None:
+                            value = values[0]
+                        if values.size > 1 or values[0] != value:
+                            raise ValueError(f"Valeurs one-hot non homogènes dans {onehot_path}")
+                    dst.write(onehot_to_class_index(onehot), 1, window=window)
+                dst.update_tags(
+                    **{
+                        ENCODING_TAG: ENCODING_VALUE,
+                        N_CLASSES_TAG: src.count,
+                        ONEHOT_VALUE_TAG: value.item() if value is not None else 1,
+                        ONEHOT_DTYPE_TAG: src.dtypes[0],
+                    }
+                )
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+    os.replace(tmp_path, output_path)
+    return output_path
+
+
+def decode_class_index(index_path, output_path):
+    """
+    Reconstruit le raster one-hot d'origine à partir d'un raster d'indices de classe.
+
+    Args:
+        index_path (str): Chemin du raster d'indices.
+        output_path (str): Chemin du raster one-hot à écrire.
+
+    Returns:
+        str: Chemin du fichier écrit.
+    """
+    with rasterio.open(index_path) as src:
+        tags = src.tags()
+        n_classes = int(tags.get(N_CLASSES_TAG, 7))
+        dtype = np.dtype(tags.get(ONEHOT_DTYPE_TAG, "uint8"))
+        value = dtype.type(float(tags.get(ONEHOT_VALUE_TAG, 1)))
+        profile = src.profile.copy()
+        profile.update(count=n_classes, dtype=dtype.name, predictor=1)
+        with rasterio.open(output_path, "w", **profile) as dst:
+            for window in iter_block_windows(src):
+                index = src.read(1, window=window)
+                dst.write(class_index_to_onehot(index, n_classes, value, dtype), window=window)
+    return output_path
@@ -0,0 +1,160 @@
+import json
+import os
+import numpy as np
+from src.class_index import N_CLASSES_TAG, ONEHOT_VALUE_TAG, is_class_index
+from src.instrumentation import profiled, record_cache, record_read
+from src.raster_windows import iter_block_windows
+
+# Suffixe du fichier d'index placé à côté de chaque raster de labels
+SIDECAR_SUFFIX = ".classes.json"
+
+
+def sidecar_path(tif_path):
+    """Chemin du fichier d'index d'un raster de labels."""
+    return tif_path + SIDECAR_SUFFIX
+
+
+@profiled
+def compute_presence(dataset, n_classes=None):
+    """
+    Calcule, bloc par bloc, la somme, le maximum et le nombre de pixels non nuls de chaque classe.
+
+    Args:
+        dataset (rasterio.DatasetReader): Raster de labels (one-hot ou indices de classe).
+        n_classes (int, optional): Nombre de classes. Par défaut : toutes les bandes.
+
+    Returns:
+        dict: "height", "width" et les listes "sum", "max", "count" (une valeur par classe).
+    """
+    if is_class_index(dataset):
+        tags = dataset.tags()
+        n_classes = n_classes or int(tags.get(N_CLASSES_TAG, 7))
+        value = float(tags.get(ONEHOT_VALUE_TAG, 1))
+        counts = np.zeros(n_classes + 1, dtype=np.int64)
+        for window in iter_block_windows(dataset):
+            data = dataset.read(1, window=window)
+            record_read(data)
+            counts += np.bincount(data.ravel(), minlength=n_classes + 1)[: n_classes + 1]
+        counts = counts[1:]
+        totals = counts * value
+        maxima = np.where(counts > 0, value, 0)
+    else:
+        n_classes = n_classes or dataset.count
+        bands = list(range(1, n_classes + 1))
+        totals = np.zeros(n_classes)
+        maxima = np.full(n_classes, -np.inf)
+        counts = np.zeros(n_classes, dtype=np.int64)
+        for window in iter_block_windows(dataset):
+            data = dataset.read(bands, window=window)  # Une seule lecture des bandes par bloc
+            record_read(data)
+            totals += data.sum(axis=(1, 2), dtype=np.float64)
+            maxima = np.maximum(maxima, data.max(axis=(1, 2)))
+            counts += np.count_nonzero(data, axis=(1, 2))
+    return {
+        "height": dataset.height,
+        "width": dataset.width,
+        "sum": [float(v) for v in totals],
+        "max": [float(v) for v in maxima],
+        "count": [int(v) for v in counts],
+    }
+
+
+def coverage_from_presence(presence):
+    """
+    Proportion (%) de chaque classe, avec la même convention que `GroundTruth.mask_evolution`.
+
+    Args:
+        presence (dict): Index de présence (voir `compute_presence`).
+
+    Returns:
+        np.array: Proportion de chaque classe.
+    """
+    totals = np.array(presence["sum"], dtype=np.float64)
+    maxima = np.array(presence["max"], dtype=np.float64)
+    maxima[maxima == 0] = 1  # Bande non normalisée si son max est nul
+    coverage = totals / maxima / (presence["height"] * presence["width"]) * 100
+    coverage[totals == 0] = 0  # Bande vide
+    return coverage
+
+
+def load_presence(tif_path):
+    """
+    Charge l'index de présence d'un raster, s'il existe et correspond encore au fichier.
+
+    Args:
+        tif_path (str): Chemin du raster de labels.
+
+    Returns:
+        dict: Index de présence, ou None s'il est absent ou périmé.
+    """
+    try:
+        with open(sidecar_path(tif_path)) as f:
+            presence = json.load(f)
+    except (OSError, ValueError):
+        return None
+    stat = os.stat(tif_path)
+    if presence.get("mtime_ns") != stat.st_mtime_ns or presence.get("size") != stat.st_size:
+        return None
+    return presence
+
+
+def save_presence(tif_path, presence):
+    """
+    Enregistre l'index de présence à côté du raster.
+
+    Args:
+        tif_path (str): Chemin du raster de labels.
+        presence (dict): Index de présence.
+
+    Returns:
+        bool: True si l'index a été écrit (False si le dossier est en lecture seule).
+    """
+    stat = os.stat(tif_path)
+    presence = dict(presence, mtime_ns=stat.st_mtime_ns, size=stat.st_size)
+    try:
+        with open(sidecar_path(tif_path), "w") as f:
+            json.dump(presence, f)
+    except OSError as e:
+        print(f"Index de classes non enregistré pour {tif_path} : {e}")
+        return False
+    return True
+
+
+def get_presence(dataset, write=True, n_classes=None):
+    """
+    Index de présence d'un raster ouvert : lu depuis le fichier d'index, sinon calculé une fois.
+
+    Args:
+        dataset (rasterio.DatasetReader): Raster de labels ouvert.
+        write (bool, optional): Enregistre l'index calculé. Par défaut : True.
+        n_classes (int, optional): Nombre de classes. Par défaut : toutes les bandes.
+
+    Returns:
+        dict: Index de présence.
+    """
+    presence = load_presence(dataset.name)
+    record_cache("presence_index", presence is not None)
+    if presence is None or (n_classes is not None and len(presence["sum"]) < n_classes):
+        presence = compute_presence(dataset, n_classes)
+        if write:
+            save_presence(dataset.name, presence)
+    return presence
+
+
+def band_has_data(dataset, band):
+    """
+    Indique si une bande contient au moins un pixel non nul, en s'arrêtant au premier bloc non nul.
+
+    Args:
+        dataset (rasterio.DatasetReader): Raster ouvert.
+        band (int): Numéro de la bande.
+
+    Returns:
+        bool: True si la bande contient des données non nulles.
+    """
+    for window in iter_block_windows(dataset, band):
+        data = dataset.read(band, window=window)
+        record_read(data)
+        if np.any(data):
+            return True
+    return False
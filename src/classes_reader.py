@@ -1,21 +1,47 @@
-import geopandas as gpd
 import rasterio
 import numpy as np
-import matplotlib.pyplot as plt
+from rasterio.enums import Resampling
+from src.class_index import (
+    N_CLASSES_TAG,
+    ONEHOT_DTYPE_TAG,
+    ONEHOT_VALUE_TAG,
+    is_class_index,
+    onehot_to_class_index,
+)
+from src.class_presence import band_has_data, get_presence, load_presence
+from src.instrumentation import profiled, record_alloc, record_cache, record_read
+from src.overviews import build_overviews, has_overviews, read_preview
+from src.sat_image_reader import current_axes
 
 
 class ClassesReader:
-    def __init__(self, file_path):
+    def __init__(self, file_path, pool=None):
         """
         Classe pour lire et manipuler un fichier raster avec Rasterio.
 
+        Le fichier peut être un raster one-hot (une bande par classe) ou un raster
+        d'indices de classe produit par `class_index.encode_class_index` : les
+        classes sont alors lues depuis l'unique bande, comme des bandes virtuelles.
+        Utilisable comme gestionnaire de contexte : le fichier est fermé (ou rendu
+        au pool) à la sortie du bloc `with`.
+
         Args:
             file_path (str): Chemin vers le fichier raster.
+            pool (DatasetPool, optional): Pool de rasters ouverts partagé entre lecteurs.
         """
         self.file_path = file_path
+        self.pool = pool
+        self.image = None
         try:
-            self.image = rasterio.open(self.file_path)
-            self.bandes = self.image.count
+            self.image = pool.acquire(file_path) if pool is not None else rasterio.open(self.file_path)
+            self.class_index = is_class_index(self.image)
+            if self.class_index:
+                tags = self.image.tags()
+                self.bandes = int(tags.get(N_CLASSES_TAG, 7))
+                self.onehot_dtype = np.dtype(tags.get(ONEHOT_DTYPE_TAG, "uint8"))
+                self.onehot_value = self.onehot_dtype.type(float(tags.get(ONEHOT_VALUE_TAG, 1)))
+            else:
+                self.bandes = self.image.count
             self.metadata = self.image.meta
             self.dict_classes = {
                 "Impervious surfaces": 1,
@@ -34,17 +60,84 @@ class ClassesReader:
             print(f"Erreur lors de l'ouverture du fichier : {e}")
             raise SystemExit(e)
 
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def close(self):
+        """Ferme l'image raster, ou la rend au pool où elle reste ouverte."""
+        image, self.image = getattr(self, "image", None), None
+        if image is None:
+            return
+        if self.pool is not None:
+            self.pool.release(image)
+        elif not image.closed:
+            image.close()
+
     def __del__(self):
         """Ferme l'image raster lors de la suppression de l'instance."""
-        if self.image and not self.image.closed:
-            self.image.close()
+        self.close()
 
-    def show_band(self, band=1):
+    @profiled
+    def read_class(self, classe, target_size=None):
+        """
+        Lit la bande (one-hot) d'une classe, quel que soit l'encodage du fichier.
+
+        Args:
+            classe (int): Numéro de la classe (= numéro de bande one-hot).
+            target_size (int, optional): Taille maximale (en pixels) pour une lecture réduite.
+
+        Returns:
+            np.array: Bande one-hot de la classe.
+        """
+        if not self.class_index:
+            if target_size is not None:
+                data = read_preview(self.image, classe, target_size)
+            else:
+                data = self.image.read(classe)
+            record_read(data)
+            return data
+        index = self.read_class_index(target_size)
+        data = np.where(index == classe, self.onehot_value, 0).astype(self.onehot_dtype)
+        record_alloc(data)
+        return data
+
+    @profiled
+    def read_class_index(self, target_size=None):
+        """
+        Lit les labels sous forme d'indices de classe (uint8, 0 = aucune classe).
+
+        Args:
+            target_size (int, optional): Taille maximale (en pixels) pour une lecture réduite.
+
+        Returns:
+            np.array: Indices de classe (hauteur, largeur).
+        """
+        if self.class_index:
+            if target_size is not None:
+                index = read_preview(self.image, 1, target_size)
+            else:
+                index = self.image.read(1)
+            record_read(index)
+            return index
+        if target_size is not None:
+            onehot = read_preview(self.image, list(range(1, self.bandes + 1)), target_size)
+        else:
+            onehot = self.image.read()
+        record_read(onehot)
+        return onehot_to_class_index(onehot)
+
+    @profiled
+    def show_band(self, band=1, ax=None):
         """
         Affiche une bande spécifique de l'image.
 
         Args:
             band (int, optional): Numéro de la bande à afficher. Par défaut : 1.
+            ax (matplotlib.axes.Axes, optional): Axes où dessiner (ex. `Renderer.axes()` pour un
+                rendu hors écran, sans `plt.show()`). Par défaut : axes courants de pyplot.
 
         Raises:
             SystemExit: Si la bande n'existe pas.
@@ -55,31 +148,44 @@ class ClassesReader:
         if band < 1 or band > self.bandes:
             raise SystemExit(f"Bande {band} introuvable.")
         
-        data = self.image.read(band)
-        plt.imshow(data, cmap="gray")
-        plt.colorbar(label="Valeurs des pixels")
-        plt.title(f"Bande {band}")
-        plt.axis("off")
-        plt.show()
+        data = self.read_class(band)
+        interactive = ax is None
+        ax = current_axes(ax)
+        image = ax.imshow(data, cmap="gray")
+        ax.figure.colorbar(image, ax=ax, label="Valeurs des pixels")
+        ax.set_title(f"Bande {band}")
+        ax.axis("off")
+        if interactive:
+            import matplotlib.pyplot as plt
+
+            plt.show()
         return data
 
-    def show_class(self, classe):
+    @profiled
+    def show_class(self, classe, ax=None):
         """
         Affiche une classe spécifique de l'image.
 
         Args:
             classe (int): Numéro de la classe à afficher.
+            ax (matplotlib.axes.Axes, optional): Axes où dessiner (ex. `Renderer.axes()` pour un
+                rendu hors écran, sans `plt.show()`). Par défaut : axes courants de pyplot.
 
         Returns:
             np.array: Données de la classe affichée.
         """
-        data = self.image.read(classe)
+        data = self.read_class(classe)
         classe_name = self.reverse_dict_classes.get(classe, f"Unknown Class ({classe})")
-        plt.imshow(data, cmap="BuGn")
-        plt.colorbar(label="Valeurs des pixels")
-        plt.title(f"Classe : {classe_name}")
-        plt.axis("off")
-        plt.show()
+        interactive = ax is None
+        ax = current_axes(ax)
+        image = ax.imshow(data, cmap="BuGn")
+        ax.figure.colorbar(image, ax=ax, label="Valeurs des pixels")
+        ax.set_title(f"Classe : {classe_name}")
+        ax.axis("off")
+        if interactive:
+            import matplotlib.pyplot as plt
+
+            plt.show()
         return data
 
     def get_n_bands(self):
@@ -91,26 +197,85 @@ class ClassesReader:
         """
         return self.bandes
 
-    def detect_classes(self):
+    @profiled
+    def detect_classes(self, use_index=True):
         """
         Détecte les classes présentes dans le fichier raster.
 
+        L'index de présence (fichier `.classes.json`) est utilisé s'il est à jour :
+        aucun pixel n'est alors décodé. Sinon, chaque bande est parcourue bloc par
+        bloc jusqu'au premier bloc non nul.
+
+        Args:
+            use_index (bool, optional): Utilise l'index de présence s'il existe. Par défaut : True.
+
         Returns:
             list: Numéros des bandes où des classes sont présentes.
         """
+        if use_index:
+            presence = load_presence(self.file_path)
+            record_cache("presence_index", presence is not None)
+            if presence is not None and len(presence["count"]) >= self.bandes:
+                return [i for i in range(1, self.bandes + 1) if presence["count"][i - 1]]
+
+        if self.class_index:
+            # Une seule bande à lire : comptage de toutes les classes en une passe
+            index = self.image.read(1)
+            record_read(index)
+            counts = np.bincount(index.ravel(), minlength=self.bandes + 1)
+            return [i for i in range(1, self.bandes + 1) if counts[i]]
+
         classes = []
         for i in range(1, self.bandes + 1):
-            data = self.image.read(i)
-            if np.any(data):  # Vérifie si la bande contient des données non nulles
+            if band_has_data(self.image, i):  # Arrêt au premier bloc non nul
                 classes.append(i)
         return classes
 
-    def show_class_list(self, class_list=None):
+    @profiled
+    def class_pixel_counts(self, write=True):
+        """
+        Nombre de pixels de chaque classe, depuis l'index de présence (calculé une fois si absent).
+
+        Args:
+            write (bool, optional): Enregistre l'index s'il doit être calculé. Par défaut : True.
+
+        Returns:
+            dict: Nombre de pixels par numéro de classe.
+        """
+        presence = get_presence(self.image, write=write, n_classes=self.bandes)
+        return {i: presence["count"][i - 1] for i in range(1, self.bandes + 1)}
+
+    def build_overviews(self, force=False):
+        """
+        Construit les aperçus internes du fichier (plus proche voisin, pour garder des labels valides).
+
+        Les aperçus sont écrits dans le fichier et conservés pour les lectures suivantes.
+
+        Args:
+            force (bool, optional): Reconstruit les aperçus même s'ils existent déjà. Par défaut : False.
+        """
+        if has_overviews(self.image) and not force:
+            return
+        pool = self.pool
+        self.close()
+        if pool is not None:
+            pool.invalidate(self.file_path)
+        try:
+            build_overviews(self.file_path, resampling=Resampling.nearest)
+        finally:
+            self.image = pool.acquire(self.file_path) if pool is not None else rasterio.open(self.file_path)
+
+    @profiled
+    def show_class_list(self, class_list=None, target_size=None, figure=None):
         """
         Affiche une liste de classes de l'image.
 
         Args:
             class_list (list, optional): Liste des classes à afficher. Par défaut : détecte automatiquement les classes.
+            target_size (int, optional): Taille maximale de chaque affichage (en pixels). Les classes
+                sont alors lues depuis les aperçus internes ou par lecture décimée.
+            figure (matplotlib.figure.Figure, optional): Figure où dessiner (ex. `Renderer.figure()`
+                pour un rendu hors écran, sans `plt.show()`). Par défaut : nouvelle figure pyplot.
 
         Returns:
             list[np.array]: Liste des données des classes affichées.
@@ -120,20 +285,28 @@ class ClassesReader:
         
         class_list_data = []
         num_classes = len(class_list)
-        fig, axes = plt.subplots(1, num_classes, figsize=(5 * num_classes, 5))
+        interactive = figure is None
+        if interactive:
+            import matplotlib.pyplot as plt
+
+            figure = plt.figure(figsize=(5 * num_classes, 5))
+        else:
+            figure.set_size_inches(5 * num_classes, 5)
+        axes = figure.subplots(1, num_classes)
         
         if num_classes == 1:  # Gère un cas où il n'y a qu'une seule classe
             axes = [axes]
 
         for i, classe in enumerate(class_list):
             ax = axes[i]
-            data = self.image.read(classe)
+            data = self.read_class(classe, target_size)
             ax.imshow(data, cmap="BuGn")
             classe_name = self.reverse_dict_classes.get(classe, f"Unknown Class ({classe})")
             ax.set_title(f"Classe : {classe_name}")
             ax.axis("off")
             class_list_data.append(data)
 
-        plt.tight_layout()
-        plt.show()
+        figure.tight_layout()
+        if interactive:
+            plt.show()
         return class_list_data
@@ -0,0 +1,286 @@
+import os
+import warnings
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+import numpy as np
+import rasterio
+from rasterio.windows import Window
+from src.catalog import extract_date
+from src.instrumentation import profiled, record_alloc, record_read
+
+METHODS = ("median", "mean", "max_ndvi")
+
+
+def select_scenes(file_paths, start=None, end=None):
+    """
+    Sélectionne les scènes datées d'un intervalle, triées par date.
+
+    Args:
+        file_paths (list[str]): Chemins des scènes (date dans le nom).
+        start (str, optional): Première date incluse (AAAA-MM-JJ).
+        end (str, optional): Dernière date incluse (AAAA-MM-JJ).
+
+    Returns:
+        list[tuple]: (date, chemin) des scènes retenues.
+    """
+    dated = sorted((extract_date(path), path) for path in file_paths if extract_date(path) is not None)
+    return [
+        (date, path)
+        for date, path in dated
+        if (start is None or date >= start) and (end is None or date <= end)
+    ]
+
+
+def group_by_month(file_paths):
+    """
+    Regroupe les scènes datées par mois.
+
+    Args:
+        file_paths (list[str]): Chemins des scènes (date dans le nom).
+
+    Returns:
+        dict: Chemins triés par date, pour chaque mois "AAAA-MM".
+    """
+    months = {}
+    for date, path in select_scenes(file_paths):
+        months.setdefault(date[:7], []).append(path)
+    return months
+
+
+class TemporalCompositor:
+    """
+    Composite temporel (médiane, moyenne ou pixel de NDVI maximal) d'une pile de scènes.
+
+    Les scènes doivent partager la même grille. Le composite est calculé fenêtre
+    par fenêtre : pour chaque fenêtre, les bandes de toutes les scènes sont lues
+    (en float32, par GDAL) dans une pile préallouée, réutilisée d'une fenêtre à
+    l'autre. La mémoire est bornée par la taille des fenêtres et le nombre de
+    scènes, pas par la taille des images. Les pixels à `nodata` (ou NaN) d'une
+    scène sont ignorés ; un pixel sans aucune observation valide vaut NaN.
+    """
+
+    def __init__(self, file_paths, method="median", bands=None, red_band=3, nir_band=4, nodata=None, block_size=256):
+        """
+        Initialise le compositeur.
+
+        Args:
+            file_paths (list[str]): Chemins des scènes à combiner.
+            method (str, optional): "median", "mean" ou "max_ndvi". Par défaut : "median".
+            bands (list[int], optional): Bandes à combiner. Par défaut : toutes.
+            red_band (int, optional): Bande rouge (méthode "max_ndvi"). Par défaut : 3.
+            nir_band (int, optional): Bande infrarouge (méthode "max_ndvi"). Par défaut : 4.
+            nodata (float, optional): Valeur des pixels invalides. Par défaut : celle des scènes.
+            block_size (int, optional): Côté des fenêtres de calcul (pixels). Par défaut : 256.
+
+        Raises:
+            ValueError: Si la méthode est inconnue, si aucune scène n'est fournie ou si les
+                scènes n'ont pas la même grille.
+        """
+        if method not in METHODS:
+            raise ValueError(f"Méthode de composite inconnue : {method}")
+        if not file_paths:
+            raise ValueError("Aucune scène à combiner")
+        self.file_paths = list(file_paths)
+        self.method = method
+        self.block_size = block_size
+
+        with rasterio.open(self.file_paths[0]) as src:
+            self.bands = list(bands) if bands is not None else list(range(1, src.count + 1))
+            self.height = src.height
+            self.width = src.width
+            self.profile = src.profile.copy()
+            self.nodata = nodata if nodata is not None else src.nodata
+            grid = (src.width, src.height, src.transform, src.crs)
+        for path in self.file_paths[1:]:
+            with rasterio.open(path) as src:
+                if (src.width, src.height, src.transform, src.crs) != grid:
+                    raise ValueError(f"Grille incohérente pour {path}")
+
+        if method == "max_ndvi":
+            missing = [band for band in (red_band, nir_band) if band not in self.bands]
+            if missing:
+                raise ValueError(f"Bandes absentes de la sélection : {missing}")
+            self._red = self.bands.index(red_band)
+            self._nir = self.bands.index(nir_band)
+
+        self._datasets = None
+        self._buffers = {}
+
+    def _buffer(self, name, shape, dtype=np.float32):
+        """Retourne un tampon réutilisable pour une forme de fenêtre donnée."""
+        key = (name, shape)
+        if key not in self._buffers:
+            self._buffers[key] = np.empty(shape, dtype=dtype)
+            record_alloc(self._buffers[key])
+        return self._buffers[key]
+
+    def _open(self):
+        """Ouvre les scènes (une seule fois par processus)."""
+        if self._datasets is None:
+            self._datasets = [rasterio.open(path) for path in self.file_paths]
+        return self._datasets
+
+    def close(self):
+        """Ferme les scènes ouvertes."""
+        if self._datasets is not None:
+            for dataset in self._datasets:
+                dataset.close()
+            self._datasets = None
+
+    def windows(self):
+        """
+        Fenêtres de calcul couvrant l'image.
+
+        Returns:
+            list[rasterio.windows.Window]: Fenêtres de `block_size` pixels de côté (au plus).
+        """
+        return [
+            Window(col_off, row_off, min(self.block_size, self.width - col_off), min(self.block_size, self.height - row_off))
+            for row_off in range(0, self.height, self.block_size)
+            for col_off in range(0, self.width, self.block_size)
+        ]
+
+    def composite_window(self, window):
+        """
+        Calcule le composite d'une fenêtre.
+
+        Args:
+            window (rasterio.windows.Window): Fenêtre à calculer.
+
+        Returns:
+            np.array: Composite (bandes, hauteur, largeur) en float32.
+        """
+        datasets = self._open()
+        shape = (int(window.height), int(window.width))
+        stack = self._buffer("stack", (len(datasets), len(self.bands)) + shape)
+        invalid = self._buffer("invalid", (len(datasets),) + shape, dtype=bool)
+        for t, dataset in enumerate(datasets):
+            dataset.read(self.bands, window=window, out=stack[t])
+            np.isnan(stack[t]).any(axis=0, out=invalid[t])
+            if self.nodata is not None:
+                invalid[t] |= (stack[t] == self.nodata).any(axis=0)
+        record_read(stack)
+
+        result = np.empty((len(self.bands),) + shape, dtype=np.float32)
+        if self.method == "max_ndvi":
+            return self._best_ndvi(stack, invalid, result)
+
+        for t in range(len(datasets)):
+            stack[t][:, invalid[t]] = np.nan
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore", RuntimeWarning)  # Pixels sans observation valide
+            if self.method == "median":
+                np.nanmedian(stack, axis=0, out=result, overwrite_input=True)
+            else:
+                np.nanmean(stack, axis=0, out=result)
+        return result
+
+    def _best_ndvi(self, stack, invalid, result):
+        """Retient, pour chaque pixel, la scène valide de NDVI maximal."""
+        ndvi = self._buffer("ndvi", invalid.shape)
+        denominator = self._buffer("denominator", invalid.shape)
+        red = stack[:, self._red]
+        nir = stack[:, self._nir]
+        np.add(nir, red, out=denominator)
+        np.subtract(nir, red, out=ndvi)
+        np.divide(ndvi, denominator, out=ndvi, where=denominator != 0)
+        ndvi[denominator == 0] = 0
+        ndvi[invalid] = -np.inf
+
+        best = np.argmax(ndvi, axis=0)
+        result[:] = np.take_along_axis(stack, best[None, None], axis=0)[0]
+        result[:, invalid.all(axis=0)] = np.nan
+        return result
+
+    @profiled
+    def write(self, output_path, max_workers=None):
+        """
+        Calcule le composite en parallèle sur les fenêtres et l'écrit dans un GeoTIFF tuilé.
+
+        Chaque processus ouvre les scènes une seule fois et réutilise ses piles ;
+        le nombre de fenêtres en attente d'écriture est limité, pour une mémoire
+        bornée quelle que soit la taille de l'image.
+
+        Args:
+            output_path (str): Chemin du GeoTIFF à écrire (float32, une bande par bande combinée).
+            max_workers (int, optional): Nombre de processus. Par défaut : nombre de cœurs.
+
+        Returns:
+            str: Chemin du fichier écrit.
+        """
+        profile = self.profile.copy()
+        profile.update(
+            driver="GTiff",
+            count=len(self.bands),
+            dtype="float32",
+            nodata=np.nan,
+            tiled=True,
+            blockxsize=256,
+            blockysize=256,
+            compress="deflate",
+        )
+        max_workers = max_workers or os.cpu_count()
+        max_pending = 2 * max_workers
+        windows = [window.flatten() for window in self.windows()]
+        with rasterio.open(output_path, "w", **profile) as dst, ProcessPoolExecutor(
+            max_workers=max_workers,
+            initializer=_init_worker,
+            initargs=(self,),
+        ) as executor:
+            pending = set()
+            for window in windows:
+                if len(pending) >= max_pending:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    _write_results(dst, done)
+                pending.add(executor.submit(_composite_window, window))
+            _write_results(dst, wait(pending).done)
+            dst.update_tags(method=self.method, scenes=len(self.file_paths))
+        return output_path
+
+    def __getstate__(self):
+        # Les rasters ouverts et les tampons ne sont pas transmis aux processus
+        state = self.__dict__.copy()
+        state["_datasets"] = None
+        state["_buffers"] = {}
+        return state
+
+
+# Compositeur propre à chaque processus du pool, avec ses rasters ouverts et ses piles
+_worker_compositor = None
+
+
+def _init_worker(compositor):
+    global _worker_compositor
+    _worker_compositor = compositor
+
+
+def _composite_window(window):
+    return window, _worker_compositor.composite_window(Window(*window))
+
+
+def _write_results(dst, futures):
+    for future in futures:
+        window, data = future.result()
+        dst.write(data, window=Window(*window))
+
+
+def monthly_composites(file_paths, output_dir, method="median", max_workers=None, **options):
+    """
+    Écrit un composite par mois (`<output_dir>/composite_<AAAA-MM>_<méthode>.tif`).
+
+    Args:
+        file_paths (list[str]): Chemins des scènes datées d'une AOI.
+        output_dir (str): Dossier des composites.
+        method (str, optional): "median", "mean" ou "max_ndvi". Par défaut : "median".
+        max_workers (int, optional): Nombre de processus. Par défaut : nombre de cœurs.
+        **options: Autres paramètres de `TemporalCompositor` (bands, red_band, nir_band, nodata).
+
+    Returns:
+        dict: Chemin du composite écrit, pour chaque mois "AAAA-MM".
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    results = {}
+    for month, paths in group_by_month(file_paths).items():
+        compositor = TemporalCompositor(paths, method, **options)
+        output_path = os.path.join(output_dir, f"composite_{month}_{method}.tif")
+        results[month] = compositor.write(output_path, max_workers)
+    return results
@@ -0,0 +1,207 @@
+import json
+import numbers
+import os
+import numpy as np
+import rasterio
+from rasterio.windows import Window
+from src.catalog import extract_date, list_tif_files
+from src.raster_windows import iter_block_windows
+
+
+class DataCube:
+    """
+    Cube temporel (temps, bande, y, x) construit sur un dossier de .tif datés.
+
+    Les données sont stockées dans un tableau .npy mappé en mémoire (memmap)
+    sur disque. Une date n'est lue depuis son GeoTIFF (bloc par bloc) qu'au
+    premier accès, puis reste disponible dans le cache pour les sessions
+    suivantes. La série temporelle d'un pixel peut être extraite sans charger
+    les autres pixels.
+    """
+
+    def __init__(self, folder_path, cache_dir=None, bands=None):
+        """
+        Initialise le cube à partir des fichiers .tif datés du dossier.
+
+        Args:
+            folder_path (str): Dossier contenant les fichiers .tif (date dans le nom, comme pour
+                `GroundTruth.mask_evolution`).
+            cache_dir (str, optional): Dossier du cache memmap. Par défaut : `<folder_path>/.datacube`.
+            bands (list[int], optional): Bandes à conserver. Par défaut : toutes.
+
+        Raises:
+            ValueError: Si aucun fichier daté n'est trouvé.
+        """
+        self.folder_path = folder_path
+        self.cache_dir = cache_dir or os.path.join(folder_path, ".datacube")
+
+        dated = [(extract_date(path), path) for path in list_tif_files(folder_path)]
+        dated = sorted((date, path) for date, path in dated if date is not None)
+        if not dated:
+            raise ValueError(f"Aucun fichier .tif daté dans {folder_path}")
+        self.dates = [date for date, _ in dated]
+        self.paths = [path for _, path in dated]
+
+        with rasterio.open(self.paths[0]) as src:
+            self.bands = list(bands) if bands is not None else list(range(1, src.count + 1))
+            self.height = src.height
+            self.width = src.width
+            self.dtype = np.dtype(src.dtypes[self.bands[0] - 1])
+            self.profile = src.profile.copy()
+
+        self.shape = (len(self.paths), len(self.bands), self.height, self.width)
+        self._open_cache()
+
+    def _index(self):
+        """Description des fichiers sources, pour valider le cache existant."""
+        return {
+            "paths": self.paths,
+            "mtimes": [os.stat(path).st_mtime_ns for path in self.paths],
+            "bands": self.bands,
+            "shape": list(self.shape),
+            "dtype": self.dtype.str,
+        }
+
+    def _open_cache(self):
+        """Ouvre le memmap existant s'il correspond aux fichiers, sinon le recrée."""
+        os.makedirs(self.cache_dir, exist_ok=True)
+        data_path = os.path.join(self.cache_dir, "cube.npy")
+        loaded_path = os.path.join(self.cache_dir, "loaded.npy")
+        index_path = os.path.join(self.cache_dir, "index.json")
+
+        index = self._index()
+        previous = None
+        if os.path.exists(index_path):
+            with open(index_path) as f:
+                previous = json.load(f)
+
+        if previous == index and os.path.exists(data_path) and os.path.exists(loaded_path):
+            self.data = np.lib.format.open_memmap(data_path, mode="r+")
+            self.loaded = np.lib.format.open_memmap(loaded_path, mode="r+")
+            return
+
+        self.data = np.lib.format.open_memmap(data_path, mode="w+", dtype=self.dtype, shape=self.shape)
+        self.loaded = np.lib.format.open_memmap(loaded_path, mode="w+", dtype=bool, shape=(self.shape[0],))
+        with open(index_path, "w") as f:
+            json.dump(index, f)
+
+    def __len__(self):
+        return self.shape[0]
+
+    def time_index(self, key):
+        """
+        Convertit une date, un entier ou une tranche (de dates ou d'entiers) en indices temporels.
+
+        Args:
+            key (str | int | slice): Date "AAAA-MM-JJ", indice, ou tranche. Les bornes d'une
+                tranche de dates sont incluses.
+
+        Returns:
+            list[int]: Indices temporels sélectionnés.
+        """
+        if isinstance(key, str):
+            if key not in self.dates:
+                raise KeyError(f"Date absente du cube : {key}")
+            return [self.dates.index(key)]
+        if isinstance(key, slice) and (isinstance(key.start, str) or isinstance(key.stop, str)):
+            times = [
+                t
+                for t, date in enumerate(self.dates)
+                if (key.start is None or date >= key.start) and (key.stop is None or date <= key.stop)
+            ]
+            return times[::key.step]
+        return list(range(len(self)))[key] if isinstance(key, slice) else [range(len(self))[key]]
+
+    def materialize(self, t):
+        """
+        Copie une date dans le cache memmap, bloc par bloc, si ce n'est pas déjà fait.
+
+        Args:
+            t (int): Indice temporel.
+        """
+        if self.loaded[t]:
+            return
+        with rasterio.open(self.paths[t]) as src:
+            if (src.height, src.width) != (self.height, self.width):
+                raise ValueError(f"Dimensions incohérentes pour {self.paths[t]}")
+            for window in iter_block_windows(src, self.bands[0]):
+                rows, cols = window.toslices()
+                self.data[t, :, rows, cols] = src.read(self.bands, window=window)
+        self.data.flush()
+        self.loaded[t] = True
+        self.loaded.flush()
+
+    def load_all(self):
+        """Copie toutes les dates dans le cache memmap."""
+        for t in range(len(self)):
+            self.materialize(t)
+
+    def __getitem__(self, key):
+        """
+        Sélection paresseuse : cube[temps, bandes, lignes, colonnes].
+
+        Le premier indice accepte une date, un entier ou une tranche (avec pas éventuel).
+        Seules les dates sélectionnées sont chargées. Le résultat est une vue sur le
+        memmap, sauf pour une tranche de dates avec un pas (copie).
+        """
+        if not isinstance(key, tuple):
+            key = (key,)
+        times = self.time_index(key[0])
+        for t in times:
+            self.materialize(t)
+        if isinstance(key[0], (str, numbers.Integral)):
+            return self.data[(times[0],) + key[1:]]
+        if not times:
+            return self.data[(slice(0, 0),) + key[1:]]
+        if isinstance(key[0], slice) and not isinstance(key[0].start, str) and not isinstance(key[0].stop, str):
+            return self.data[key]  # Tranche d'entiers (pas, indices négatifs) : vue sur le memmap
+        if times == list(range(times[0], times[-1] + 1)):
+            return self.data[(slice(times[0], times[-1] + 1),) + key[1:]]
+        return self.data[(times,) + key[1:]]  # Sélection non contiguë : copie
+
+    def read(self, date, window=None, bands=None):
+        """
+        Lit une date, éventuellement sur une fenêtre et un sous-ensemble de bandes.
+
+        Args:
+            date (str | int): Date "AAAA-MM-JJ" ou indice temporel.
+            window (rasterio.windows.Window, optional): Fenêtre à lire. Par défaut : toute l'image.
+            bands (list[int], optional): Bandes (numéros du raster) à lire. Par défaut : toutes.
+
+        Returns:
+            np.array: Données (bandes, hauteur, largeur), vue sur le memmap.
+        """
+        t = self.time_index(date)[0]
+        self.materialize(t)
+        band_idx = slice(None) if bands is None else [self.bands.index(band) for band in bands]
+        if window is None:
+            return self.data[t, band_idx]
+        rows, cols = window.toslices()
+        return self.data[t, band_idx, rows, cols]
+
+    def pixel_series(self, row, col, bands=None):
+        """
+        Série temporelle complète d'un pixel, sans charger les autres pixels.
+
+        Les dates déjà en cache sont lues dans le memmap. Les autres sont lues
+        directement dans leur GeoTIFF sur une fenêtre 1×1, sans être chargées.
+
+        Args:
+            row (int): Ligne du pixel.
+            col (int): Colonne du pixel.
+            bands (list[int], optional): Bandes (numéros du raster). Par défaut : toutes.
+
+        Returns:
+            np.array: Série (temps, bandes).
+        """
+        bands = self.bands if bands is None else list(bands)
+        band_idx = [self.bands.index(band) for band in bands]
+        series = np.empty((len(self), len(bands)), dtype=self.dtype)
+        window = Window(col, row, 1, 1)
+        for t, path in enumerate(self.paths):
+            if self.loaded[t]:
+                series[t] = self.data[t, band_idx, row, col]
+            else:
+                with rasterio.open(path) as src:
+                    series[t] = src.read(bands, window=window)[:, 0, 0]
+        return series
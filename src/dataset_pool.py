@@ -0,0 +1,199 @@
+import os
+import threading
+from collections import OrderedDict
+import rasterio
+from rasterio.env import set_gdal_config
+from src.instrumentation import record_cache
+
+
+def set_gdal_cache_max(megabytes):
+    """
+    Fixe la taille du cache de blocs GDAL (GDAL_CACHEMAX).
+
+    GDAL lit cette valeur à l'initialisation de son cache : à appeler avant les
+    premières lectures du processus.
+
+    Args:
+        megabytes (int): Taille du cache en Mo.
+    """
+    set_gdal_config("GDAL_CACHEMAX", int(megabytes))
+
+
+def file_signature(file_path):
+    """
+    Identité d'un raster, pour détecter qu'il a changé.
+
+    Un fichier local est identifié par son chemin absolu, sa date de modification
+    et sa taille. Les autres chemins acceptés par rasterio (`/vsicurl/...`,
+    `s3://...`, `/vsizip/...`) ne peuvent pas être examinés avec `os.stat` : ils
+    sont identifiés par le chemin tel quel, sans contrôle de modification.
+
+    Args:
+        file_path (str): Chemin ou URL du raster.
+
+    Returns:
+        tuple: (chemin absolu, mtime en ns, taille) ou (chemin,).
+    """
+    if not os.path.exists(file_path):
+        return (file_path,)
+    path = os.path.abspath(file_path)
+    stat = os.stat(path)
+    return (path, stat.st_mtime_ns, stat.st_size)
+
+
+class DatasetPool:
+    """
+    Pool LRU borné de rasters rasterio ouverts, partagé entre les lecteurs.
+
+    Un jeu de données rasterio ne doit pas être lu depuis plusieurs threads à la
+    fois : chaque entrée est donc propre à un (chemin, thread). Réutiliser une
+    entrée évite de réouvrir le fichier et d'en relire l'en-tête ; une entrée dont
+    le fichier local a changé (mtime, taille) est rouverte ; les chemins VSI et
+    les URL sont gardés tels quels, sans ce contrôle. Seules les entrées non
+    utilisées (compteur de références nul) sont fermées au-delà de `max_open`.
+    """
+
+    def __init__(self, max_open=64, gdal_cache_mb=None):
+        """
+        Initialise le pool.
+
+        Args:
+            max_open (int, optional): Nombre maximal de fichiers gardés ouverts. Par défaut : 64.
+            gdal_cache_mb (int, optional): Taille du cache de blocs GDAL (Mo). Par défaut : inchangée.
+        """
+        self.max_open = max_open
+        self._entries = OrderedDict()  # (chemin, thread) -> [dataset, références, (mtime, taille)]
+        self._stale = {}  # Rasters périmés encore utilisés, fermés à leur libération
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        if gdal_cache_mb is not None:
+            set_gdal_cache_max(gdal_cache_mb)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def acquire(self, file_path):
+        """
+        Renvoie le raster ouvert pour le thread courant (ouvert si besoin) et le réserve.
+
+        Chaque `acquire` doit être suivi d'un `release`.
+
+        Args:
+            file_path (str): Chemin du raster.
+
+        Returns:
+            rasterio.DatasetReader: Raster ouvert.
+        """
+        path, *signature = file_signature(file_path)
+        key = (path, threading.get_ident())
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and not entry[0].closed and entry[2] == signature:
+                entry[1] += 1
+                self._entries.move_to_end(key)
+                self.hits += 1
+                record_cache("dataset_pool", True)
+                return entry[0]
+            if entry is not None:  # Fichier modifié depuis l'ouverture
+                del self._entries[key]
+                if entry[1] == 0:
+                    entry[0].close()
+                else:
+                    self._stale[id(entry[0])] = entry
+            self.misses += 1
+        record_cache("dataset_pool", False)
+        # La clé est propre au thread courant : l'ouverture peut se faire hors verrou
+        dataset = rasterio.open(path)
+        with self._lock:
+            self._entries[key] = [dataset, 1, signature]
+            self._evict()
+        return dataset
+
+    def release(self, dataset):
+        """
+        Libère un raster obtenu par `acquire` (il reste ouvert dans le pool).
+
+        Args:
+            dataset (rasterio.DatasetReader): Raster à libérer.
+        """
+        with self._lock:
+            stale = self._stale.get(id(dataset))
+            if stale is not None:
+                stale[1] -= 1
+                if stale[1] == 0:
+                    del self._stale[id(dataset)]
+                    dataset.close()
+                return
+            for entry in self._entries.values():
+                if entry[0] is dataset:
+                    entry[1] = max(0, entry[1] - 1)
+                    break
+            self._evict()
+
+    def invalidate(self, file_path):
+        """
+        Ferme les rasters non utilisés d'un fichier (ex. avant de le modifier).
+
+        Args:
+            file_path (str): Chemin du raster.
+        """
+        path = file_signature(file_path)[0]
+        with self._lock:
+            for key in [key for key, entry in self._entries.items() if key[0] == path and entry[1] == 0]:
+                self._entries.pop(key)[0].close()
+
+    def _evict(self):
+        """Ferme les entrées non utilisées les moins récemment servies au-delà de `max_open`."""
+        excess = len(self._entries) - self.max_open
+        if excess <= 0:
+            return
+        for key in [key for key, entry in self._entries.items() if entry[1] == 0][:excess]:
+            self._entries.pop(key)[0].close()
+            self.evictions += 1
+
+    def close(self):
+        """Ferme tous les rasters du pool."""
+        with self._lock:
+            for dataset, _, _ in list(self._entries.values()) + list(self._stale.values()):
+                dataset.close()
+            self._entries.clear()
+            self._stale.clear()
+
+    def get_stats(self):
+        """
+        Retourne les compteurs du pool.
+
+        Returns:
+            dict: Compteurs "hits", "misses", "evictions", "open" et "hit_rate".
+        """
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "open": len(self._entries),
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
+
+
+_shared_pool = None
+_shared_lock = threading.Lock()
+
+
+def shared_pool():
+    """
+    Pool commun au processus, créé au premier appel.
+
+    Returns:
+        DatasetPool: Pool partagé.
+    """
+    global _shared_pool
+    with _shared_lock:
+        if _shared_pool is None:
+            _shared_pool = DatasetPool()
+        return _shared_pool
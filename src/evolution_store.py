@@ -0,0 +1,249 @@
+import datetime
+import os
+import uuid
+import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+# Schéma des fichiers Parquet (la colonne "aoi" est portée par le nom du dossier de partition)
+FILE_SCHEMA = pa.schema(
+    [
+        ("date", pa.date32()),
+        ("class", pa.int8()),
+        ("coverage", pa.float64()),
+    ]
+)
+PARTITIONING = ds.partitioning(pa.schema([("aoi", pa.string())]), flavor="hive")
+# Schéma du jeu de données complet : explicite pour qu'un stockage vide se relise en table vide
+DATASET_SCHEMA = FILE_SCHEMA.append(pa.field("aoi", pa.string()))
+
+
+class EvolutionStore:
+    """
+    Stockage Parquet des évolutions de classes de toutes les AOI.
+
+    Le jeu de données est partitionné par AOI (`<racine>/aoi=<id>/part-*.parquet`),
+    au format long : une ligne par (aoi, date, classe) avec la proportion de la
+    classe (%). Une exécution incrémentale n'ajoute qu'un fichier contenant les
+    dates absentes de la partition ; une date dont les proportions ont changé
+    (labels régénérés) entraîne la réécriture de la partition. Toutes les AOI
+    se relisent en une seule lecture projetée en mémoire.
+    """
+
+    def __init__(self, root_dir):
+        """
+        Initialise le stockage.
+
+        Args:
+            root_dir (str): Dossier racine du jeu de données Parquet (créé si besoin).
+        """
+        self.root_dir = root_dir
+        os.makedirs(root_dir, exist_ok=True)
+
+    def partition_dir(self, aoi):
+        """Dossier de la partition d'une AOI."""
+        return os.path.join(self.root_dir, f"aoi={aoi}")
+
+    def aois(self):
+        """
+        Liste des AOI présentes dans le stockage.
+
+        Returns:
+            list[str]: Identifiants des AOI, triés.
+        """
+        return sorted(
+            entry.name[len("aoi="):]
+            for entry in os.scandir(self.root_dir)
+            if entry.is_dir() and entry.name.startswith("aoi=")
+        )
+
+    def existing_dates(self, aoi):
+        """
+        Dates déjà enregistrées pour une AOI (seule la colonne "date" est lue).
+
+        Args:
+            aoi (str): Identifiant de l'AOI.
+
+        Returns:
+            set[str]: Dates au format AAAA-MM-JJ.
+        """
+        if not os.path.isdir(self.partition_dir(aoi)):
+            return set()
+        table = ds.dataset(self.partition_dir(aoi), schema=FILE_SCHEMA, format="parquet").to_table(columns=["date"])
+        return {date.isoformat() for date in table.column("date").to_pylist()}
+
+    def _partition_files(self, aoi):
+        """Fichiers Parquet de la partition d'une AOI."""
+        partition_dir = self.partition_dir(aoi)
+        if not os.path.isdir(partition_dir):
+            return []
+        return [entry.path for entry in os.scandir(partition_dir) if entry.name.endswith(".parquet")]
+
+    def _write_file(self, aoi, table):
+        """Écrit un fichier de la partition (fichier caché puis renommage : jamais lu incomplet)."""
+        partition_dir = self.partition_dir(aoi)
+        os.makedirs(partition_dir, exist_ok=True)
+        file_name = f"part-{uuid.uuid4().hex}.parquet"
+        tmp_path = os.path.join(partition_dir, f".{file_name}.tmp")
+        pq.write_table(table, tmp_path, compression="zstd")
+        os.replace(tmp_path, os.path.join(partition_dir, file_name))
+
+    def _rewrite(self, aoi, table, old_files):
+        """Remplace les fichiers `old_files` d'une partition par un seul fichier contenant `table`."""
+        self._write_file(aoi, table.sort_by([("date", "ascending"), ("class", "ascending")]))
+        for path in old_files:
+            os.remove(path)
+
+    def append(self, aoi, evol_matrix, dates):
+        """
+        Enregistre l'évolution d'une AOI : ajoute les nouvelles dates, remplace les dates modifiées.
+
+        Les dates absentes de la partition sont ajoutées dans un nouveau fichier.
+        Si les proportions d'une date déjà enregistrée ont changé (fichier de labels
+        régénéré ou corrigé), la partition est réécrite avec les nouvelles valeurs.
+        Les dates identiques ne sont pas réécrites.
+
+        Args:
+            aoi (str): Identifiant de l'AOI.
+            evol_matrix (np.array): Matrice d'évolution des masques (dates, classes).
+            dates (list[str]): Dates (AAAA-MM-JJ) de chaque ligne de la matrice.
+
+        Returns:
+            int: Nombre de lignes ajoutées ou remplacées (0 si rien n'a changé).
+
+        Raises:
+            ValueError: Si le nombre de dates ne correspond pas à la matrice.
+        """
+        if len(dates) != len(evol_matrix):
+            raise ValueError(f"{len(dates)} dates pour {len(evol_matrix)} lignes dans l'AOI {aoi}")
+        evol_matrix = np.asarray(evol_matrix, dtype=np.float64)
+        n_classes = evol_matrix.shape[1]
+
+        old_files = self._partition_files(aoi)
+        stored = {}  # date -> (classes, proportions) enregistrées
+        if old_files:
+            stored_table = ds.dataset(old_files, schema=FILE_SCHEMA, format="parquet").to_table()
+            stored_table = stored_table.sort_by([("date", "ascending"), ("class", "ascending")])
+            for date, classes, coverage in _group_by_date(stored_table):
+                stored[date] = (classes, coverage)
+
+        new_rows = []
+        changed = set()
+        seen = set()
+        expected_classes = np.arange(1, n_classes + 1)
+        for i, date in enumerate(dates):
+            if date in seen:  # Une date en double dans l'entrée n'est écrite qu'une fois
+                continue
+            seen.add(date)
+            if date not in stored:
+                new_rows.append(i)
+                continue
+            classes, coverage = stored[date]
+            if not (np.array_equal(classes, expected_classes) and np.array_equal(coverage, evol_matrix[i])):
+                changed.add(date)
+                new_rows.append(i)
+        if not new_rows:
+            return 0
+
+        table = _rows_table(evol_matrix, dates, new_rows)
+        if not changed:
+            self._write_file(aoi, table)
+            return table.num_rows
+
+        changed_dates = pa.array(sorted(datetime.date.fromisoformat(date) for date in changed), type=pa.date32())
+        kept = stored_table.filter(pc.invert(pc.is_in(stored_table.column("date"), value_set=changed_dates)))
+        self._rewrite(aoi, pa.concat_tables([kept, table]), old_files)
+        return table.num_rows
+
+    def read_table(self, aois=None, columns=None):
+        """
+        Lit toutes les AOI (ou une sélection) en une seule lecture projetée en mémoire.
+
+        Args:
+            aois (list[str], optional): AOI à lire. Par défaut : toutes.
+            columns (list[str], optional): Colonnes parmi "aoi", "date", "class", "coverage".
+
+        Returns:
+            pyarrow.Table: Lignes triées par AOI, date et classe.
+        """
+        table = pq.read_table(
+            self.root_dir,
+            partitioning=PARTITIONING,
+            schema=DATASET_SCHEMA,
+            filters=ds.field("aoi").isin(list(aois)) if aois is not None else None,
+            memory_map=True,
+        )
+        table = table.sort_by([("aoi", "ascending"), ("date", "ascending"), ("class", "ascending")])
+        if columns is not None:
+            table = table.select(columns)
+        return table
+
+    def read_dataframe(self, aois=None):
+        """
+        Lit toutes les AOI (ou une sélection) sous forme de DataFrame pandas.
+
+        Args:
+            aois (list[str], optional): AOI à lire. Par défaut : toutes.
+
+        Returns:
+            pandas.DataFrame: Colonnes "aoi", "date", "class" et "coverage".
+        """
+        return self.read_table(aois).to_pandas()
+
+    def read_matrix(self, aoi):
+        """
+        Relit une AOI sous la forme renvoyée par `GroundTruth.mask_evolution`.
+
+        Args:
+            aoi (str): Identifiant de l'AOI.
+
+        Returns:
+            np.array: Matrice d'évolution des masques (dates, classes).
+            list: Dates au format AAAA-MM-JJ.
+        """
+        table = self.read_table([aoi])
+        n_classes = int(pc.max(table.column("class")).as_py() or 0)
+        dates = sorted({date.isoformat() for date in table.column("date").to_pylist()})
+        evol_matrix = np.zeros((len(dates), n_classes))
+        if n_classes:
+            evol_matrix[:] = table.column("coverage").to_numpy().reshape(len(dates), n_classes)
+        return evol_matrix, dates
+
+    def compact(self, aoi):
+        """
+        Regroupe les fichiers d'une partition (issus d'ajouts successifs) en un seul fichier.
+
+        Args:
+            aoi (str): Identifiant de l'AOI.
+        """
+        old_files = self._partition_files(aoi)
+        if len(old_files) < 2:
+            return
+        self._rewrite(aoi, ds.dataset(old_files, schema=FILE_SCHEMA, format="parquet").to_table(), old_files)
+
+
+def _rows_table(evol_matrix, dates, rows):
+    """Table au format long (date, classe, proportion) de lignes de la matrice d'évolution."""
+    n_classes = evol_matrix.shape[1]
+    row_dates = [datetime.date.fromisoformat(dates[i]) for i in rows]
+    return pa.table(
+        {
+            "date": pa.array(np.repeat(np.array(row_dates, dtype="datetime64[D]"), n_classes)),
+            "class": pa.array(np.tile(np.arange(1, n_classes + 1, dtype=np.int8), len(rows))),
+            "coverage": pa.array(evol_matrix[rows].ravel()),
+        },
+        schema=FILE_SCHEMA,
+    )
+
+
+def _group_by_date(table):
+    """(date AAAA-MM-JJ, classes, proportions) de chaque date d'une table triée par date et classe."""
+    dates = table.column("date").to_numpy()
+    classes = table.column("class").to_numpy()
+    coverage = table.column("coverage").to_numpy()
+    starts = np.flatnonzero(np.r_[True, dates[1:] != dates[:-1]]) if len(dates) else []
+    bounds = list(starts) + [len(dates)]
+    for start, end in zip(bounds[:-1], bounds[1:]):
+        yield str(dates[start]), classes[start:end], coverage[start:end]
@@ -1,9 +1,72 @@
+import argparse
+import logging
 import os
 import rasterio
 import numpy as np
-import re
-import pandas as pd
-import matplotlib.pyplot as plt
+import time
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import nullcontext
+from src.catalog import DatasetCatalog, extract_aoi, extract_date, list_tif_files
+from src.class_presence import compute_presence, coverage_from_presence, load_presence, save_presence
+from src.instrumentation import Profiler, call_profiled, get_profiler, profiled, record_cache, section
+from src.prefetch import PrefetchLoader
+from src.stats_cache import StatsCache
+
+
+# Dossier racine des labels par défaut
+DATA_ROOT = "/Users/ghalia/Desktop/Telecom_IA/Projet Fil Rouge/airbus_ghalia/data/labels"
+
+
+def append_date(dates, tif_path):
+    """
+    Détecte la date dans le nom du fichier et l'ajoute à la liste.
+
+    Args:
+        dates (list): Liste des dates à compléter.
+        tif_path (str): Chemin du fichier .tif.
+    """
+    date = extract_date(tif_path)
+    if date is not None:
+        dates.append(date)
+    else:
+        print(f"Format de date inconnu dans le fichier : {os.path.basename(tif_path)}")
+
+
+@profiled
+def compute_file_evolution(tif_path, write_index=False, pool=None):
+    """
+    Calcule la proportion (%) de chaque classe dans un fichier de labels.
+
+    Si un index de présence à jour existe à côté du fichier, les proportions en
+    sont déduites sans décoder les pixels. Sinon, les 7 bandes sont lues bloc
+    par bloc (une lecture de toutes les bandes par bloc) et réduites sur leur
+    type natif, sans copie float32 ni bande normalisée : sum(band / max) == sum(band) / max.
+
+    Fonction de module pour pouvoir être exécutée dans un pool de processus.
+    Tout changement du résultat doit incrémenter `stats_cache.CACHE_VERSION`.
+
+    Args:
+        tif_path (str): Chemin du fichier .tif à 7 bandes (ou raster d'indices de classe).
+        write_index (bool, optional): Enregistre l'index de présence calculé. Par défaut : False.
+        pool (DatasetPool, optional): Pool de rasters ouverts : un fichier déjà ouvert n'est pas rouvert.
+
+    Returns:
+        np.array: Vecteur des 7 proportions de classes.
+    """
+    presence = load_presence(tif_path)
+    record_cache("presence_index", presence is not None)
+    if presence is None:
+        src = pool.acquire(tif_path) if pool is not None else rasterio.open(tif_path)
+        try:
+            presence = compute_presence(src, n_classes=7)  # Assumer 7 bandes
+        finally:
+            if pool is not None:
+                pool.release(src)
+            else:
+                src.close()
+        if write_index:
+            save_presence(tif_path, presence)
+    return coverage_from_presence(presence)
 
 
 class GroundTruth:
@@ -14,164 +77,299 @@ class GroundTruth:
     def __init__(self):
         pass
 
-    def mask_evolution(self, folder_path):
+    @profiled
+    def mask_evolution(self, folder_path, cache=None, write_index=False, prefetch=0, prefetch_workers=2, pool=None):
         """
         Calcule l'évolution des masques pour tous les fichiers .tif dans un dossier.
 
         Args:
             folder_path (str): Chemin vers le dossier contenant les fichiers .tif.
+            cache (StatsCache, optional): Cache des vecteurs par fichier. Seuls les fichiers
+                nouveaux ou modifiés sont relus.
+            write_index (bool, optional): Enregistre l'index de présence des fichiers lus.
+            prefetch (int, optional): Nombre de fichiers traités à l'avance en arrière-plan
+                (`PrefetchLoader`), pour recouvrir les lectures et le calcul. Par défaut : 0
+                (traitement séquentiel).
+            prefetch_workers (int, optional): Nombre de threads de lecture anticipée. Par défaut : 2.
+            pool (DatasetPool, optional): Pool de rasters ouverts (ex. `shared_pool()`), pour ne pas
+                rouvrir les fichiers lors des passes suivantes sur les mêmes dossiers.
 
         Returns:
             np.array: Matrice d'évolution des masques.
             list: Liste des dates extraites des fichiers.
         """
-        tif_files = sorted([os.path.join(folder_path, f) for f in os.listdir(folder_path) if f.endswith(".tif")])
+        tif_files = list_tif_files(folder_path)
         evol_matrix = np.empty((len(tif_files), 7))  # 7 classes
         dates = []
 
-        for index, tif_path in enumerate(tif_files):
-            with rasterio.open(tif_path) as src:
-                for i in range(1, 8):  # Assumer 7 bandes
-                    band = src.read(i).astype(np.float32)
-
-                    # Vérifier si la bande est vide
-                    if np.sum(band) == 0:
-                        evol_matrix[index][i - 1] = 0
-                        continue
-
-                    band_max = np.max(band)
-                    band_normalized = band / band_max if band_max != 0 else band
-                    total_band = np.sum(band_normalized)
-                    pc_band = total_band / (band.shape[0] * band.shape[1]) * 100
-                    evol_matrix[index][i - 1] = pc_band
-
-            # Détecter et extraire la date du nom du fichier
-            filename = os.path.basename(tif_path)
-            match = re.search(r'\d{4}[-_]\d{2}[-_]\d{2}', filename)
-            if match:
-                dates.append(match.group(0).replace("_", "-"))
+        with section(folder_path):
+            cached = [cache.get(tif_path) if cache is not None else None for tif_path in tif_files]
+            missing = [tif_path for tif_path, evol in zip(tif_files, cached) if evol is None]
+            if prefetch:
+                def load(tif_path):
+                    # La section est propre à chaque thread : elle est reprise dans les threads de lecture
+                    with section(folder_path):
+                        return compute_file_evolution(tif_path, write_index, pool)
+
+                computed = iter(PrefetchLoader(missing, load, prefetch, prefetch_workers))
             else:
-                print(f"Format de date inconnu dans le fichier : {filename}")
+                computed = ((tif_path, compute_file_evolution(tif_path, write_index, pool)) for tif_path in missing)
+
+            try:
+                for index, tif_path in enumerate(tif_files):
+                    evol = cached[index]
+                    if evol is None:
+                        _, evol = next(computed)
+                        if cache is not None:
+                            cache.put(tif_path, evol)
+                    evol_matrix[index] = evol
+                    append_date(dates, tif_path)
+            finally:
+                # En cas d'erreur, les lectures anticipées en attente sont annulées
+                computed.close()
 
+        if cache is not None:
+            cache.commit()
         return evol_matrix, dates
 
-    def store_mask_evol(self, evol_matrix, dates, folder_name):
+    @profiled
+    def batch_mask_evolution(self, folders, max_workers=None, cache=None, write_index=False, pool=None):
         """
-        Sauvegarde la matrice d'évolution des masques sous forme de fichier CSV.
+        Calcule l'évolution des masques de plusieurs dossiers en parallèle.
+
+        Les fichiers .tif de tous les dossiers sont répartis sur un pool de
+        processus. Les résultats sont regroupés par dossier, dans l'ordre trié des
+        fichiers : la sortie est identique à celle de `mask_evolution` appelé
+        dossier par dossier. Une erreur (dossier illisible, fichier corrompu)
+        n'invalide que le dossier concerné.
+
+        Args:
+            folders (list[str]): Chemins des dossiers contenant les fichiers .tif.
+            max_workers (int, optional): Nombre de processus. Par défaut : nombre de cœurs.
+                Avec 1, le calcul est fait dans le processus courant.
+            cache (StatsCache, optional): Cache des vecteurs par fichier. Seuls les fichiers
+                absents du cache sont envoyés au pool.
+            write_index (bool, optional): Enregistre l'index de présence des fichiers lus.
+            pool (DatasetPool, optional): Pool de rasters ouverts, pour le calcul dans le processus
+                courant (`max_workers=1`) : les passes suivantes sur les mêmes fichiers ne les rouvrent
+                pas. Un pool ne se partage pas entre processus : les processus du pool de calcul
+                ouvrent leurs fichiers eux-mêmes.
+
+        Returns:
+            dict: Pour chaque dossier (dans l'ordre d'entrée), un dictionnaire avec
+                les clés "evol_matrix", "dates" et "error" (None si succès).
+            dict: Statistiques de débit ("files", "bytes", "cached", "seconds", "files_per_s",
+                "mb_per_s", "failed"). Les fichiers servis par le cache sont comptés dans "cached".
+        """
+        start = time.perf_counter()
+        results = {}
+        folder_files = {}
+        for folder_path in folders:
+            results[folder_path] = {"evol_matrix": None, "dates": [], "error": None}
+            try:
+                folder_files[folder_path] = list_tif_files(folder_path)
+            except OSError as e:
+                results[folder_path]["error"] = e
+
+        # Seuls les fichiers absents du cache sont à calculer
+        cached = {}
+        for folder_path, tif_files in list(folder_files.items()):
+            try:
+                with section(folder_path):
+                    cached[folder_path] = [cache.get(tif_path) if cache is not None else None for tif_path in tif_files]
+            except OSError as e:
+                results[folder_path]["error"] = e
+                del folder_files[folder_path]
+
+        # Avec un seul processus, le calcul est fait directement lors de la fusion
+        executor = ProcessPoolExecutor(max_workers=max_workers) if max_workers != 1 else None
+        futures = {}
+        # Avec un profileur actif, chaque processus renvoie aussi ses mesures
+        profiler = get_profiler()
+        if executor is not None:
+            for folder_path, tif_files in folder_files.items():
+                futures[folder_path] = [
+                    (
+                        executor.submit(call_profiled, compute_file_evolution, tif_path, write_index)
+                        if profiler is not None
+                        else executor.submit(compute_file_evolution, tif_path, write_index)
+                    )
+                    if evol is None
+                    else None
+                    for tif_path, evol in zip(tif_files, cached[folder_path])
+                ]
+
+        n_files = 0
+        n_bytes = 0
+        n_cached = 0
+        try:
+            # Fusion dans l'ordre d'entrée des dossiers et l'ordre trié des fichiers
+            for folder_path, tif_files in folder_files.items():
+                evol_matrix = np.empty((len(tif_files), 7))  # 7 classes
+                dates = []
+                try:
+                    with section(folder_path):
+                        for index, tif_path in enumerate(tif_files):
+                            evol = cached[folder_path][index]
+                            if evol is not None:
+                                n_cached += 1
+                            else:
+                                if executor is None:
+                                    evol = compute_file_evolution(tif_path, write_index, pool)
+                                elif profiler is not None:
+                                    evol, events = futures[folder_path][index].result()
+                                    profiler.merge(events, section=folder_path)
+                                else:
+                                    evol = futures[folder_path][index].result()
+                                if cache is not None:
+                                    cache.put(tif_path, evol)
+                                n_files += 1
+                                n_bytes += os.path.getsize(tif_path)
+                            evol_matrix[index] = evol
+                            append_date(dates, tif_path)
+                except Exception as e:
+                    results[folder_path]["error"] = e
+                    for future in futures.get(folder_path, []):
+                        if future is not None:
+                            future.cancel()
+                    continue
+                results[folder_path]["evol_matrix"] = evol_matrix
+                results[folder_path]["dates"] = dates
+        finally:
+            if executor is not None:
+                executor.shutdown(cancel_futures=True)
+            if cache is not None:
+                cache.commit()
+
+        seconds = time.perf_counter() - start
+        stats = {
+            "files": n_files,
+            "bytes": n_bytes,
+            "cached": n_cached,
+            "seconds": seconds,
+            "files_per_s": n_files / seconds if seconds > 0 else 0.0,
+            "mb_per_s": n_bytes / 1e6 / seconds if seconds > 0 else 0.0,
+            "failed": [folder_path for folder_path, result in results.items() if result["error"] is not None],
+        }
+        print(
+            f"{n_files} fichiers traités ({n_cached} en cache) en {seconds:.1f} s "
+            f"({stats['files_per_s']:.1f} fichiers/s, {stats['mb_per_s']:.1f} Mo/s), "
+            f"{len(stats['failed'])} dossier(s) en erreur"
+        )
+        return results, stats
+
+    @profiled
+    def store_mask_evol(self, evol_matrix, dates, folder_name, store=None):
+        """
+        Sauvegarde la matrice d'évolution des masques.
+
+        Avec un `EvolutionStore`, seules les dates absentes ou modifiées sont écrites
+        dans la partition de l'AOI ; sinon un fichier CSV par dossier est écrit.
 
         Args:
             evol_matrix (np.array): Matrice d'évolution des masques.
             dates (list): Liste des dates extraites des fichiers.
-            folder_name (str): Nom du dossier.
+            folder_name (str): Nom du dossier (identifiant de l'AOI avec un stockage).
+            store (EvolutionStore, optional): Stockage Parquet commun à toutes les AOI.
         """
+        if store is not None:
+            n_rows = store.append(folder_name, evol_matrix, dates)
+            print(f"{n_rows} lignes ajoutées ou mises à jour pour {folder_name}")
+            return
+        import pandas as pd
+
         df = pd.DataFrame(evol_matrix, columns=[f"Band_{i+1}" for i in range(7)], index=dates)
         csv_filename = f"{folder_name}.csv"
         df.to_csv(csv_filename)
         print(f"CSV saved: {csv_filename}")
 
-    def show_mask_evol(self, evol_matrix, dates, folder_name):
+    @profiled
+    def show_mask_evol(self, evol_matrix, dates, folder_name, renderer=None):
         """
-        Affiche un graphique de l'évolution des masques.
+        Enregistre le graphique de l'évolution des masques (`<folder_name>.png`).
+
+        Le graphique est rendu hors écran (Agg), sans état global pyplot : aucune
+        figure ne reste ouverte d'un dossier à l'autre.
 
         Args:
             evol_matrix (np.array): Matrice d'évolution des masques.
             dates (list): Liste des dates extraites des fichiers.
             folder_name (str): Nom du dossier.
+            renderer (Renderer, optional): Moteur de rendu à réutiliser entre les dossiers.
+                Par défaut : un moteur temporaire, fermé après l'enregistrement.
         """
-        colors = ['b', 'g', 'r', 'c', 'm', 'y', 'k']
-        class_names = [
-            'Classe 1 - Impervious Surfaces', 'Classe 2 - Agriculture',
-            'Classe 3 - Forest and Other Vegetation', 'Classe 4 - Wetlands',
-            'Classe 5 - Soil', 'Classe 6 - Water', 'Classe 7 - Ice and Snow'
-        ]
-
-        plt.figure(figsize=(10, 6))
-        for i in range(evol_matrix.shape[1]):  # Boucle sur chaque classe
-            plt.plot(dates, evol_matrix[:, i], label=class_names[i], color=colors[i])
-
-        plt.title(f"Évolution des masques - {folder_name}")
-        plt.xlabel("Dates")
-        plt.ylabel("Proportion de la classe (%)")
-        plt.ylim(0, 100)
-        plt.legend()
-        plt.grid()
-        plt.xticks(rotation=45, ha='right')
-        plt.tight_layout()
-        plt.savefig(f"{folder_name}.png")
-        #plt.show()
+        own_renderer = renderer is None
+        if own_renderer:
+            from src.rendering import Renderer
+
+            renderer = Renderer()
+        try:
+            renderer.plot_mask_evol(evol_matrix, dates, folder_name)
+            renderer.save(f"{folder_name}.png")
+        finally:
+            if own_renderer:
+                renderer.close()
         print(f"Graph saved: {folder_name}.png")
 
 
 def main():
+    # Stockage Parquet et rendu ne sont importés que par la CLI : les calculs n'en dépendent pas
+    from src.evolution_store import EvolutionStore
+    from src.rendering import Renderer
+
+    parser = argparse.ArgumentParser(description="Évolution des classes de labels par dossier d'AOI")
+    parser.add_argument("--data-root", default=DATA_ROOT, help="Dossier racine des labels")
+    parser.add_argument("--catalog", default="dataset_catalog.sqlite", help="Catalogue SQLite des rasters")
+    parser.add_argument("--rescan", action="store_true", help="Met à jour le catalogue (fichiers nouveaux ou modifiés)")
+    parser.add_argument("--profile", action="store_true", help="Mesure les temps, lectures et caches par dossier")
+    parser.add_argument("--profile-output", help="Fichier JSON où enregistrer le profil détaillé")
+    args = parser.parse_args()
+
+    profiler = None
+    if args.profile:
+        # Seuls les messages du profileur sont affichés (pas ceux de matplotlib ou rasterio)
+        handler = logging.StreamHandler()
+        handler.setFormatter(logging.Formatter("%(message)s"))
+        profile_logger = logging.getLogger("src.instrumentation")
+        profile_logger.addHandler(handler)
+        profile_logger.setLevel(logging.INFO)
+        profiler = Profiler()
+
     ground_truth = GroundTruth()
+    cache = StatsCache("mask_evolution_cache.sqlite")
+    store = EvolutionStore("mask_evolution_store")
 
-    # Liste des dossiers contenant les fichiers .tif
-    folders = [
-        "/Users/ghalia/Desktop/Telecom_IA/Projet Fil Rouge/airbus_ghalia/data/labels/1311_3077_13_10N/Labels/Raster/10N-122W-40N-L3H-SR",
-        "/Users/ghalia/Desktop/Telecom_IA/Projet Fil Rouge/airbus_ghalia/data/labels/1417_3281_13_11N/Raster/11N-117W-33N-L3H-SR",
-        "/Users/ghalia/Desktop/Telecom_IA/Projet Fil Rouge/airbus_ghalia/data/labels/1487_3335_13_11N/Labels/Raster/11N-114W-31N-L3H-SR",
-        "/Users/ghalia/Desktop/Telecom_IA/Projet Fil Rouge/airbus_ghalia/data/labels/1700_3100_13_13N/Labels/Raster/13N-105W-40N-L3H-SR",
-        "/Users/ghalia/Desktop/Telecom_IA/Projet Fil Rouge/airbus_ghalia/data/labels/2006_3280_13_15N/Labels/Raster/15N-91W-33N-L3H-SR",
-        "/Users/ghalia/Desktop/Telecom_IA/Projet Fil Rouge/airbus_ghalia/data/labels/2029_3764_13_15N/Labels/Raster/15N-90W-14N-L3H-SR",
-        "/Users/ghalia/Desktop/Telecom_IA/Projet Fil Rouge/airbus_ghalia/data/labels/2065_3647_13_16N/Labels/Raster/16N-89W-19N-L3H-SR",
-        "/Users/ghalia/Desktop/Telecom_IA/Projet Fil Rouge/airbus_ghalia/data/labels/2235_3403_13-17N/Labels/Raster/17N-81W-29N-L3H-SR",
-        "/Users/ghalia/Desktop/Telecom_IA/Projet Fil Rouge/airbus_ghalia/data/labels/2415_3082_13_18N/Labels/Raster/18N-73W-40N-L3H-SR",
-        "/Users/ghalia/Desktop/Telecom_IA/Projet Fil Rouge/airbus_ghalia/data/labels/2459_4406_13-19S/Labels/Raster/19S-71W-13S-L3H-SR",
-        "/Users/ghalia/Desktop/Telecom_IA/Projet Fil Rouge/airbus_ghalia/data/labels/2470_5030_13_19S/Labels/Raster/19S-5E-34N-L3H-SR",
-        "/Users/ghalia/Desktop/Telecom_IA/Projet Fil Rouge/airbus_ghalia/data/labels/2528_4620_13_19S/Labels/Raster/19S-53W-22S-L3H-SR",
-        "/Users/ghalia/Desktop/Telecom_IA/Projet Fil Rouge/airbus_ghalia/data/labels/2624_4314_13_20S/Labels/Raster/20S-64W-9S-L3H-SR",
-        "/Users/ghalia/Desktop/Telecom_IA/Projet Fil Rouge/airbus_ghalia/data/labels/2697_3715_13_20N/Labels/Raster/20N-61W-16N-L3H-SR",
-        "/Users/ghalia/Desktop/Telecom_IA/Projet Fil Rouge/airbus_ghalia/data/labels/2832_4366_13_21S/Labels/Raster/21S-55W-11S-L3H-SR",
-        "/Users/ghalia/Desktop/Telecom_IA/Projet Fil Rouge/airbus_ghalia/data/labels/2850_4139_13_21S/Labels/Raster/21S-54W-1S-L3H-SR",
-        "/Users/ghalia/Desktop/Telecom_IA/Projet Fil Rouge/airbus_ghalia/data/labels/3002_4273_13_22S/Labels/Raster/22S-48W-7S-L3H-SR",
-        "/Users/ghalia/Desktop/Telecom_IA/Projet Fil Rouge/airbus_ghalia/data/labels/3998_3016_13_30N/Labels/Raster/30N-4W-42N-L3H-SR",
-        "/Users/ghalia/Desktop/Telecom_IA/Projet Fil Rouge/airbus_ghalia/data/labels/4127_2991_13_31N/Labels/Raster/31N-1E-43N-L3H-SR",
-        "/Users/ghalia/Desktop/Telecom_IA/Projet Fil Rouge/airbus_ghalia/data/labels/4169_3944_13_31N/Labels/Raster/31N-3E-6N-L3H-SR",
-        "/Users/ghalia/Desktop/Telecom_IA/Projet Fil Rouge/airbus_ghalia/data/labels/4223_3246_13_31N/Labels/Raster/31N-36E-34N-L3H-SR",
-        "/Users/ghalia/Desktop/Telecom_IA/Projet Fil Rouge/airbus_ghalia/data/labels/4240_3972_13_32N/Labels/Raster/32N-6E-5N-L3H-SR",
-        "/Users/ghalia/Desktop/Telecom_IA/Projet Fil Rouge/airbus_ghalia/data/labels/4254_2915_13_32N/Labels/Raster/32N-6E-45N-L3H-SR",
-        "/Users/ghalia/Desktop/Telecom_IA/Projet Fil Rouge/airbus_ghalia/data/labels/4397_4302_13_33S/Labels/Raster/33S-13E-9S-L3H-SR",
-        "/Users/ghalia/Desktop/Telecom_IA/Projet Fil Rouge/airbus_ghalia/data/labels/4421_3800_13_33N/Labels/Raster/33N-14E-12N-L3H-SR",
-        "/Users/ghalia/Desktop/Telecom_IA/Projet Fil Rouge/airbus_ghalia/data/labels/4426_3835_13_33N/Labels/Raster/33N-14E-11N-L3H-SR",
-        "/Users/ghalia/Desktop/Telecom_IA/Projet Fil Rouge/airbus_ghalia/data/labels/4622_3159_13_34N/Labels/Raster/34N-23E-38N-L3H-SR",
-        "/Users/ghalia/Desktop/Telecom_IA/Projet Fil Rouge/airbus_ghalia/data/labels/4768_4131_13_35S/Labels/Raster/35S-29E-1S-L3H-SR",
-        "/Users/ghalia/Desktop/Telecom_IA/Projet Fil Rouge/airbus_ghalia/data/labels/4780_3377_13_36N/Labels/Raster/36N-30E-30N-L3H-SR",
-        "/Users/ghalia/Desktop/Telecom_IA/Projet Fil Rouge/airbus_ghalia/data/labels/4791_3920_13_36N/Labels/Raster/36N-30E-7N-L3H-SR",
-        "/Users/ghalia/Desktop/Telecom_IA/Projet Fil Rouge/airbus_ghalia/data/labels/4806_3588_13_36N/Labels/Raster/36N-31E-21N-L3H-SR",
-        "/Users/ghalia/Desktop/Telecom_IA/Projet Fil Rouge/airbus_ghalia/data/labels/4838_3506_13_36N/Labels/Raster/36N-32E-25N-L3H-SR",
-        "/Users/ghalia/Desktop/Telecom_IA/Projet Fil Rouge/airbus_ghalia/data/labels/4856_4087_13_36N/Labels/Raster/36N-33E-0N-L3H-SR",
-        "/Users/ghalia/Desktop/Telecom_IA/Projet Fil Rouge/airbus_ghalia/data/labels/4881_3344_13_36N/Labels/Raster/36N-34E-31N-L3H-SR",
-        "/Users/ghalia/Desktop/Telecom_IA/Projet Fil Rouge/airbus_ghalia/data/labels/5111_4560_13-38S/Labels/Raster/38S-44E-19S-L3H-SR",
-        "/Users/ghalia/Desktop/Telecom_IA/Projet Fil Rouge/airbus_ghalia/data/labels/5125_4049_13_38N/Labels/Raster/38N-45E-2N-L3H-SR",
-        "/Users/ghalia/Desktop/Telecom_IA/Projet Fil Rouge/airbus_ghalia/data/labels/5863_3800_13_43N/Labels/Raster/43N-77E-12N-L3H-SR",
-        "/Users/ghalia/Desktop/Telecom_IA/Projet Fil Rouge/airbus_ghalia/data/labels/5926_3715_13_44N/Labels/Raster/44N-80E-16N-L3H-SR",
-        "/Users/ghalia/Desktop/Telecom_IA/Projet Fil Rouge/airbus_ghalia/data/labels/5989_3554_13_44N/Labels/Raster/44N-83E-23N-L3H-SR",
-        "/Users/ghalia/Desktop/Telecom_IA/Projet Fil Rouge/airbus_ghalia/data/labels/6204_3495_13-46N/Labels/Raster/46N-92E-25N-L3H-SR",
-        "/Users/ghalia/Desktop/Telecom_IA/Projet Fil Rouge/airbus_ghalia/data/labels/6381_3681_13_47N/Labels/Raster/47N-100E-17N-L3H-SR",
-        "/Users/ghalia/Desktop/Telecom_IA/Projet Fil Rouge/airbus_ghalia/data/labels/6466_3380_13_48N/Labels/Raster/48N-104E-29N-L3H-SR",
-        "/Users/ghalia/Desktop/Telecom_IA/Projet Fil Rouge/airbus_ghalia/data/labels/6468_3360_13_48N/Labels/Raster/48N-104E-30N-L3H-SR",
-        "/Users/ghalia/Desktop/Telecom_IA/Projet Fil Rouge/airbus_ghalia/data/labels/6475_3361_13_48N/Labels/Raster/48N-104E-30N-L3H-SR",
-        "/Users/ghalia/Desktop/Telecom_IA/Projet Fil Rouge/airbus_ghalia/data/labels/6688_3456_13_49N/Labels/Raster/49N-113E-22N-L3H-SR",
-        "/Users/ghalia/Desktop/Telecom_IA/Projet Fil Rouge/airbus_ghalia/data/labels/6730_3430_13_50N/Labels/Raster/50N-115E-28N-L3H-SR",
-        "/Users/ghalia/Desktop/Telecom_IA/Projet Fil Rouge/airbus_ghalia/data/labels/6752_3115_13_50N/Labels/Raster/50N-116E-39N-L3H-SR",
-        "/Users/ghalia/Desktop/Telecom_IA/Projet Fil Rouge/airbus_ghalia/data/labels/6810_3478_13_50N/Labels/Raster/50N-119E-26N-L3H-SR",
-        "/Users/ghalia/Desktop/Telecom_IA/Projet Fil Rouge/airbus_ghalia/data/labels/6813_3313_13_50N/Labels/Raster/50N-119E-32N-L3H-SR",
-        "/Users/ghalia/Desktop/Telecom_IA/Projet Fil Rouge/airbus_ghalia/data/labels/6824_4117_13_50S/Labels/Raster/50S-119E-0S-L3H-SR",
-        "/Users/ghalia/Desktop/Telecom_IA/Projet Fil Rouge/airbus_ghalia/data/labels/7026_3201_13-52N/Labels/Raster/52N-128E-36N-L3H-SR",
-        "/Users/ghalia/Desktop/Telecom_IA/Projet Fil Rouge/airbus_ghalia/data/labels/7312_3008_13_54N/Labels/Raster/54N-141E-43N-L3H-SR",
-        "/Users/ghalia/Desktop/Telecom_IA/Projet Fil Rouge/airbus_ghalia/data/labels/7367_5050_13-54S/Labels/Raster/54S-143E-38S-L3H-SR",
-        "/Users/ghalia/Desktop/Telecom_IA/Projet Fil Rouge/airbus_ghalia/data/labels/7513_4968_13_56S/Labels/Raster/56S-150E-35S-L3H-SR",
-        "/Users/ghalia/Desktop/Telecom_IA/Projet Fil Rouge/airbus_ghalia/data/labels/8077_5007_13_60S/Labels/Raster/60S-174E-37S-L3H-SR"
-    ]
-    for folder_path in folders:
-        folder_name = os.path.basename(folder_path)
-        try:
-            print(f"Processing folder: {folder_path}")
-            evol_matrix, dates = ground_truth.mask_evolution(folder_path)
-            ground_truth.store_mask_evol(evol_matrix, dates, folder_name)
-            ground_truth.show_mask_evol(evol_matrix, dates, folder_name)
-        except Exception as e:
-            print(f"Erreur lors du traitement du dossier {folder_path}: {e}")
+    # Dossiers des séries de labels, depuis le catalogue (parcours du disque seulement si demandé)
+    with DatasetCatalog(args.catalog, args.data_root) as catalog:
+        if args.rescan or not catalog.folders():
+            print(f"Catalogue : {catalog.scan()}")
+        folders = catalog.label_folders()
+    renderer = Renderer()
+    with profiler if profiler is not None else nullcontext(), renderer:
+        results, stats = ground_truth.batch_mask_evolution(folders, cache=cache)
+        cache.prune_missing()
+        print(f"Cache : {cache.get_stats()}")
+        cache.close()
+        for folder_path, result in results.items():
+            # Nom unique par série : deux AOI peuvent avoir des dossiers de même nom
+            folder_name = f"{extract_aoi(folder_path)}_{os.path.basename(folder_path)}"
+            if result["error"] is not None:
+                print(f"Erreur lors du traitement du dossier {folder_path}: {result['error']}")
+                continue
+            try:
+                with section(folder_path):
+                    ground_truth.store_mask_evol(result["evol_matrix"], result["dates"], extract_aoi(folder_path), store)
+                    ground_truth.show_mask_evol(result["evol_matrix"], result["dates"], folder_name, renderer)
+            except Exception as e:
+                print(f"Erreur lors du traitement du dossier {folder_path}: {e}")
+
+    if profiler is not None:
+        # Résumé par dossier, puis par fonction
+        profiler.log_summary(by="section")
+        profiler.log_summary(by="name")
+        if args.profile_output:
+            profiler.dump(args.profile_output)
+            print(f"Profil enregistré : {args.profile_output}")
 
 
 if __name__ == "__main__":
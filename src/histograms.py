@@ -0,0 +1,276 @@
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import rasterio
+from src.instrumentation import profiled, record_read
+from src.raster_windows import iter_block_windows, streaming_min_max
+
+# Taille des paquets de pixels convertis pour np.bincount (mémoire temporaire bornée)
+CHUNK_SIZE = 1 << 20
+
+# Types entiers comptés valeur par valeur (au plus 65536 valeurs possibles)
+EXACT_DTYPES = (np.dtype(np.uint8), np.dtype(np.int8), np.dtype(np.uint16), np.dtype(np.int16))
+
+
+def is_exact_dtype(dtype):
+    """Indique si un type de données est compté valeur par valeur (entiers sur 8 ou 16 bits)."""
+    return np.dtype(dtype) in EXACT_DTYPES or np.dtype(dtype) == np.dtype(bool)
+
+
+def _iter_chunks(data, chunk_size=CHUNK_SIZE):
+    """Parcourt un tableau par paquets 1D, sans copie de l'ensemble du tableau."""
+    if data.ndim <= 1 or data.flags.c_contiguous:
+        flat = data.reshape(-1)
+        for start in range(0, flat.size, chunk_size):
+            yield flat[start:start + chunk_size]
+    else:
+        for sub in data:
+            yield from _iter_chunks(sub, chunk_size)
+
+
+class HistogramAccumulator:
+    """
+    Histogramme cumulable sur plusieurs fenêtres et plusieurs fichiers.
+
+    Pour les entiers sur 8 ou 16 bits, chaque valeur est comptée exactement
+    avec `np.bincount` : aucun intervalle n'est nécessaire à l'avance, le
+    min/max est connu sans passe supplémentaire et l'histogramme peut être
+    regroupé a posteriori sur n'importe quel intervalle. Pour les autres types,
+    un intervalle fixe (`value_range`) est requis.
+    """
+
+    def __init__(self, bins=256, value_range=None):
+        """
+        Initialise un histogramme vide.
+
+        Args:
+            bins (int, optional): Nombre de classes (mode intervalle fixe). Par défaut : 256.
+            value_range (tuple, optional): Intervalle (min, max) du mode intervalle fixe.
+        """
+        self.bins = bins
+        self.value_range = value_range
+        self.offset = None
+        self.value_counts = None
+        self.counts = None
+        self.n = 0
+
+    def update(self, data):
+        """
+        Ajoute les valeurs d'un tableau (de forme quelconque) à l'histogramme.
+
+        Args:
+            data (np.array): Valeurs à ajouter.
+
+        Raises:
+            ValueError: Si le type n'est pas compté exactement et qu'aucun intervalle n'est défini.
+        """
+        data = np.asarray(data)
+        if data.dtype == np.dtype(bool):
+            data = data.view(np.uint8)
+        if is_exact_dtype(data.dtype) and self.counts is None:
+            self._update_exact(data)
+        else:
+            self._update_fixed(data)
+        self.n += data.size
+
+    def _update_exact(self, data):
+        info = np.iinfo(data.dtype)
+        if self.value_counts is None:
+            self.offset = int(info.min)
+            self.value_counts = np.zeros(0, dtype=np.int64)
+        elif info.min < self.offset:
+            raise ValueError(f"Type {data.dtype} incompatible avec l'histogramme existant")
+        size = int(info.max) - self.offset + 1
+        if size > self.value_counts.size:
+            self.value_counts = np.pad(self.value_counts, (0, size - self.value_counts.size))
+        for chunk in _iter_chunks(data):
+            indices = chunk if self.offset == 0 else chunk.astype(np.int64) - self.offset
+            self.value_counts[:size] += np.bincount(indices, minlength=size)
+
+    def _update_fixed(self, data):
+        if self.value_counts is not None:
+            raise ValueError("Histogramme exact : impossible d'ajouter des valeurs d'un autre type")
+        if self.value_range is None:
+            raise ValueError("Un intervalle (value_range) est requis pour ce type de données")
+        if self.counts is None:
+            self.counts = np.zeros(self.bins, dtype=np.int64)
+        edges = np.histogram_bin_edges([], bins=self.bins, range=self.value_range)
+        for chunk in _iter_chunks(data):
+            self.counts += np.histogram(chunk, bins=edges)[0]
+
+    def merge(self, other):
+        """
+        Fusionne un autre histogramme (d'une autre fenêtre, d'un autre fichier) dans celui-ci.
+
+        Args:
+            other (HistogramAccumulator): Histogramme à fusionner.
+
+        Returns:
+            HistogramAccumulator: L'histogramme courant.
+        """
+        if other.value_counts is not None:
+            if self.value_counts is None and self.counts is None:
+                self.offset = other.offset
+                self.value_counts = np.zeros_like(other.value_counts)
+            if self.value_counts is None or other.offset != self.offset:
+                raise ValueError("Histogrammes incompatibles")
+            size = max(self.value_counts.size, other.value_counts.size)
+            merged = np.zeros(size, dtype=np.int64)
+            merged[: self.value_counts.size] += self.value_counts
+            merged[: other.value_counts.size] += other.value_counts
+            self.value_counts = merged
+        elif other.counts is not None:
+            if self.counts is None:
+                self.bins, self.value_range = other.bins, other.value_range
+                self.counts = np.zeros(self.bins, dtype=np.int64)
+            if (other.bins, tuple(other.value_range)) != (self.bins, tuple(self.value_range)):
+                raise ValueError("Histogrammes incompatibles")
+            self.counts += other.counts
+        self.n += other.n
+        return self
+
+    @property
+    def min(self):
+        """Plus petite valeur observée (mode exact) ou borne basse de l'intervalle."""
+        if self.value_counts is not None:
+            nonzero = np.flatnonzero(self.value_counts)
+            return int(nonzero[0]) + self.offset if nonzero.size else None
+        return self.value_range[0] if self.value_range is not None else None
+
+    @property
+    def max(self):
+        """Plus grande valeur observée (mode exact) ou borne haute de l'intervalle."""
+        if self.value_counts is not None:
+            nonzero = np.flatnonzero(self.value_counts)
+            return int(nonzero[-1]) + self.offset if nonzero.size else None
+        return self.value_range[1] if self.value_range is not None else None
+
+    def result(self, bins=None, value_range=None):
+        """
+        Retourne les effectifs et les bornes de l'histogramme.
+
+        En mode exact, les valeurs sont regroupées dans `bins` classes sur
+        `value_range` (par défaut : min/max observés), avec la même convention que
+        `np.histogram`. En mode intervalle fixe, seuls les paramètres d'origine sont acceptés.
+
+        Args:
+            bins (int, optional): Nombre de classes. Par défaut : `self.bins`.
+            value_range (tuple, optional): Intervalle (min, max).
+
+        Returns:
+            np.array: Effectifs de chaque classe.
+            np.array: Bornes des classes (bins + 1 valeurs).
+        """
+        bins = self.bins if bins is None else bins
+        if self.value_counts is not None:
+            if value_range is None:
+                value_range = (self.min, self.max) if self.n else (0, 1)
+            values = np.arange(self.value_counts.size) + self.offset
+            counts, edges = np.histogram(values, bins=bins, range=value_range, weights=self.value_counts)
+            return counts.astype(np.int64), edges
+        if self.counts is None:
+            raise ValueError("Histogramme vide")
+        if bins != self.bins or (value_range is not None and tuple(value_range) != tuple(self.value_range)):
+            raise ValueError("Intervalle fixe : impossible de regrouper l'histogramme")
+        return self.counts, np.histogram_bin_edges([], bins=self.bins, range=self.value_range)
+
+    def save(self, path):
+        """
+        Enregistre l'histogramme dans un fichier .npz.
+
+        Args:
+            path (str): Chemin du fichier.
+        """
+        np.savez(
+            path,
+            bins=self.bins,
+            value_range=np.array(self.value_range if self.value_range is not None else [], dtype=np.float64),
+            offset=self.offset if self.offset is not None else 0,
+            value_counts=self.value_counts if self.value_counts is not None else np.zeros(0, dtype=np.int64),
+            counts=self.counts if self.counts is not None else np.zeros(0, dtype=np.int64),
+            n=self.n,
+        )
+
+    @classmethod
+    def load(cls, path):
+        """
+        Charge un histogramme enregistré avec `save`.
+
+        Args:
+            path (str): Chemin du fichier .npz.
+
+        Returns:
+            HistogramAccumulator: Histogramme chargé.
+        """
+        with np.load(path) as f:
+            value_range = tuple(f["value_range"]) if f["value_range"].size else None
+            accumulator = cls(int(f["bins"]), value_range)
+            if f["value_counts"].size:
+                accumulator.offset = int(f["offset"])
+                accumulator.value_counts = f["value_counts"]
+            if f["counts"].size:
+                accumulator.counts = f["counts"]
+            accumulator.n = int(f["n"])
+        return accumulator
+
+
+@profiled
+def band_histograms(dataset, bands, bins=256, value_range=None, windowed=True):
+    """
+    Calcule l'histogramme de plusieurs bandes d'un raster en une passe.
+
+    Pour les types non comptés exactement, l'intervalle commun aux bandes est
+    calculé au préalable s'il n'est pas fourni.
+
+    Args:
+        dataset (rasterio.DatasetReader): Raster ouvert.
+        bands (list[int]): Numéros des bandes.
+        bins (int, optional): Nombre de classes (mode intervalle fixe). Par défaut : 256.
+        value_range (tuple, optional): Intervalle (min, max) du mode intervalle fixe.
+        windowed (bool, optional): Lecture bloc par bloc (mémoire bornée) plutôt que bande entière.
+
+    Returns:
+        list[HistogramAccumulator]: Un histogramme par bande.
+    """
+    if value_range is None and not is_exact_dtype(dataset.dtypes[bands[0] - 1]):
+        extrema = [streaming_min_max(dataset, band) for band in bands]
+        value_range = (min(e[0] for e in extrema), max(e[1] for e in extrema))
+    accumulators = [HistogramAccumulator(bins, value_range) for _ in bands]
+    windows = iter_block_windows(dataset, bands[0]) if windowed else [None]
+    for window in windows:
+        for accumulator, band in zip(accumulators, bands):
+            data = dataset.read(band, window=window)
+            record_read(data)
+            accumulator.update(data)
+    return accumulators
+
+
+def _file_histograms(file_path, bands, bins, value_range):
+    """Histogrammes d'un fichier (fonction de module, exécutable dans un pool de processus)."""
+    with rasterio.open(file_path) as dataset:
+        return band_histograms(dataset, bands, bins, value_range)
+
+
+def dataset_histograms(file_paths, bands, bins=256, value_range=None, max_workers=None):
+    """
+    Histogrammes cumulés d'un ensemble de fichiers, calculés en parallèle.
+
+    Pour des types flottants, `value_range` doit être fourni afin que les
+    histogrammes de tous les fichiers soient fusionnables.
+
+    Args:
+        file_paths (list[str]): Chemins des fichiers raster.
+        bands (list[int]): Numéros des bandes.
+        bins (int, optional): Nombre de classes (mode intervalle fixe). Par défaut : 256.
+        value_range (tuple, optional): Intervalle (min, max) du mode intervalle fixe.
+        max_workers (int, optional): Nombre de processus. Par défaut : nombre de cœurs.
+
+    Returns:
+        list[HistogramAccumulator]: Un histogramme cumulé par bande.
+    """
+    totals = [HistogramAccumulator(bins, value_range) for _ in bands]
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        futures = [executor.submit(_file_histograms, path, bands, bins, value_range) for path in file_paths]
+        for future in futures:
+            for total, accumulator in zip(totals, future.result()):
+                total.merge(accumulator)
+    return totals
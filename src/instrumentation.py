@@ -0,0 +1,305 @@
+import functools
+import json
+import logging
+import threading
+import time
+from contextlib import contextmanager
+
+logger = logging.getLogger(__name__)
+
+# Profileur actif (None : instrumentation désactivée, coût limité à un test par appel)
+_active = None
+# Pile des appels en cours et section courante, par thread
+_local = threading.local()
+
+COUNTERS = ("bytes_read", "allocated")
+
+
+def _frames():
+    if not hasattr(_local, "frames"):
+        _local.frames = []
+    return _local.frames
+
+
+def _new_frame(name, section_label):
+    return {"name": name, "section": section_label, "bytes_read": 0, "allocated": 0, "caches": {}}
+
+
+def _add_caches(target, caches):
+    for cache_name, (hits, misses) in caches.items():
+        current = target.setdefault(cache_name, [0, 0])
+        current[0] += hits
+        current[1] += misses
+
+
+class Profiler:
+    """
+    Profileur opt-in des lecteurs et de GroundTruth.
+
+    Actif uniquement dans son bloc `with`. Chaque appel instrumenté (décorateur
+    `profiled` ou bloc `span`) produit un événement : durée, octets décodés,
+    octets alloués et accès aux caches. Les événements sont journalisés (niveau
+    DEBUG du logger `src.instrumentation`, champ `profile`) et agrégés par nom
+    ou par section (ex. un dossier d'AOI).
+    """
+
+    def __init__(self):
+        self.events = []
+        self._lock = threading.Lock()
+        self._previous = None
+
+    def __enter__(self):
+        global _active
+        self._previous = _active
+        _active = self
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        global _active
+        _active = self._previous
+        self._previous = None
+
+    def record(self, event):
+        """
+        Ajoute un événement et le journalise.
+
+        Args:
+            event (dict): Événement ("name", "section", "depth", "root", "seconds", compteurs, "caches").
+        """
+        with self._lock:
+            self.events.append(event)
+        logger.debug("%s : %.4f s", event["name"], event["seconds"], extra={"profile": event})
+
+    def merge(self, events, section=None):
+        """
+        Ajoute des événements produits ailleurs (ex. dans un processus du pool).
+
+        Args:
+            events (list[dict]): Événements à ajouter.
+            section (str, optional): Section à leur attribuer si elles n'en ont pas.
+        """
+        for event in events:
+            if section is not None and event.get("section") is None:
+                event = dict(event, section=section)
+            self.record(event)
+
+    def summary(self, by="name"):
+        """
+        Agrège les événements.
+
+        Les compteurs d'un appel incluent ceux des appels imbriqués : par section,
+        seuls les premiers appels de chaque section sont additionnés pour ne rien
+        compter deux fois.
+
+        Args:
+            by (str, optional): "name" (par fonction) ou "section". Par défaut : "name".
+
+        Returns:
+            dict: Par clé, "calls", "seconds", "max_seconds", "bytes_read", "allocated" et
+                "caches" (succès et échecs par cache).
+        """
+        summary = {}
+        for event in self.events:
+            if by == "section" and not event["root"]:
+                continue
+            key = event.get(by)
+            entry = summary.setdefault(
+                key, {"calls": 0, "seconds": 0.0, "max_seconds": 0.0, "bytes_read": 0, "allocated": 0, "caches": {}}
+            )
+            entry["calls"] += 1
+            entry["seconds"] += event["seconds"]
+            entry["max_seconds"] = max(entry["max_seconds"], event["seconds"])
+            for counter in COUNTERS:
+                entry[counter] += event[counter]
+            _add_caches(entry["caches"], event["caches"])
+        return summary
+
+    def log_summary(self, by="name"):
+        """
+        Journalise le résumé (niveau INFO), une ligne par clé, de la plus coûteuse à la moins coûteuse.
+
+        Args:
+            by (str, optional): "name" ou "section". Par défaut : "name".
+        """
+        summary = self.summary(by)
+        for key, entry in sorted(summary.items(), key=lambda item: -item[1]["seconds"]):
+            caches = ", ".join(f"{name} {hits}/{hits + misses}" for name, (hits, misses) in entry["caches"].items())
+            logger.info(
+                "%s : %d appel(s), %.3f s, %.1f Mo lus, %.1f Mo alloués%s",
+                key,
+                entry["calls"],
+                entry["seconds"],
+                entry["bytes_read"] / 1e6,
+                entry["allocated"] / 1e6,
+                f", cache {caches}" if caches else "",
+                extra={"profile_summary": dict(entry, key=key)},
+            )
+
+    def dump(self, output_path):
+        """
+        Enregistre les événements et les résumés dans un fichier JSON.
+
+        Args:
+            output_path (str): Chemin du fichier JSON.
+        """
+        with open(output_path, "w") as f:
+            json.dump(
+                {
+                    "by_name": self.summary("name"),
+                    "by_section": self.summary("section"),
+                    "events": self.events,
+                },
+                f,
+                indent=2,
+            )
+
+
+def get_profiler():
+    """Profileur actif, ou None si l'instrumentation est désactivée."""
+    return _active
+
+
+@contextmanager
+def span(name):
+    """
+    Mesure un bloc de code (ex. "decode", "normalize", "render") s'il y a un profileur actif.
+
+    Args:
+        name (str): Nom de l'événement.
+    """
+    profiler = _active
+    if profiler is None:
+        yield
+        return
+    frames = _frames()
+    section_label = getattr(_local, "section", None)
+    frame = _new_frame(name, section_label)
+    # Premier appel de sa section : compté dans le résumé par section
+    root = not frames or frames[-1]["section"] != section_label
+    frames.append(frame)
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        seconds = time.perf_counter() - start
+        frames.pop()
+        if frames:
+            parent = frames[-1]
+            for counter in COUNTERS:
+                parent[counter] += frame[counter]
+            _add_caches(parent["caches"], frame["caches"])
+        profiler.record(
+            {
+                "name": name,
+                "section": section_label,
+                "depth": len(frames),
+                "root": root,
+                "seconds": seconds,
+                "bytes_read": frame["bytes_read"],
+                "allocated": frame["allocated"],
+                "caches": frame["caches"],
+            }
+        )
+
+
+def profiled(func):
+    """
+    Décorateur : mesure chaque appel de la fonction s'il y a un profileur actif.
+
+    Args:
+        func (callable): Fonction ou méthode à instrumenter.
+
+    Returns:
+        callable: Fonction instrumentée.
+    """
+    name = func.__qualname__
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        if _active is None:
+            return func(*args, **kwargs)
+        with span(name):
+            return func(*args, **kwargs)
+
+    return wrapper
+
+
+@contextmanager
+def section(label):
+    """
+    Attribue les événements du bloc à une section (ex. le dossier traité).
+
+    Args:
+        label (str): Nom de la section.
+    """
+    previous = getattr(_local, "section", None)
+    _local.section = label
+    try:
+        yield
+    finally:
+        _local.section = previous
+
+
+def _add(counter, nbytes):
+    if _active is None:
+        return
+    frames = _frames()
+    if frames:
+        frames[-1][counter] += int(nbytes)
+
+
+def record_read(data):
+    """
+    Compte les octets décodés par une lecture (taille du tableau lu).
+
+    Args:
+        data (np.array | int): Tableau lu, ou nombre d'octets.
+    """
+    _add("bytes_read", getattr(data, "nbytes", data))
+
+
+def record_alloc(data):
+    """
+    Compte les octets d'un tableau alloué (copie, conversion de type, empilement).
+
+    Args:
+        data (np.array | int): Tableau alloué, ou nombre d'octets.
+    """
+    _add("allocated", getattr(data, "nbytes", data))
+
+
+def record_cache(cache_name, hit):
+    """
+    Compte un accès à un cache.
+
+    Args:
+        cache_name (str): Nom du cache (ex. "stats_cache", "presence_index").
+        hit (bool): True si la valeur a été trouvée.
+    """
+    if _active is None:
+        return
+    frames = _frames()
+    if frames:
+        _add_caches(frames[-1]["caches"], {cache_name: (int(hit), int(not hit))})
+
+
+def call_profiled(func, *args, **kwargs):
+    """
+    Exécute une fonction sous un profileur local, pour un processus de pool.
+
+    Fonction de module pour pouvoir être envoyée à un pool de processus.
+
+    Args:
+        func (callable): Fonction à exécuter.
+        *args: Arguments positionnels.
+        **kwargs: Arguments nommés.
+
+    Returns:
+        tuple: Résultat de la fonction et liste des événements (à passer à `Profiler.merge`).
+    """
+    # Un processus créé par fork hérite de la pile d'appels du parent : on repart de zéro
+    _local.frames = []
+    _local.section = None
+    with Profiler() as profiler:
+        result = func(*args, **kwargs)
+    return result, profiler.events
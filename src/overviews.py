@@ -0,0 +1,99 @@
+import rasterio
+from rasterio.enums import Resampling
+
+
+def preview_shape(dataset, target_size):
+    """
+    Calcule la taille d'un aperçu dont le plus grand côté vaut au plus `target_size`.
+
+    Le rapport hauteur/largeur est conservé et l'image n'est jamais agrandie.
+
+    Args:
+        dataset (rasterio.DatasetReader): Raster ouvert.
+        target_size (int): Taille maximale (en pixels) du plus grand côté.
+
+    Returns:
+        tuple: (hauteur, largeur) de l'aperçu.
+    """
+    scale = min(1.0, target_size / max(dataset.height, dataset.width))
+    return max(1, round(dataset.height * scale)), max(1, round(dataset.width * scale))
+
+
+def read_preview(dataset, indexes, target_size, resampling=Resampling.nearest):
+    """
+    Lit une ou plusieurs bandes à résolution réduite.
+
+    La lecture passe par `out_shape` : GDAL lit alors directement le niveau
+    d'aperçu interne (overview) le plus adapté s'il existe, et se contente
+    sinon d'une lecture décimée de la pleine résolution.
+
+    Args:
+        dataset (rasterio.DatasetReader): Raster ouvert.
+        indexes (int | list[int]): Bande ou liste de bandes à lire.
+        target_size (int): Taille maximale (en pixels) du plus grand côté.
+        resampling (Resampling, optional): Méthode de rééchantillonnage. Par défaut : nearest.
+
+    Returns:
+        np.array: Données réduites, (hauteur, largeur) ou (bandes, hauteur, largeur).
+    """
+    height, width = preview_shape(dataset, target_size)
+    if isinstance(indexes, int):
+        out_shape = (height, width)
+    else:
+        out_shape = (len(indexes), height, width)
+    return dataset.read(indexes, out_shape=out_shape, resampling=resampling)
+
+
+def has_overviews(dataset, band=1):
+    """
+    Indique si le raster possède des aperçus internes.
+
+    Args:
+        dataset (rasterio.DatasetReader): Raster ouvert.
+        band (int, optional): Bande à vérifier. Par défaut : 1.
+
+    Returns:
+        bool: True si au moins un niveau d'aperçu existe.
+    """
+    return len(dataset.overviews(band)) > 0
+
+
+def default_factors(height, width, min_size=256):
+    """
+    Facteurs de réduction (2, 4, 8, ...) jusqu'à ce que le plus grand côté passe sous `min_size`.
+
+    Args:
+        height (int): Hauteur du raster.
+        width (int): Largeur du raster.
+        min_size (int, optional): Taille du plus petit aperçu. Par défaut : 256.
+
+    Returns:
+        list[int]: Facteurs de réduction.
+    """
+    factors = []
+    factor = 2
+    while max(height, width) / (factor / 2) > min_size:
+        factors.append(factor)
+        factor *= 2
+    return factors
+
+
+def build_overviews(file_path, factors=None, resampling=Resampling.average):
+    """
+    Construit les aperçus internes d'un GeoTIFF, une fois pour toutes.
+
+    Args:
+        file_path (str): Chemin du GeoTIFF (ouvert en écriture).
+        factors (list[int], optional): Facteurs de réduction. Par défaut : `default_factors`.
+        resampling (Resampling, optional): Méthode de rééchantillonnage. Par défaut : average.
+
+    Returns:
+        list[int]: Facteurs effectivement construits.
+    """
+    with rasterio.open(file_path, "r+") as dataset:
+        if factors is None:
+            factors = default_factors(dataset.height, dataset.width)
+        if factors:
+            dataset.build_overviews(factors, resampling)
+            dataset.update_tags(ns="rio_overview", resampling=resampling.name)
+    return factors
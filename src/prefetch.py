@@ -0,0 +1,136 @@
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+import rasterio
+from src.instrumentation import record_read
+from src.sat_image_reader import SatImageReader
+
+
+class PrefetchLoader:
+    """
+    Chargement anticipé, en arrière-plan, d'une liste ordonnée de fichiers.
+
+    Pendant que l'appelant traite un fichier, les `prefetch` suivants sont
+    chargés par un pool de threads (GDAL libère le GIL pendant les lectures) :
+    l'attente disque ou réseau recouvre le calcul. Au plus `prefetch` résultats
+    sont en cours de chargement ou en attente de consommation : au-delà, le
+    chargement s'arrête jusqu'à ce que l'appelant avance (contre-pression), ce
+    qui borne la mémoire. Les résultats sont rendus dans l'ordre de la liste ;
+    une erreur de chargement est levée quand l'appelant atteint le fichier concerné.
+    """
+
+    def __init__(self, items, load, prefetch=4, workers=2):
+        """
+        Initialise le chargeur.
+
+        Args:
+            items (list): Éléments à charger, dans l'ordre (ex. chemins de fichiers .tif).
+            load (callable): Fonction de chargement d'un élément, exécutée dans un thread.
+            prefetch (int, optional): Nombre maximal d'éléments chargés à l'avance. Par défaut : 4.
+            workers (int, optional): Nombre de threads de chargement. Par défaut : 2.
+
+        Raises:
+            ValueError: Si `prefetch` ou `workers` est inférieur à 1.
+        """
+        if prefetch < 1 or workers < 1:
+            raise ValueError("prefetch et workers doivent valoir au moins 1")
+        self.items = list(items)
+        self.load = load
+        self.prefetch = prefetch
+        self.workers = workers
+        self.wait_seconds = 0.0  # Temps passé par l'appelant à attendre un chargement
+
+    def __iter__(self):
+        """
+        Génère les éléments chargés, dans l'ordre.
+
+        Yields:
+            tuple: (élément, résultat de `load`).
+        """
+        items = iter(self.items)
+        pending = deque()
+        executor = ThreadPoolExecutor(max_workers=self.workers)
+        try:
+            for item in items:
+                pending.append((item, executor.submit(self.load, item)))
+                if len(pending) >= self.prefetch:
+                    break
+            while pending:
+                item, future = pending.popleft()
+                start = time.perf_counter()
+                result = future.result()
+                self.wait_seconds += time.perf_counter() - start
+                # Une place s'est libérée : chargement de l'élément suivant
+                for next_item in items:
+                    pending.append((next_item, executor.submit(self.load, next_item)))
+                    break
+                yield item, result
+        finally:
+            # Arrêt anticipé de l'appelant : les chargements non commencés sont annulés
+            for _, future in pending:
+                future.cancel()
+            executor.shutdown(wait=True)
+
+
+def read_bands(tif_path, bands=None, window=None):
+    """
+    Lit les bandes (ou une fenêtre) d'un raster.
+
+    Args:
+        tif_path (str): Chemin du raster.
+        bands (list[int], optional): Bandes à lire. Par défaut : toutes.
+        window (rasterio.windows.Window, optional): Fenêtre à lire. Par défaut : toute l'image.
+
+    Returns:
+        np.array: Données (bandes, hauteur, largeur).
+    """
+    with rasterio.open(tif_path) as src:
+        data = src.read(bands, window=window)
+    record_read(data)
+    return data
+
+
+def iter_bands(file_paths, bands=None, window=None, prefetch=4, workers=2):
+    """
+    Parcourt des rasters en lisant à l'avance leurs bandes (ou une fenêtre).
+
+    Args:
+        file_paths (list[str]): Chemins des rasters, dans l'ordre de traitement.
+        bands (list[int], optional): Bandes à lire. Par défaut : toutes.
+        window (rasterio.windows.Window, optional): Fenêtre à lire. Par défaut : toute l'image.
+        prefetch (int, optional): Nombre maximal de rasters lus à l'avance. Par défaut : 4.
+        workers (int, optional): Nombre de threads de lecture. Par défaut : 2.
+
+    Yields:
+        tuple: (chemin, données (bandes, hauteur, largeur)).
+    """
+    yield from PrefetchLoader(file_paths, lambda path: read_bands(path, bands, window), prefetch, workers)
+
+
+def iter_readers(file_paths, bands=(3, 4), prefetch=4, workers=2, **reader_options):
+    """
+    Parcourt des scènes avec des `SatImageReader` dont les bandes sont déjà décodées.
+
+    Les bandes demandées sont lues à l'avance dans le cache de bandes de chaque
+    lecteur : `calculate_ndvi`, `show_rgb`... ne relisent pas le fichier. Chaque
+    lecteur est fermé dès que l'appelant passe au suivant.
+
+    Args:
+        file_paths (list[str]): Chemins des scènes, dans l'ordre de traitement.
+        bands (tuple, optional): Bandes à lire à l'avance. Par défaut : (3, 4) (rouge, infrarouge).
+        prefetch (int, optional): Nombre maximal de scènes lues à l'avance. Par défaut : 4.
+        workers (int, optional): Nombre de threads de lecture. Par défaut : 2.
+        **reader_options: Paramètres de `SatImageReader` (streaming, pool, band_cache).
+
+    Yields:
+        SatImageReader: Lecteur de chaque scène.
+    """
+    def load(path):
+        reader = SatImageReader(path, **reader_options)
+        for band in bands:
+            reader.read_band(band)
+        return reader
+
+    for _, reader in PrefetchLoader(file_paths, load, prefetch, workers):
+        with reader:
+            yield reader
@@ -0,0 +1,67 @@
+import numpy as np
+from rasterio.windows import Window
+
+
+def iter_block_windows(dataset, band=1, min_rows=256):
+    """
+    Parcourt un raster fenêtre par fenêtre en suivant ses blocs natifs.
+
+    Pour un GeoTIFF tuilé, chaque fenêtre correspond à une tuile. Pour un
+    GeoTIFF en bandes (blocs de quelques lignes sur toute la largeur), les
+    bandes consécutives sont regroupées pour obtenir au moins `min_rows` lignes.
+
+    Args:
+        dataset (rasterio.DatasetReader): Raster ouvert.
+        band (int, optional): Bande dont la structure de blocs est utilisée. Par défaut : 1.
+        min_rows (int, optional): Hauteur minimale des fenêtres en mode bandes. Par défaut : 256.
+
+    Yields:
+        rasterio.windows.Window: Fenêtres couvrant tout le raster.
+    """
+    block_rows, block_cols = dataset.block_shapes[band - 1]
+    if block_cols >= dataset.width and block_rows < min_rows:
+        rows = block_rows * -(-min_rows // block_rows)
+        for row_off in range(0, dataset.height, rows):
+            yield Window(0, row_off, dataset.width, min(rows, dataset.height - row_off))
+        return
+    for _, window in dataset.block_windows(band):
+        yield window
+
+
+def streaming_min_max(dataset, band):
+    """
+    Calcule le minimum et le maximum d'une bande fenêtre par fenêtre.
+
+    Args:
+        dataset (rasterio.DatasetReader): Raster ouvert.
+        band (int): Numéro de la bande.
+
+    Returns:
+        tuple: (minimum, maximum) de la bande.
+    """
+    band_min = None
+    band_max = None
+    for window in iter_block_windows(dataset, band):
+        data = dataset.read(band, window=window)
+        window_min = data.min()
+        window_max = data.max()
+        band_min = window_min if band_min is None else min(band_min, window_min)
+        band_max = window_max if band_max is None else max(band_max, window_max)
+    return band_min, band_max
+
+
+def normalize_window(data, band_min, band_max, out):
+    """
+    Normalise une fenêtre entre 0 et 255 avec un min/max global, dans `out` (uint8).
+
+    Args:
+        data (np.array): Données de la fenêtre.
+        band_min (float): Minimum global de la bande.
+        band_max (float): Maximum global de la bande.
+        out (np.array): Tableau uint8 de sortie, de même forme que `data`.
+    """
+    if band_max == band_min:
+        out[...] = 0
+        return
+    scale = 255.0 / (float(band_max) - float(band_min))
+    out[...] = np.clip((data - float(band_min)) * scale, 0, 255)
@@ -0,0 +1,275 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import rasterio
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.colors import to_rgb
+from matplotlib.figure import Figure
+from src.catalog import extract_aoi
+from src.class_index import is_class_index, onehot_to_class_index
+from src.instrumentation import profiled, record_read, span
+from src.overviews import read_preview
+from src.raster_windows import normalize_window
+
+CLASS_COLORS = ['b', 'g', 'r', 'c', 'm', 'y', 'k']
+CLASS_NAMES = [
+    'Classe 1 - Impervious Surfaces', 'Classe 2 - Agriculture',
+    'Classe 3 - Forest and Other Vegetation', 'Classe 4 - Wetlands',
+    'Classe 5 - Soil', 'Classe 6 - Water', 'Classe 7 - Ice and Snow'
+]
+
+# Couleur de chaque indice de classe (0 = aucune classe, en blanc) pour les aperçus de labels
+CLASS_LUT = np.array(
+    [(255, 255, 255)] + [tuple(round(255 * c) for c in to_rgb(color)) for color in CLASS_COLORS],
+    dtype=np.uint8,
+)
+
+
+class Renderer:
+    """
+    Rendu hors écran avec l'API objet de matplotlib (backend Agg).
+
+    Une seule figure est créée puis vidée et réutilisée à chaque rendu, sans
+    passer par l'état global de pyplot : la mémoire reste bornée quel que soit
+    le nombre d'images produites.
+    """
+
+    def __init__(self, dpi=100):
+        """
+        Initialise le moteur de rendu.
+
+        Args:
+            dpi (int, optional): Résolution des images produites. Par défaut : 100.
+        """
+        self.dpi = dpi
+        self._figure = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def figure(self, figsize=(10, 6)):
+        """
+        Figure vide, réutilisée d'un appel à l'autre.
+
+        Args:
+            figsize (tuple, optional): Taille (pouces). Par défaut : (10, 6).
+
+        Returns:
+            matplotlib.figure.Figure: Figure prête à dessiner.
+        """
+        if self._figure is None:
+            self._figure = Figure(figsize=figsize, dpi=self.dpi)
+            FigureCanvasAgg(self._figure)
+        else:
+            self._figure.clear()
+            self._figure.set_size_inches(figsize)
+        return self._figure
+
+    def axes(self, figsize=(10, 6)):
+        """
+        Axes uniques d'une figure réutilisée, à passer au paramètre `ax` des méthodes `show_*`.
+
+        Args:
+            figsize (tuple, optional): Taille (pouces). Par défaut : (10, 6).
+
+        Returns:
+            matplotlib.axes.Axes: Axes prêts à dessiner.
+        """
+        return self.figure(figsize).add_subplot()
+
+    def save(self, output_path, tight=False):
+        """
+        Enregistre la figure courante en PNG.
+
+        Args:
+            output_path (str): Chemin du fichier PNG.
+            tight (bool, optional): Recadre la figure sur son contenu. Par défaut : False.
+
+        Returns:
+            str: Chemin du fichier écrit.
+        """
+        with span("render"):
+            self._figure.savefig(output_path, bbox_inches="tight" if tight else None)
+        return output_path
+
+    def plot_mask_evol(self, evol_matrix, dates, folder_name):
+        """
+        Trace l'évolution des proportions de classes d'un dossier.
+
+        Args:
+            evol_matrix (np.array): Matrice d'évolution des masques (dates, classes).
+            dates (list): Liste des dates.
+            folder_name (str): Nom du dossier (titre).
+
+        Returns:
+            matplotlib.figure.Figure: Figure tracée.
+        """
+        figure = self.figure((10, 6))
+        ax = figure.add_subplot()
+        for i in range(evol_matrix.shape[1]):  # Boucle sur chaque classe
+            ax.plot(dates, evol_matrix[:, i], label=CLASS_NAMES[i], color=CLASS_COLORS[i])
+
+        ax.set_title(f"Évolution des masques - {folder_name}")
+        ax.set_xlabel("Dates")
+        ax.set_ylabel("Proportion de la classe (%)")
+        ax.set_ylim(0, 100)
+        ax.legend()
+        ax.grid()
+        ax.tick_params(axis="x", labelrotation=45)
+        for label in ax.get_xticklabels():
+            label.set_horizontalalignment("right")
+        figure.tight_layout()
+        return figure
+
+    def image(self, rgb_image):
+        """
+        Place une image (hauteur, largeur, 3) en uint8 pixel pour pixel, sans axes.
+
+        Args:
+            rgb_image (np.array): Image à afficher.
+
+        Returns:
+            matplotlib.figure.Figure: Figure de la taille de l'image.
+        """
+        height, width = rgb_image.shape[:2]
+        figure = self.figure((width / self.dpi, height / self.dpi))
+        figure.figimage(rgb_image, resize=False)
+        return figure
+
+    def close(self):
+        """Libère la figure réutilisée."""
+        if self._figure is not None:
+            self._figure.clear()
+            self._figure = None
+
+
+def quicklook_array(dataset, bands=(3, 2, 1), target_size=512, percentiles=(2, 98), labels=False):
+    """
+    Construit l'aperçu (hauteur, largeur, 3) en uint8 d'un raster ouvert.
+
+    La lecture passe par les aperçus internes (ou une lecture décimée). Les
+    images sont étirées entre les percentiles de l'aperçu ; les labels sont
+    coloriés avec les couleurs des classes de `show_mask_evol`.
+
+    Args:
+        dataset (rasterio.DatasetReader): Raster ouvert.
+        bands (tuple, optional): Bandes rouge, vert, bleu (images). Par défaut : (3, 2, 1).
+        target_size (int, optional): Taille maximale (en pixels) de l'aperçu. Par défaut : 512.
+        percentiles (tuple, optional): Percentiles bas/haut de l'étirement. Par défaut : (2, 98).
+        labels (bool, optional): Raster de labels (one-hot ou indices de classe). Par défaut : False.
+
+    Returns:
+        np.array: Aperçu RGB en uint8.
+    """
+    if labels:
+        if is_class_index(dataset):
+            index = read_preview(dataset, 1, target_size)
+        else:
+            index = onehot_to_class_index(read_preview(dataset, list(range(1, dataset.count + 1)), target_size))
+        record_read(index)
+        return CLASS_LUT[np.minimum(index, len(CLASS_LUT) - 1)]
+
+    if dataset.count < 3:
+        bands = (1, 1, 1)
+    data = read_preview(dataset, list(bands), target_size)
+    record_read(data)
+    rgb_image = np.empty(data.shape[1:] + (3,), dtype=np.uint8)
+    for channel in range(3):
+        low, high = np.percentile(data[channel], percentiles)
+        normalize_window(data[channel], low, high, rgb_image[..., channel])
+    return rgb_image
+
+
+# Moteur de rendu propre à chaque processus du pool, réutilisé d'une image à l'autre
+_process_renderer = None
+
+
+@profiled
+def write_quicklook(file_path, output_path, bands=(3, 2, 1), target_size=512, labels=False):
+    """
+    Écrit l'aperçu PNG d'un raster.
+
+    Fonction de module pour pouvoir être exécutée dans un pool de processus.
+
+    Args:
+        file_path (str): Chemin du raster.
+        output_path (str): Chemin du PNG à écrire.
+        bands (tuple, optional): Bandes rouge, vert, bleu (images). Par défaut : (3, 2, 1).
+        target_size (int, optional): Taille maximale (en pixels) de l'aperçu. Par défaut : 512.
+        labels (bool, optional): Raster de labels. Par défaut : False.
+
+    Returns:
+        str: Chemin du fichier écrit.
+    """
+    global _process_renderer
+    if _process_renderer is None:
+        _process_renderer = Renderer()
+    with rasterio.open(file_path) as dataset:
+        rgb_image = quicklook_array(dataset, bands, target_size, labels=labels)
+    _process_renderer.image(rgb_image)
+    return _process_renderer.save(output_path)
+
+
+def quicklook_name(file_path):
+    """
+    Nom du PNG d'aperçu d'un raster : `<AOI>_<nom du raster>.png`.
+
+    Les rasters de plusieurs AOI portent les mêmes noms datés : l'AOI (ou, à
+    défaut, le nom du dossier) les distingue.
+
+    Args:
+        file_path (str): Chemin du raster.
+
+    Returns:
+        str: Nom du fichier PNG.
+    """
+    stem = os.path.splitext(os.path.basename(file_path))[0]
+    return f"{extract_aoi(os.path.dirname(os.path.abspath(file_path)))}_{stem}.png"
+
+
+def batch_quicklooks(file_paths, output_dir, bands=(3, 2, 1), target_size=512, labels=False, max_workers=None):
+    """
+    Écrit les aperçus PNG de nombreux rasters en parallèle.
+
+    Chaque processus lit un aperçu réduit et réutilise sa propre figure : la
+    mémoire est bornée par processus et le débit suit le nombre de cœurs. Une
+    erreur (fichier corrompu) n'interrompt pas les autres aperçus.
+
+    Args:
+        file_paths (list[str]): Chemins des rasters.
+        output_dir (str): Dossier des PNG (`<AOI>_<nom du raster>.png`, voir `quicklook_name`).
+        bands (tuple, optional): Bandes rouge, vert, bleu (images). Par défaut : (3, 2, 1).
+        target_size (int, optional): Taille maximale (en pixels) des aperçus. Par défaut : 512.
+        labels (bool, optional): Rasters de labels. Par défaut : False.
+        max_workers (int, optional): Nombre de processus. Par défaut : nombre de cœurs.
+
+    Returns:
+        dict: Pour chaque raster, le chemin du PNG écrit ou l'exception levée.
+
+    Raises:
+        ValueError: Si deux rasters donneraient le même fichier PNG.
+    """
+    output_paths = {}
+    for file_path in file_paths:
+        output_path = os.path.join(output_dir, quicklook_name(file_path))
+        if output_paths.get(output_path, file_path) != file_path:
+            raise ValueError(f"Aperçus en conflit ({output_path}) : {output_paths[output_path]} et {file_path}")
+        output_paths[output_path] = file_path
+
+    os.makedirs(output_dir, exist_ok=True)
+    results = {}
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        futures = {
+            file_path: executor.submit(write_quicklook, file_path, output_path, bands, target_size, labels)
+            for output_path, file_path in output_paths.items()
+        }
+        for file_path, future in futures.items():
+            try:
+                results[file_path] = future.result()
+            except Exception as e:
+                print(f"Aperçu non généré pour {file_path} : {e}")
+                results[file_path] = e
+    return results
@@ -1,6 +1,54 @@
 import rasterio
 import numpy as np
-import matplotlib.pyplot as plt
+from src.band_cache import BandCache, window_key
+from src.dataset_pool import file_signature
+from src.histograms import HistogramAccumulator, band_histograms, is_exact_dtype
+from src.instrumentation import profiled, record_alloc, record_read, span
+from src.overviews import build_overviews, has_overviews, read_preview
+from src.raster_windows import iter_block_windows, normalize_window, streaming_min_max
+from src.spectral_indices import SpectralIndexEngine
+
+
+def current_axes(ax=None):
+    """
+    Axes où dessiner : ceux fournis, sinon les axes courants de pyplot.
+
+    pyplot n'est importé qu'au premier affichage : les calculs (NDVI, histogrammes,
+    lectures) n'en dépendent pas et restent rapides à importer.
+
+    Parameters:
+    - ax (matplotlib.axes.Axes, optional): Axes fournis par l'appelant.
+
+    Returns:
+    - ax (matplotlib.axes.Axes): Axes où dessiner.
+    """
+    if ax is not None:
+        return ax
+    import matplotlib.pyplot as plt
+
+    return plt.gca()
+
+
+def ndvi_from_bands(red, nir):
+    """
+    Calcule le NDVI à partir des bandes rouge et infrarouge.
+
+    Parameters:
+    - red (np.ndarray): Bande rouge.
+    - nir (np.ndarray): Bande infrarouge.
+
+    Returns:
+    - ndvi (np.ndarray): NDVI en float32, 0 là où nir + red == 0.
+    """
+    with span("ndvi"):
+        red = red.astype("float32")
+        nir = nir.astype("float32")
+        denominator = nir + red  # entre 0 et 2
+        with np.errstate(divide="ignore", invalid="ignore"):
+            ndvi = np.true_divide((nir - red), denominator)  # entre -1 et 1
+            ndvi[denominator == 0] = 0
+        record_alloc(red.nbytes * 4)  # conversions float32, dénominateur et résultat
+    return ndvi
 
 
 class SatImageReader:
@@ -8,29 +56,90 @@ class SatImageReader:
     Classe pour lire et afficher des images satellitaires.
     """
 
-    def __init__(self, file_path):
+    def __init__(self, file_path, streaming=False, pool=None, band_cache=None):
         """
         Initialise le lecteur d'image satellitaire.
 
+        Utilisable comme gestionnaire de contexte (`with SatImageReader(...) as reader:`) :
+        le fichier est fermé (ou rendu au pool) à la sortie du bloc.
+
         Parameters:
         - file_path (str): Chemin vers le fichier image raster.
+        - streaming (bool): Si True, les calculs (normalisation, histogrammes) sont faits
+          bloc par bloc, avec une mémoire bornée, au lieu de lire les bandes entières.
+        - pool (DatasetPool, optional): Pool de rasters ouverts partagé entre lecteurs. Un
+          fichier déjà ouvert dans le pool est réutilisé, sans relire son en-tête.
+        - band_cache (BandCache, optional): Cache des bandes décodées. Par défaut, un cache
+          propre au lecteur ; `shared_band_cache()` le partage entre tous les lecteurs du processus.
         """
         self.file_path = file_path
+        self.streaming = streaming
+        self.pool = pool
+        self.band_cache = band_cache if band_cache is not None else BandCache()
+        self._owns_cache = band_cache is None
+        self.image = None
         try:
-            self.image = rasterio.open(self.file_path)
+            self.image = pool.acquire(file_path) if pool is not None else rasterio.open(self.file_path)
             self.bandes = self.image.count
             self.metadata = self.image.meta
         except rasterio.errors.RasterioIOError as e:
             print(f"Erreur lors de l'ouverture du fichier: {e}")
             raise SystemExit(e)
+        self._cache_prefix = self._file_signature()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def _file_signature(self):
+        """Identité du fichier dans le cache des bandes (voir `file_signature`)."""
+        return file_signature(self.file_path)
+
+    def read_band(self, band, window=None, target_size=None):
+        """
+        Lit une bande (ou une fenêtre, ou un aperçu réduit) en passant par le cache des bandes.
+
+        Parameters:
+        - band (int): Numéro de la bande.
+        - window (rasterio.windows.Window, optional): Fenêtre à lire. Par défaut : la bande entière.
+        - target_size (int, optional): Taille maximale (en pixels) d'un aperçu réduit.
+
+        Returns:
+        - data (np.ndarray): Données décodées, en lecture seule (à copier avant modification).
+        """
+        def read():
+            if target_size is not None:
+                data = read_preview(self.image, band, target_size)
+            else:
+                data = self.image.read(band, window=window)
+            record_read(data)
+            return data
+
+        key = self._cache_prefix + (band, window_key(window), target_size)
+        return self.band_cache.get_or_read(key, read)
+
+    def close(self):
+        """
+        Ferme le fichier raster, ou le rend au pool où il reste ouvert.
+        """
+        if getattr(self, "_owns_cache", False):
+            self.band_cache.clear()
+        image, self.image = getattr(self, "image", None), None
+        if image is None:
+            return
+        if self.pool is not None:
+            self.pool.release(image)
+        elif not image.closed:
+            image.close()
 
     def __del__(self):
         """
         Assure la fermeture correcte du fichier raster lors de la destruction de l'objet.
 
         """
-        if self.image and not self.image.closed:
-            self.image.close()
+        self.close()
 
     def get_n_bands(self):
         """
@@ -38,61 +147,126 @@ class SatImageReader:
         """
         return self.bandes
 
-    def show_band(self, band=1):
+    def build_overviews(self, force=False):
+        """
+        Construit les aperçus internes du fichier pour accélérer les affichages réduits.
+
+        Les aperçus sont écrits dans le fichier et conservés pour les lectures suivantes.
+
+        Parameters:
+        - force (bool): Reconstruit les aperçus même s'ils existent déjà.
+        """
+        if has_overviews(self.image) and not force:
+            return
+        pool = self.pool
+        self.close()
+        if pool is not None:
+            pool.invalidate(self.file_path)
+        try:
+            build_overviews(self.file_path)
+        finally:
+            self.image = pool.acquire(self.file_path) if pool is not None else rasterio.open(self.file_path)
+            self.band_cache.invalidate(self._cache_prefix[:1])
+            self._cache_prefix = self._file_signature()
+
+    @profiled
+    def show_band(self, band=1, target_size=None, ax=None):
         """
         Affiche une bande spécifique de l'image.
 
         Parameters:
         - band (int): Numéro de la bande à afficher.
-        - fig_size (tuple): Taille de la figure matplotlib.
+        - target_size (int, optional): Taille maximale de l'affichage (en pixels). La bande
+          est alors lue depuis les aperçus internes ou par lecture décimée.
+        - ax (matplotlib.axes.Axes, optional): Axes où dessiner (ex. `Renderer.axes()` pour un
+          rendu hors écran). Par défaut : axes courants de pyplot.
         """
         if band < 1 or band > self.bandes:
             print(f"Bande {band} introuvable")
             raise SystemExit(f"Bande {band} introuvable")
-        data = self.image.read(band)
+        with span("decode"):
+            data = self.read_band(band, target_size=target_size)
 
-        plt.imshow(data, cmap="gray")
-        plt.colorbar()
-        plt.title(f"Bande {band}")
+        with span("render"):
+            ax = current_axes(ax)
+            image = ax.imshow(data, cmap="gray")
+            ax.figure.colorbar(image, ax=ax)
+            ax.set_title(f"Bande {band}")
 
-    def show_rgb(self, bands_rgb=(3, 2, 1)):
+    @profiled
+    def show_rgb(self, bands_rgb=(3, 2, 1), target_size=None, stats=None, percentiles=None, ax=None):
         """
         Affiche une image RGB composée de trois bandes.
 
         Parameters:
         - bands_rgb (tuple): Indices des bandes pour rouge, vert et bleu.
-        - fig_size (tuple): Taille de la figure matplotlib.
+        - target_size (int, optional): Taille maximale de l'affichage (en pixels). Les bandes
+          sont alors lues depuis les aperçus internes ou par lecture décimée.
+        - stats (BandStatsAccumulator, optional): Statistiques globales du jeu de données. Si
+          fournies, la normalisation utilise ces valeurs (identiques pour toutes les images) au
+          lieu du min/max de l'image, sans passe supplémentaire sur les données.
+        - percentiles (tuple, optional): Percentiles bas/haut de `stats` (ex. (2, 98)) à la place
+          du min/max global.
+        - ax (matplotlib.axes.Axes, optional): Axes où dessiner (ex. `Renderer.axes()` pour un
+          rendu hors écran). Par défaut : axes courants de pyplot.
         """
         if self.bandes < 3:
             print("Nombre insuffisant de bandes pour afficher une image RGB")
             raise SystemExit("Nombre insuffisant de bandes pour afficher une image RGB")
 
+        extrema = None
+        if stats is not None:
+            extrema = [stats.value_range_for(band, percentiles) for band in bands_rgb]
+
         try:
-            red = self.image.read(bands_rgb[0])
-            green = self.image.read(bands_rgb[1])
-            blue = self.image.read(bands_rgb[2])
+            if self.streaming and target_size is None:
+                rgb_image = self._streaming_rgb(bands_rgb, extrema)
+                with span("render"):
+                    ax = current_axes(ax)
+                    ax.imshow(rgb_image)
+                    ax.set_title("Image RGB")
+                return
+
+            with span("decode"):
+                red, green, blue = (self.read_band(band, target_size=target_size) for band in bands_rgb)
+
+            if extrema is not None:
+                with span("normalize"):
+                    rgb_image = np.empty(red.shape + (3,), dtype=np.uint8)
+                    record_alloc(rgb_image)
+                    for channel, data in enumerate((red, green, blue)):
+                        normalize_window(data, *extrema[channel], rgb_image[..., channel])
+                with span("render"):
+                    ax = current_axes(ax)
+                    ax.imshow(rgb_image)
+                    ax.set_title("Image RGB")
+                return
 
             # Normalisation des bandes
-            red = (
-                (red - red.min()) / (red.max() - red.min())
-                if red.max() != red.min()
-                else np.zeros_like(red)
-            )
-            green = (
-                (green - green.min()) / (green.max() - green.min())
-                if green.max() != green.min()
-                else np.zeros_like(green)
-            )
-            blue = (
-                (blue - blue.min()) / (blue.max() - blue.min())
-                if blue.max() != blue.min()
-                else np.zeros_like(blue)
-            )
+            with span("normalize"):
+                red = (
+                    (red - red.min()) / (red.max() - red.min())
+                    if red.max() != red.min()
+                    else np.zeros_like(red)
+                )
+                green = (
+                    (green - green.min()) / (green.max() - green.min())
+                    if green.max() != green.min()
+                    else np.zeros_like(green)
+                )
+                blue = (
+                    (blue - blue.min()) / (blue.max() - blue.min())
+                    if blue.max() != blue.min()
+                    else np.zeros_like(blue)
+                )
 
-            rgb_image = np.dstack((red, green, blue))
+                rgb_image = np.dstack((red, green, blue))
+                record_alloc(red.nbytes * 3 + rgb_image.nbytes)
 
-            plt.imshow(rgb_image)
-            plt.title("Image RGB")
+            with span("render"):
+                ax = current_axes(ax)
+                ax.imshow(rgb_image)
+                ax.set_title("Image RGB")
 
         except rasterio.errors.RasterioIOError as e:
             print(f"Erreur lors de la lecture des bandes RGB: {e}")
@@ -101,38 +275,153 @@ class SatImageReader:
             print(f"Erreur lors de l'affichage de l'image RGB: {e}")
             raise SystemExit(e)
 
+    @profiled
+    def _streaming_rgb(self, bands_rgb, extrema=None):
+        """
+        Construit l'image RGB normalisée (uint8) bloc par bloc.
+
+        Le min/max de chaque bande est calculé en une passe sur les blocs (sauf
+        s'il est fourni), puis chaque bloc est normalisé directement dans l'image de sortie.
+
+        Parameters:
+        - bands_rgb (tuple): Indices des bandes pour rouge, vert et bleu.
+        - extrema (list[tuple], optional): (min, max) de normalisation de chaque bande.
+
+        Returns:
+        - rgb_image (np.ndarray): Image (hauteur, largeur, 3) en uint8.
+        """
+        if extrema is None:
+            extrema = [streaming_min_max(self.image, band) for band in bands_rgb]
+        rgb_image = np.empty((self.image.height, self.image.width, 3), dtype=np.uint8)
+        record_alloc(rgb_image)
+        for window in iter_block_windows(self.image, bands_rgb[0]):
+            rows, cols = window.toslices()
+            for channel, band in enumerate(bands_rgb):
+                data = self.read_band(band, window=window)
+                band_min, band_max = extrema[channel]
+                normalize_window(data, band_min, band_max, rgb_image[rows, cols, channel])
+        return rgb_image
+
     def show_metadata(self):
         """
         Affiche les métadonnées de l'image.
         """
         print(self.metadata)
 
-    def show_band_hist(self, band=1):
+    @profiled
+    def band_hist(self, band=1, bins=256):
+        """
+        Calcule l'histogramme d'une bande sur l'intervalle (min, max) de la bande.
+
+        Les bandes entières sur 8 ou 16 bits sont comptées exactement en une passe
+        (`np.bincount`), sans copie aplatie. En mode streaming, la lecture se fait bloc par bloc.
+
+        Parameters:
+        - band (int): Numéro de la bande.
+        - bins (int): Nombre de classes.
+
+        Returns:
+        - counts (np.ndarray): Effectifs de chaque classe.
+        - edges (np.ndarray): Bornes des classes.
+        """
+        accumulator = self._histograms([band], bins)[0]
+        return accumulator.result(bins)
+
+    def _histograms(self, bands, bins, value_range=None):
+        """
+        Histogrammes de plusieurs bandes.
+
+        En mode streaming, lecture bloc par bloc (`band_histograms`). Sinon, les
+        bandes passent par le cache des bandes : une inspection ne décode chaque
+        bande qu'une fois, entre `show_rgb`, `show_rgb_hist` et `calculate_ndvi`.
+        """
+        if self.streaming:
+            return band_histograms(self.image, bands, bins, value_range, windowed=True)
+        data = [self.read_band(band) for band in bands]
+        if value_range is None and not is_exact_dtype(data[0].dtype):
+            value_range = (min(values.min() for values in data), max(values.max() for values in data))
+        accumulators = [HistogramAccumulator(bins, value_range) for _ in bands]
+        for accumulator, values in zip(accumulators, data):
+            accumulator.update(values)
+        return accumulators
+
+    def _band_max(self, band):
+        """Maximum d'une bande (bloc par bloc en mode streaming, depuis le cache sinon)."""
+        if self.streaming:
+            return streaming_min_max(self.image, band)[1]
+        return self.read_band(band).max()
+
+    @profiled
+    def show_band_hist(self, band=1, ax=None):
         """
         Affiche l'histogramme d'une bande spécifique.
 
         Parameters:
         - band (int): Numéro de la bande pour laquelle afficher l'histogramme.
+        - ax (matplotlib.axes.Axes, optional): Axes où dessiner (ex. `Renderer.axes()` pour un
+          rendu hors écran). Par défaut : axes courants de pyplot.
         """
         if band < 1 or band > self.bandes:
             print(f"Bande {band} introuvable")
             raise SystemExit(f"Bande {band} introuvable")
-        data = self.image.read(band)
-        plt.hist(data.flatten(), bins=256, range=(data.min(), data.max()), color="gray")
-        plt.title(f"Histogramme de la bande {band}")
-        plt.xlabel("Valeur de pixel")
-        plt.ylabel("Fréquence")
+        counts, edges = self.band_hist(band, bins=256)
+        with span("render"):
+            ax = current_axes(ax)
+            ax.stairs(counts, edges, fill=True, color="gray")
+            ax.set_title(f"Histogramme de la bande {band}")
+            ax.set_xlabel("Valeur de pixel")
+            ax.set_ylabel("Fréquence")
+
+    @profiled
+    def rgb_hist(self, bands_rgb=(3, 2, 1), show_infrared=True, bins=256):
+        """
+        Calcule les histogrammes des bandes RGB et éventuellement de la bande infrarouge.
+
+        L'intervalle est (0, 255) sans infrarouge, (0, max des bandes) sinon.
+
+        Parameters:
+        - bands_rgb (tuple): Indices des bandes pour rouge, vert et bleu.
+        - show_infrared (bool): Inclut la bande infrarouge (bande 4) si elle existe.
+        - bins (int): Nombre de classes.
+
+        Returns:
+        - histograms (dict): (counts, edges) pour "red", "green", "blue" et éventuellement "nir".
+        """
+        names = ["red", "green", "blue"]
+        bands = list(bands_rgb)
+        if show_infrared and self.bandes >= 4:
+            names.append("nir")
+            bands.append(4)
+
+        if is_exact_dtype(self.image.dtypes[bands[0] - 1]):
+            accumulators = self._histograms(bands, bins)
+            if not show_infrared:
+                range_bins = (0, 255)
+            else:
+                range_bins = (0, max(accumulator.max for accumulator in accumulators))
+        else:
+            if not show_infrared:
+                range_bins = (0, 255)
+            else:
+                range_bins = (0, max(self._band_max(band) for band in bands))
+            accumulators = self._histograms(bands, bins, range_bins)
 
-    def show_rgb_hist(self, bands_rgb=(3, 2, 1), show_infrared=True):
+        return {
+            name: accumulator.result(bins, range_bins)
+            for name, accumulator in zip(names, accumulators)
+        }
+
+    @profiled
+    def show_rgb_hist(self, bands_rgb=(3, 2, 1), show_infrared=True, ax=None):
         """
         Affiche les histogrammes des bandes RGB et éventuellement de la bande infrarouge.
 
         Parameters:
         - bands_rgb (tuple): Indices des bandes pour rouge, vert et bleu.
         - show_infrared (bool): Indique s'il faut afficher l'histogramme de la bande infrarouge.
+        - ax (matplotlib.axes.Axes, optional): Axes où dessiner (ex. `Renderer.axes()` pour un
+          rendu hors écran). Par défaut : axes courants de pyplot.
         """
-        red_band, green_band, blue_band = bands_rgb
-
         # Vérification des bandes
         max_band = max(bands_rgb)
         if show_infrared:
@@ -143,103 +432,134 @@ class SatImageReader:
                 "Les bandes spécifiées dépassent le nombre de bandes disponibles."
             )
 
-        # Lecture des données des bandes
         try:
-            data_red = self.image.read(red_band).flatten()
-            data_green = self.image.read(green_band).flatten()
-            data_blue = self.image.read(blue_band).flatten()
+            histograms = self.rgb_hist(bands_rgb, show_infrared, bins=256)
         except rasterio.errors.RasterioIOError as e:
             print(f"Erreur lors de la lecture des bandes RGB: {e}")
             raise SystemExit(e)
 
-        # optionnel : Bande infrarouge, lors de show_infrared=True
-        data_infrared = None
-        if show_infrared and self.bandes >= 4:
-            try:
-                data_infrared = self.image.read(4).flatten()
-            except rasterio.errors.RasterioIOError as e:
-                print(f"Erreur lors de la lecture de la bande infrarouge: {e}")
-                raise SystemExit(e)
-
-        bins = 256
-        if not show_infrared:
-            range_bins = (0, 255)
-        else:
-            if data_infrared is not None:
-                max_val = max(
-                    data_red.max(),
-                    data_green.max(),
-                    data_blue.max(),
-                    data_infrared.max(),
-                )
-            else:
-                max_val = max(data_red.max(), data_green.max(), data_blue.max())
-            range_bins = (0, max_val)
+        # histogrammes superposés, déjà calculés : seul le tracé reste à faire
+        styles = {
+            "red": ("red", "Rouge"),
+            "green": ("green", "Vert"),
+            "blue": ("blue", "Bleu"),
+            "nir": ("black", "Infrarouge"),
+        }
+        with span("render"):
+            ax = current_axes(ax)
+            for name, (counts, edges) in histograms.items():
+                color, label = styles[name]
+                ax.stairs(counts, edges, fill=True, color=color, alpha=0.5, label=label)
+
+            ax.set_title("Histogramme des bandes RGB")
+            ax.set_xlabel("Valeur des pixels")
+            ax.set_ylabel("Fréquence")
+            ax.legend()
+
+    @profiled
+    def calculate_ndvi(self, red_band_index=3, nir_band_index=4):
+        """
+        Calcule l'indice NDVI à partir des bandes rouge et infrarouge.
 
-        # histogrammes superposés
+        Parameters:
+        - red_band_index (int): Index de la bande rouge.
+        - nir_band_index (int): Index de la bande infrarouge.
 
-        plt.hist(
-            data_red, bins=bins, range=range_bins, color="red", alpha=0.5, label="Rouge"
-        )
-        plt.hist(
-            data_green,
-            bins=bins,
-            range=range_bins,
-            color="green",
-            alpha=0.5,
-            label="Vert",
-        )
-        plt.hist(
-            data_blue,
-            bins=bins,
-            range=range_bins,
-            color="blue",
-            alpha=0.5,
-            label="Bleu",
-        )
+        Returns:
+        - ndvi (np.ndarray): Indice NDVI calculé, ou None si les bandes sont invalides.
+        """
+        if self.bandes < max(red_band_index, nir_band_index):
+            print("Nombre insuffisant de bandes pour calculer le NDVI")
+            return None
+        try:
+            with span("decode"):
+                red = self.read_band(red_band_index)
+                nir = self.read_band(nir_band_index)
+            return ndvi_from_bands(red, nir)
+        except rasterio.errors.RasterioIOError as e:
+            print(f"Erreur lors de la lecture des bandes pour NDVI: {e}")
+            return None
 
-        if show_infrared and self.bandes >= 4 and data_infrared is not None:
-            plt.hist(
-                data_infrared,
-                bins=bins,
-                range=range_bins,
-                color="black",
-                alpha=0.5,
-                label="Infrarouge",
-            )
+    @profiled
+    def calculate_indices(self, indices=("ndvi",), band_map=None, reflectance_scale=1.0, dtype="float32"):
+        """
+        Calcule plusieurs indices spectraux en une seule lecture des bandes.
 
-        plt.title("Histogramme des bandes RGB")
-        plt.xlabel("Valeur des pixels")
-        plt.ylabel("Fréquence")
-        plt.legend()
+        Parameters:
+        - indices (tuple[str]): Indices parmi "ndvi", "ndwi", "savi", "evi".
+        - band_map (dict, optional): Numéros des bandes "blue", "green", "red", "nir".
+        - reflectance_scale (float): Facteur de conversion en réflectance (SAVI, EVI).
+        - dtype (str): "float32", "float16" ou "int16" (indice × 10000).
 
-    def calculate_ndvi(self, red_band_index=3, nir_band_index=4):
+        Returns:
+        - indices (dict): Tableau de chaque indice, par nom.
         """
-        Calcule l'indice NDVI à partir des bandes rouge et infrarouge.
+        engine = SpectralIndexEngine(self.image, band_map, reflectance_scale)
+        return engine.compute(indices, dtype=dtype)
+
+    @profiled
+    def write_indices(self, output_path, indices=("ndvi",), band_map=None, reflectance_scale=1.0, dtype="float32"):
+        """
+        Écrit une pile d'indices spectraux dans un GeoTIFF, bloc par bloc.
 
         Parameters:
+        - output_path (str): Chemin du GeoTIFF à écrire (une bande par indice).
+        - indices (tuple[str]): Indices parmi "ndvi", "ndwi", "savi", "evi".
+        - band_map (dict, optional): Numéros des bandes "blue", "green", "red", "nir".
+        - reflectance_scale (float): Facteur de conversion en réflectance (SAVI, EVI).
+        - dtype (str): "float32" ou "int16" (indice × 10000).
+
+        Returns:
+        - output_path (str): Chemin du fichier écrit.
+        """
+        engine = SpectralIndexEngine(self.image, band_map, reflectance_scale)
+        return engine.write(output_path, indices, dtype=dtype)
+
+    @profiled
+    def write_ndvi(self, output_path, red_band_index=3, nir_band_index=4):
+        """
+        Calcule le NDVI bloc par bloc et l'écrit dans un GeoTIFF tuilé.
+
+        Seul un bloc de chaque bande est en mémoire à la fois, ce qui permet de
+        traiter des rasters plus grands que la mémoire disponible.
+
+        Parameters:
+        - output_path (str): Chemin du GeoTIFF NDVI à écrire (float32, 1 bande).
         - red_band_index (int): Index de la bande rouge.
         - nir_band_index (int): Index de la bande infrarouge.
 
         Returns:
-        - ndvi (np.ndarray): Indice NDVI calculé, ou None si les bandes sont invalides.
+        - output_path (str): Chemin du fichier écrit, ou None si les bandes sont invalides.
         """
         if self.bandes < max(red_band_index, nir_band_index):
             print("Nombre insuffisant de bandes pour calculer le NDVI")
             return None
+
+        profile = self.image.profile.copy()
+        profile.update(
+            driver="GTiff",
+            count=1,
+            dtype="float32",
+            nodata=None,
+            tiled=True,
+            blockxsize=256,
+            blockysize=256,
+            compress="deflate",
+        )
         try:
-            red = self.image.read(red_band_index).astype("float32")
-            nir = self.image.read(nir_band_index).astype("float32")
-            denominator = nir + red  # entre 0 et 2
-            with np.errstate(divide="ignore", invalid="ignore"):
-                ndvi = np.true_divide((nir - red), denominator)  # entre -1 et 1
-                ndvi[denominator == 0] = 0
-            return ndvi
+            with rasterio.open(output_path, "w", **profile) as dst:
+                for _, window in dst.block_windows(1):
+                    red = self.image.read(red_band_index, window=window)
+                    nir = self.image.read(nir_band_index, window=window)
+                    record_read(red.nbytes + nir.nbytes)
+                    dst.write(ndvi_from_bands(red, nir), 1, window=window)
         except rasterio.errors.RasterioIOError as e:
-            print(f"Erreur lors de la lecture des bandes pour NDVI: {e}")
+            print(f"Erreur lors de l'écriture du NDVI: {e}")
             return None
+        return output_path
 
-    def show_ndvi(self, red_band_index=3, nir_band_index=4, threshold=None):
+    @profiled
+    def show_ndvi(self, red_band_index=3, nir_band_index=4, threshold=None, ax=None):
         """
         Affiche l'indice NDVI, avec option de seuil. Les valeurs au-dessus du seuil sont binarisées.
         Se renseigner sur les seuils classique de NDVI (végétation, eau, sol, etc).
@@ -248,6 +568,8 @@ class SatImageReader:
         - red_band_index (int): Index de la bande rouge.
         - nir_band_index (int): Index de la bande infrarouge.
         - threshold (float, optional): Seuil pour binariser le NDVI.
+        - ax (matplotlib.axes.Axes, optional): Axes où dessiner (ex. `Renderer.axes()` pour un
+          rendu hors écran). Par défaut : axes courants de pyplot.
         """
         ndvi = self.calculate_ndvi(red_band_index, nir_band_index)
         if ndvi is None:
@@ -256,9 +578,11 @@ class SatImageReader:
         if threshold is not None:
             ndvi = np.where(ndvi > threshold, 1, 0)
 
-        if threshold is not None:
-            plt.imshow(ndvi, cmap="gray")
-        else:
-            plt.imshow(ndvi, cmap="RdYlGn")
-        plt.colorbar()
-        plt.title("NDVI")
+        with span("render"):
+            ax = current_axes(ax)
+            if threshold is not None:
+                image = ax.imshow(ndvi, cmap="gray")
+            else:
+                image = ax.imshow(ndvi, cmap="RdYlGn")
+            ax.figure.colorbar(image, ax=ax)
+            ax.set_title("NDVI")
@@ -0,0 +1,198 @@
+import numpy as np
+import rasterio
+from src.raster_windows import iter_block_windows
+
+# Bandes par défaut : bleu, vert, rouge, proche infrarouge (ordre Planet / bands_rgb=(3, 2, 1))
+DEFAULT_BAND_MAP = {"blue": 1, "green": 2, "red": 3, "nir": 4}
+
+# Bandes nécessaires pour chaque indice
+INDEX_BANDS = {
+    "ndvi": ("red", "nir"),
+    "ndwi": ("green", "nir"),
+    "savi": ("red", "nir"),
+    "evi": ("blue", "red", "nir"),
+}
+
+# Facteur d'échelle et valeur nodata de la sortie entière
+INT16_SCALE = 10000
+INT16_NODATA = -32768
+
+OUTPUT_DTYPES = ("float32", "float16", "int16")
+
+
+class SpectralIndexEngine:
+    """
+    Calcule plusieurs indices spectraux en une seule lecture des bandes.
+
+    Chaque bande nécessaire n'est lue qu'une fois par fenêtre (directement en
+    float32 par GDAL) et tous les indices sont évalués avec des tampons
+    préalloués (`out=`), réutilisés d'une fenêtre à l'autre.
+    """
+
+    def __init__(self, dataset, band_map=None, reflectance_scale=1.0, savi_l=0.5):
+        """
+        Initialise le moteur d'indices.
+
+        Args:
+            dataset (rasterio.DatasetReader): Raster ouvert.
+            band_map (dict, optional): Numéros des bandes "blue", "green", "red", "nir".
+                Par défaut : `DEFAULT_BAND_MAP`.
+            reflectance_scale (float, optional): Facteur appliqué aux valeurs lues pour obtenir
+                une réflectance (ex. 1e-4 pour des produits SR en 0-10000). Utilisé par SAVI et EVI.
+            savi_l (float, optional): Paramètre L de SAVI. Par défaut : 0.5.
+        """
+        self.dataset = dataset
+        self.band_map = dict(DEFAULT_BAND_MAP if band_map is None else band_map)
+        self.reflectance_scale = reflectance_scale
+        self.savi_l = savi_l
+        self._buffers = {}
+
+    def _buffer(self, name, shape):
+        """Retourne un tampon float32 réutilisable pour une forme de fenêtre donnée."""
+        key = (name, shape)
+        if key not in self._buffers:
+            self._buffers[key] = np.empty(shape, dtype=np.float32)
+        return self._buffers[key]
+
+    def _check(self, indices, dtype):
+        unknown = [name for name in indices if name not in INDEX_BANDS]
+        if unknown:
+            raise ValueError(f"Indices inconnus : {unknown}")
+        if dtype not in OUTPUT_DTYPES:
+            raise ValueError(f"Type de sortie non supporté : {dtype}")
+        needed = sorted({band for name in indices for band in INDEX_BANDS[name]})
+        # Bande non renseignée dans band_map ou numéro hors de 1..count
+        missing = [
+            band for band in needed if band not in self.band_map or not 1 <= self.band_map[band] <= self.dataset.count
+        ]
+        if missing:
+            raise ValueError(f"Bandes absentes du raster ou de band_map : {missing}")
+        return needed
+
+    def _read_bands(self, needed, window):
+        """Lit chaque bande nécessaire une seule fois, en float32, dans un tampon."""
+        if window is None:
+            shape = (self.dataset.height, self.dataset.width)
+        else:
+            shape = (int(window.height), int(window.width))
+        bands = {}
+        for band in needed:
+            buffer = self._buffer(band, shape)
+            self.dataset.read(self.band_map[band], window=window, out=buffer)
+            bands[band] = buffer
+        return bands, shape
+
+    def _ratio(self, numerator, denominator, out):
+        """out = numerator / denominator, 0 là où le dénominateur est nul."""
+        out[...] = 0
+        np.divide(numerator, denominator, out=out, where=denominator != 0)
+
+    def _evaluate(self, name, bands, shape, out):
+        """Évalue un indice en float32 dans `out`, sans allocation de tableau pleine taille."""
+        num = self._buffer("_num", shape)
+        den = self._buffer("_den", shape)
+        if name == "ndvi":
+            np.subtract(bands["nir"], bands["red"], out=num)
+            np.add(bands["nir"], bands["red"], out=den)
+            self._ratio(num, den, out)
+        elif name == "ndwi":
+            np.subtract(bands["green"], bands["nir"], out=num)
+            np.add(bands["green"], bands["nir"], out=den)
+            self._ratio(num, den, out)
+        elif name == "savi":
+            scale = np.float32(self.reflectance_scale)
+            np.subtract(bands["nir"], bands["red"], out=num)
+            np.multiply(num, scale * np.float32(1 + self.savi_l), out=num)
+            np.add(bands["nir"], bands["red"], out=den)
+            np.multiply(den, scale, out=den)
+            np.add(den, np.float32(self.savi_l), out=den)
+            self._ratio(num, den, out)
+        elif name == "evi":
+            scale = np.float32(self.reflectance_scale)
+            np.subtract(bands["nir"], bands["red"], out=num)
+            np.multiply(num, scale * np.float32(2.5), out=num)
+            # den = (nir + 6 * red - 7.5 * blue) * scale + 1
+            tmp = self._buffer("_tmp", shape)
+            np.multiply(bands["red"], np.float32(6), out=den)
+            np.add(den, bands["nir"], out=den)
+            np.multiply(bands["blue"], np.float32(7.5), out=tmp)
+            np.subtract(den, tmp, out=den)
+            np.multiply(den, scale, out=den)
+            np.add(den, np.float32(1), out=den)
+            self._ratio(num, den, out)
+
+    def _cast(self, values, dtype, out):
+        """Convertit un indice float32 vers le type de sortie, dans `out`."""
+        if dtype == "float16":
+            np.copyto(out, values, casting="unsafe")
+        elif dtype == "int16":
+            np.multiply(values, np.float32(INT16_SCALE), out=values)
+            np.rint(values, out=values)
+            np.clip(values, INT16_NODATA + 1, np.iinfo(np.int16).max, out=values)
+            np.copyto(out, values, casting="unsafe")
+
+    def compute(self, indices=("ndvi",), window=None, dtype="float32"):
+        """
+        Calcule un ensemble d'indices sur tout le raster ou sur une fenêtre.
+
+        Args:
+            indices (tuple[str], optional): Indices parmi "ndvi", "ndwi", "savi", "evi".
+            window (rasterio.windows.Window, optional): Fenêtre à calculer. Par défaut : tout le raster.
+            dtype (str, optional): "float32", "float16" ou "int16" (indice × 10000). Par défaut : "float32".
+
+        Returns:
+            dict: Tableau de chaque indice, par nom.
+        """
+        needed = self._check(indices, dtype)
+        bands, shape = self._read_bands(needed, window)
+        results = {}
+        for name in indices:
+            out = np.empty(shape, dtype=dtype)
+            if dtype == "float32":
+                self._evaluate(name, bands, shape, out)
+            else:
+                values = self._buffer("_values", shape)
+                self._evaluate(name, bands, shape, values)
+                self._cast(values, dtype, out)
+            results[name] = out
+        return results
+
+    def write(self, output_path, indices=("ndvi",), dtype="float32"):
+        """
+        Calcule les indices bloc par bloc et les écrit dans un GeoTIFF multibande tuilé.
+
+        Une seule lecture des bandes par fenêtre suffit pour toute la pile d'indices.
+
+        Args:
+            output_path (str): Chemin du GeoTIFF à écrire (une bande par indice, dans l'ordre).
+            indices (tuple[str], optional): Indices à calculer.
+            dtype (str, optional): "float32" ou "int16" (indice × 10000). Le float16 n'est pas
+                disponible en écriture GeoTIFF.
+
+        Returns:
+            str: Chemin du fichier écrit.
+        """
+        needed = self._check(indices, dtype)
+        if dtype == "float16":
+            raise ValueError("Le float16 n'est pas supporté en GeoTIFF : utiliser int16")
+        profile = self.dataset.profile.copy()
+        profile.update(
+            driver="GTiff",
+            count=len(indices),
+            dtype=dtype,
+            nodata=INT16_NODATA if dtype == "int16" else None,
+            tiled=True,
+            blockxsize=256,
+            blockysize=256,
+            compress="deflate",
+        )
+        with rasterio.open(output_path, "w", **profile) as dst:
+            for window in iter_block_windows(self.dataset, self.band_map[needed[0]]):
+                results = self.compute(indices, window=window, dtype=dtype)
+                for band_index, name in enumerate(indices, start=1):
+                    dst.write(results[name], band_index, window=window)
+            for band_index, name in enumerate(indices, start=1):
+                dst.set_band_description(band_index, name.upper())
+            if dtype == "int16":
+                dst.update_tags(scale_factor=1 / INT16_SCALE)
+        return output_path
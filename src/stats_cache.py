@@ -0,0 +1,181 @@
+import os
+import sqlite3
+import time
+import numpy as np
+from src.instrumentation import profiled, record_cache
+
+# Version du calcul des vecteurs (`ground_truth.compute_file_evolution`) et de leur format.
+# À incrémenter à chaque changement : les caches d'une autre version sont vidés à l'ouverture.
+# 2 : proportions déduites de l'index de présence des classes.
+CACHE_VERSION = 2
+
+
+class StatsCache:
+    """
+    Cache persistant (SQLite) des vecteurs de proportions de classes par fichier.
+
+    Une entrée est identifiée par le chemin absolu du fichier et n'est valide que
+    si sa date de modification (mtime, en ns) et sa taille n'ont pas changé.
+    Une entrée périmée est invalidée à la lecture. Les entrées les moins
+    récemment utilisées sont évincées au-delà de `max_entries`. La base
+    enregistre la version du calcul des vecteurs : un cache écrit par une autre
+    version est vidé à l'ouverture.
+    """
+
+    def __init__(self, db_path, max_entries=None, version=CACHE_VERSION):
+        """
+        Ouvre (ou crée) le cache.
+
+        Args:
+            db_path (str): Chemin du fichier SQLite.
+            max_entries (int, optional): Nombre maximal d'entrées conservées. Par défaut : illimité.
+            version (int, optional): Version du calcul des vecteurs. Par défaut : `CACHE_VERSION`.
+        """
+        self.db_path = db_path
+        self.max_entries = max_entries
+        self.version = version
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self.evictions = 0
+        self.connection = sqlite3.connect(db_path)
+        self.connection.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS file_stats (
+                path TEXT PRIMARY KEY,
+                mtime_ns INTEGER NOT NULL,
+                size INTEGER NOT NULL,
+                vector BLOB NOT NULL,
+                last_access REAL NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS metadata (
+                key TEXT PRIMARY KEY,
+                value TEXT NOT NULL
+            );
+            """
+        )
+        row = self.connection.execute("SELECT value FROM metadata WHERE key = 'version'").fetchone()
+        if row is None or row[0] != str(version):
+            # Vecteurs calculés autrement (ou cache antérieur aux versions) : tout est à recalculer
+            self.connection.execute("DELETE FROM file_stats")
+            self.connection.execute("INSERT OR REPLACE INTO metadata VALUES ('version', ?)", (str(version),))
+        self.connection.commit()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def close(self):
+        """Applique l'éviction, enregistre les modifications et ferme la base."""
+        if self.connection is None:
+            return
+        self.commit()
+        self.connection.close()
+        self.connection = None
+
+    @profiled
+    def get(self, tif_path):
+        """
+        Retourne le vecteur en cache pour un fichier, s'il est encore valide.
+
+        Args:
+            tif_path (str): Chemin du fichier .tif.
+
+        Returns:
+            np.array: Vecteur en cache, ou None (absent ou périmé).
+        """
+        path = os.path.abspath(tif_path)
+        stat = os.stat(path)
+        row = self.connection.execute(
+            "SELECT mtime_ns, size, vector FROM file_stats WHERE path = ?", (path,)
+        ).fetchone()
+        if row is None:
+            self.misses += 1
+            record_cache("stats_cache", False)
+            return None
+        mtime_ns, size, vector = row
+        if mtime_ns != stat.st_mtime_ns or size != stat.st_size:
+            self.connection.execute("DELETE FROM file_stats WHERE path = ?", (path,))
+            self.invalidations += 1
+            self.misses += 1
+            record_cache("stats_cache", False)
+            return None
+        self.connection.execute(
+            "UPDATE file_stats SET last_access = ? WHERE path = ?", (time.time(), path)
+        )
+        self.hits += 1
+        record_cache("stats_cache", True)
+        return np.frombuffer(vector, dtype=np.float64).copy()
+
+    def put(self, tif_path, vector):
+        """
+        Enregistre le vecteur d'un fichier (validé par `commit`).
+
+        Args:
+            tif_path (str): Chemin du fichier .tif.
+            vector (np.array): Vecteur des proportions de classes.
+        """
+        path = os.path.abspath(tif_path)
+        stat = os.stat(path)
+        self.connection.execute(
+            "INSERT OR REPLACE INTO file_stats VALUES (?, ?, ?, ?, ?)",
+            (
+                path,
+                stat.st_mtime_ns,
+                stat.st_size,
+                np.asarray(vector, dtype=np.float64).tobytes(),
+                time.time(),
+            ),
+        )
+
+    def commit(self):
+        """Applique l'éviction LRU puis enregistre les modifications sur disque."""
+        if self.max_entries is not None:
+            cursor = self.connection.execute(
+                """
+                DELETE FROM file_stats WHERE path IN (
+                    SELECT path FROM file_stats ORDER BY last_access DESC LIMIT -1 OFFSET ?
+                )
+                """,
+                (self.max_entries,),
+            )
+            self.evictions += cursor.rowcount
+        self.connection.commit()
+
+    def prune_missing(self):
+        """
+        Supprime les entrées dont le fichier n'existe plus.
+
+        Returns:
+            int: Nombre d'entrées supprimées.
+        """
+        paths = [row[0] for row in self.connection.execute("SELECT path FROM file_stats")]
+        missing = [(path,) for path in paths if not os.path.exists(path)]
+        self.connection.executemany("DELETE FROM file_stats WHERE path = ?", missing)
+        self.connection.commit()
+        return len(missing)
+
+    def clear(self):
+        """Vide complètement le cache."""
+        self.connection.execute("DELETE FROM file_stats")
+        self.connection.commit()
+
+    def get_stats(self):
+        """
+        Retourne les compteurs du cache.
+
+        Returns:
+            dict: Compteurs "hits", "misses", "invalidations", "evictions", "entries" et "hit_rate".
+        """
+        entries = self.connection.execute("SELECT COUNT(*) FROM file_stats").fetchone()[0]
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "invalidations": self.invalidations,
+            "evictions": self.evictions,
+            "entries": entries,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
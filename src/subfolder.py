@@ -1,24 +1,20 @@
-import os
+import argparse
+from src.catalog import DatasetCatalog
 
-# Chemin vers le fichier contenant la sortie de tree
-tree_output_file = "/Users/ghalia/Desktop/output.txt"
+# Dossier racine des labels par défaut
+DATA_ROOT = "/Users/ghalia/Desktop/Telecom_IA/Projet Fil Rouge/airbus_ghalia/data/labels"
 
-# Liste pour stocker les répertoires contenant des fichiers .tif
-directories_with_tif = set()
+parser = argparse.ArgumentParser(description="Liste les dossiers contenant des fichiers .tif")
+parser.add_argument("--data-root", default=DATA_ROOT, help="Dossier racine des labels")
+parser.add_argument("--catalog", default="dataset_catalog.sqlite", help="Catalogue SQLite des rasters")
+args = parser.parse_args()
 
-with open(tree_output_file, "r") as file:
-    current_dir = None
-    for line in file:
-        line = line.strip()
-        if line.endswith("/"):  # Détecter un répertoire
-            current_dir = line
-        elif line.endswith(".tif") and current_dir:  # Si un fichier .tif est trouvé
-            directories_with_tif.add(current_dir)
-
-# Convertir en liste triée
-directories_with_tif = sorted(directories_with_tif)
+# Mise à jour incrémentale du catalogue (seuls les fichiers nouveaux ou modifiés sont ouverts)
+with DatasetCatalog(args.catalog, args.data_root) as catalog:
+    print(f"Catalogue : {catalog.scan()}")
+    directories_with_tif = catalog.folders(dated_only=False)
 
 # Afficher les résultats
 print("Directories containing .tif files:")
 for directory in directories_with_tif:
-    print(directory)
\ No newline at end of file
+    print(directory)
@@ -0,0 +1,219 @@
+import os
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+import rasterio
+from rasterio.enums import Resampling
+from rasterio.windows import Window, bounds, from_bounds
+from src.class_index import is_class_index, onehot_to_class_index
+
+# Types d'image conservés tels quels dans les archives
+COMPACT_DTYPES = (np.dtype(np.uint8), np.dtype(np.uint16))
+
+
+class TileExtractor:
+    """
+    Découpe une image et son raster de labels en patchs alignés (image, label).
+
+    L'image provient d'un `SatImageReader` et les labels (7 bandes one-hot, ou
+    raster d'indices de classe) d'un `ClassesReader`. Les labels sont convertis
+    en un seul indice de classe uint8 (0 = aucune classe). Si les deux rasters n'ont pas la même grille,
+    la fenêtre de labels est calculée à partir des coordonnées de la fenêtre
+    image et rééchantillonnée au plus proche voisin.
+    """
+
+    def __init__(
+        self,
+        image_reader,
+        label_reader,
+        tile_size=256,
+        stride=None,
+        min_labeled_fraction=0.0,
+        max_dominant_fraction=1.0,
+        image_bands=None,
+    ):
+        """
+        Initialise l'extracteur.
+
+        Args:
+            image_reader (SatImageReader): Lecteur de l'image.
+            label_reader (ClassesReader): Lecteur des labels one-hot.
+            tile_size (int, optional): Taille des patchs (pixels). Par défaut : 256.
+            stride (int, optional): Pas entre deux patchs. Par défaut : `tile_size` (sans recouvrement).
+            min_labeled_fraction (float, optional): Fraction minimale de pixels labellisés d'un patch.
+            max_dominant_fraction (float, optional): Fraction maximale de la classe majoritaire ;
+                permet d'écarter les patchs d'une seule classe pour équilibrer les classes.
+            image_bands (list[int], optional): Bandes de l'image à extraire. Par défaut : toutes.
+
+        Raises:
+            ValueError: Si les deux rasters n'ont pas le même système de coordonnées.
+        """
+        self.image_path = image_reader.file_path
+        self.label_path = label_reader.file_path
+        self.tile_size = tile_size
+        self.stride = stride or tile_size
+        self.min_labeled_fraction = min_labeled_fraction
+        self.max_dominant_fraction = max_dominant_fraction
+
+        image, labels = image_reader.image, label_reader.image
+        if image.crs != labels.crs:
+            raise ValueError("L'image et les labels n'ont pas le même système de coordonnées")
+        self.image_bands = list(image_bands) if image_bands is not None else list(range(1, image.count + 1))
+        self.label_bands = list(range(1, labels.count + 1))
+        self.labels_are_index = is_class_index(labels)
+        self.height = image.height
+        self.width = image.width
+        self.image_dtype = np.dtype(image.dtypes[self.image_bands[0] - 1])
+        self.transform = image.transform
+        self.label_transform = labels.transform
+        self.same_grid = (image.transform, image.shape) == (labels.transform, labels.shape)
+        self._local = threading.local()
+        self._opened = []
+        self._lock = threading.Lock()
+
+    def windows(self):
+        """
+        Fenêtres des patchs, ligne par ligne.
+
+        Yields:
+            rasterio.windows.Window: Fenêtre de chaque patch complet.
+        """
+        for row in range(0, self.height - self.tile_size + 1, self.stride):
+            for col in range(0, self.width - self.tile_size + 1, self.stride):
+                yield Window(col, row, self.tile_size, self.tile_size)
+
+    def _datasets(self):
+        """Rasters ouverts propres au thread courant (les handles rasterio ne sont pas partagés)."""
+        if not hasattr(self._local, "image"):
+            self._local.image = rasterio.open(self.image_path)
+            self._local.labels = rasterio.open(self.label_path)
+            with self._lock:
+                self._opened.extend([self._local.image, self._local.labels])
+        return self._local.image, self._local.labels
+
+    def close(self):
+        """Ferme les rasters ouverts par les threads de lecture."""
+        with self._lock:
+            for dataset in self._opened:
+                dataset.close()
+            self._opened = []
+        self._local = threading.local()
+
+    def _keep(self, label):
+        """Filtre d'équilibrage des classes."""
+        labeled = np.count_nonzero(label)
+        if labeled < self.min_labeled_fraction * label.size:
+            return False
+        if labeled and self.max_dominant_fraction < 1.0:
+            dominant = np.bincount(label.ravel(), minlength=8)[1:].max()
+            if dominant > self.max_dominant_fraction * label.size:
+                return False
+        return True
+
+    def read_tile(self, window):
+        """
+        Lit un patch aligné.
+
+        Args:
+            window (rasterio.windows.Window): Fenêtre dans la grille de l'image.
+
+        Returns:
+            tuple: (window, image (bandes, taille, taille), label (taille, taille) uint8),
+                ou None si le patch est écarté par le filtre.
+        """
+        image, labels = self._datasets()
+        if self.same_grid:
+            label = labels.read(self.label_bands, window=window)
+        else:
+            tile_bounds = bounds(window, self.transform)
+            label_window = from_bounds(*tile_bounds, transform=self.label_transform)
+            label = labels.read(
+                self.label_bands,
+                window=label_window,
+                out_shape=(len(self.label_bands), self.tile_size, self.tile_size),
+                resampling=Resampling.nearest,
+                boundless=True,
+            )
+        # Labels déjà encodés en indices de classe : une seule bande, pas de conversion
+        label = label[0] if self.labels_are_index else onehot_to_class_index(label)
+        if not self._keep(label):
+            return None
+        return window, image.read(self.image_bands, window=window), label
+
+    def iter_tiles(self, workers=4, prefetch=16):
+        """
+        Génère les patchs retenus, dans l'ordre, avec une lecture anticipée en parallèle.
+
+        Au plus `prefetch` patchs sont en cours de lecture, ce qui borne la mémoire.
+
+        Args:
+            workers (int, optional): Nombre de threads de lecture. Par défaut : 4.
+            prefetch (int, optional): Nombre maximal de patchs lus à l'avance. Par défaut : 16.
+
+        Yields:
+            tuple: (window, image, label) pour chaque patch retenu.
+        """
+        try:
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                pending = deque()
+                for window in self.windows():
+                    pending.append(executor.submit(self.read_tile, window))
+                    if len(pending) >= prefetch:
+                        tile = pending.popleft().result()
+                        if tile is not None:
+                            yield tile
+                while pending:
+                    tile = pending.popleft().result()
+                    if tile is not None:
+                        yield tile
+        finally:
+            self.close()
+
+    def write_shards(self, output_dir, shard_size=512, workers=4, prefix="tiles"):
+        """
+        Écrit les patchs dans des archives compressées (.npz) de `shard_size` patchs.
+
+        Chaque archive contient `images` (uint8/uint16), `labels` (uint8) et
+        `offsets` (ligne, colonne du coin supérieur gauche de chaque patch).
+
+        Args:
+            output_dir (str): Dossier de sortie.
+            shard_size (int, optional): Nombre de patchs par archive. Par défaut : 512.
+            workers (int, optional): Nombre de threads de lecture. Par défaut : 4.
+            prefix (str, optional): Préfixe des fichiers. Par défaut : "tiles".
+
+        Returns:
+            list[str]: Chemins des archives écrites.
+
+        Raises:
+            ValueError: Si l'image n'est pas en uint8 ou uint16.
+        """
+        if self.image_dtype not in COMPACT_DTYPES:
+            raise ValueError(f"Type d'image non compact : {self.image_dtype} (uint8 ou uint16 attendu)")
+        os.makedirs(output_dir, exist_ok=True)
+        shard_paths = []
+        images, labels, offsets = [], [], []
+
+        def flush():
+            path = os.path.join(output_dir, f"{prefix}_{len(shard_paths):05d}.npz")
+            np.savez_compressed(
+                path,
+                images=np.stack(images),
+                labels=np.stack(labels),
+                offsets=np.array(offsets, dtype=np.int32),
+            )
+            shard_paths.append(path)
+            images.clear()
+            labels.clear()
+            offsets.clear()
+
+        for window, image, label in self.iter_tiles(workers=workers):
+            images.append(image)
+            labels.append(label)
+            offsets.append((window.row_off, window.col_off))
+            if len(images) == shard_size:
+                flush()
+        if images:
+            flush()
+        return shard_paths
@@ -0,0 +1,190 @@
+import numpy as np
+from rasterio.features import rasterize
+from src.change_detection import N_CLASSES, read_class_index_window
+from src.instrumentation import profiled, record_read
+from src.raster_windows import iter_block_windows
+from src.sat_image_reader import ndvi_from_bands
+
+
+def load_polygons(polygons, crs=None):
+    """
+    Charge des polygones et les reprojette dans le système du raster.
+
+    geopandas n'est importé qu'ici : le reste du module n'en dépend pas.
+
+    Args:
+        polygons (str | geopandas.GeoDataFrame): Fichier vectoriel (GeoPackage, shapefile,
+            GeoJSON...) ou GeoDataFrame.
+        crs (rasterio.crs.CRS, optional): Système de coordonnées du raster.
+
+    Returns:
+        geopandas.GeoDataFrame: Polygones, dans le système du raster.
+    """
+    if isinstance(polygons, str):
+        import geopandas as gpd
+
+        polygons = gpd.read_file(polygons)
+    if crs is not None and polygons.crs is not None and polygons.crs != crs:
+        polygons = polygons.to_crs(crs)
+    return polygons
+
+
+def _combine_moments(count, mean, m2, zones, values, n_bins):
+    """
+    Ajoute les valeurs d'une fenêtre aux moments (effectif, moyenne, M2) de chaque zone.
+
+    Moyenne et M2 de la fenêtre sont calculés par zone (écarts à la moyenne de
+    la fenêtre, en float64), puis combinés aux états cumulés par la formule de
+    Chan, comme `BandStatsAccumulator` : pas de différence E[x²] - E[x]² instable.
+    """
+    window_count = np.bincount(zones, minlength=n_bins).astype(np.float64)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        window_mean = np.where(window_count > 0, np.bincount(zones, weights=values, minlength=n_bins) / window_count, 0)
+    window_m2 = np.bincount(zones, weights=(values - window_mean[zones]) ** 2, minlength=n_bins)
+
+    total = count + window_count
+    delta = window_mean - mean
+    with np.errstate(divide="ignore", invalid="ignore"):
+        weight = np.where(total > 0, window_count / total, 0)
+    mean += delta * weight
+    m2 += window_m2 + delta * delta * count * weight
+    count[:] = total
+
+
+class ZonalStats:
+    """
+    Statistiques par polygone (parcelle, champ, unité administrative) d'une AOI.
+
+    Les polygones sont rasterisés une seule fois en une grille de zones alignée
+    sur le raster (zone 0 = hors polygone, zone i = i-ème polygone). Les
+    statistiques de toutes les zones sont ensuite calculées en une passe par
+    fenêtre, avec un `np.bincount` sur les identifiants de zone, au lieu de
+    masquer le raster polygone par polygone. En cas de recouvrement, un pixel
+    appartient au dernier polygone.
+    """
+
+    def __init__(self, polygons, dataset, id_column=None, all_touched=False):
+        """
+        Rasterise les polygones sur la grille d'un raster.
+
+        Args:
+            polygons (str | geopandas.GeoDataFrame): Polygones, ou chemin d'un fichier vectoriel.
+            dataset (rasterio.DatasetReader): Raster de référence (grille, système de coordonnées).
+            id_column (str, optional): Colonne identifiant les polygones dans les résultats.
+                Par défaut : index des polygones.
+            all_touched (bool, optional): Inclut tous les pixels touchés par un polygone, et pas
+                seulement ceux dont le centre est dans le polygone. Par défaut : False.
+        """
+        polygons = load_polygons(polygons, dataset.crs)
+        self.ids = list(polygons[id_column] if id_column is not None else polygons.index)
+        self.n_zones = len(self.ids)
+        self.shape = (dataset.height, dataset.width)
+        self.transform = dataset.transform
+        self.zones = rasterize(
+            (
+                (geometry, zone)
+                for zone, geometry in enumerate(polygons.geometry, start=1)
+                if geometry is not None and not geometry.is_empty
+            ),
+            out_shape=self.shape,
+            transform=dataset.transform,
+            fill=0,
+            all_touched=all_touched,
+            dtype=np.int32,
+        )
+
+    def _check_grid(self, dataset):
+        if (dataset.height, dataset.width) != self.shape or dataset.transform != self.transform:
+            raise ValueError(f"Le raster {dataset.name} n'est pas aligné sur la grille des zones")
+
+    @profiled
+    def compute(self, classes_reader=None, image_reader=None, red_band_index=3, nir_band_index=4, n_classes=N_CLASSES):
+        """
+        Calcule la couverture des classes et les statistiques de NDVI de chaque zone.
+
+        Les labels et l'image sont lus fenêtre par fenêtre, en une seule passe.
+        Le NDVI est celui de `SatImageReader.calculate_ndvi` (`ndvi_from_bands`) ;
+        les pixels où rouge + infrarouge == 0 (sans donnée) sont ignorés.
+
+        Args:
+            classes_reader (ClassesReader, optional): Labels (one-hot ou indices de classe).
+            image_reader (SatImageReader, optional): Image pour le NDVI.
+            red_band_index (int, optional): Index de la bande rouge. Par défaut : 3.
+            nir_band_index (int, optional): Index de la bande infrarouge. Par défaut : 4.
+            n_classes (int, optional): Nombre de classes. Par défaut : 7.
+
+        Returns:
+            dict: Tableaux indexés par zone (dans l'ordre de `ids`) : "pixels", "coverage"
+                (zones, classes) en %, "ndvi_count", "ndvi_mean" et "ndvi_std".
+
+        Raises:
+            ValueError: Si aucun raster n'est fourni ou si un raster n'est pas aligné sur la grille.
+        """
+        readers = [reader for reader in (classes_reader, image_reader) if reader is not None]
+        if not readers:
+            raise ValueError("Aucun raster à résumer")
+        for reader in readers:
+            self._check_grid(reader.image)
+
+        n_bins = self.n_zones + 1
+        pixels = np.bincount(self.zones.ravel(), minlength=n_bins)
+        class_counts = np.zeros(n_bins * (n_classes + 1), dtype=np.int64)
+        ndvi_count = np.zeros(n_bins)
+        ndvi_mean = np.zeros(n_bins)
+        ndvi_m2 = np.zeros(n_bins)
+
+        for window in iter_block_windows(readers[0].image):
+            rows, cols = window.toslices()
+            zones = self.zones[rows, cols].ravel()
+            if classes_reader is not None:
+                index = read_class_index_window(classes_reader.image, window, n_classes).ravel()
+                record_read(index)
+                # Une seule passe pour toutes les (zone, classe)
+                class_counts += np.bincount(
+                    zones * (n_classes + 1) + np.minimum(index, n_classes),
+                    minlength=class_counts.size,
+                )
+            if image_reader is not None:
+                red = image_reader.image.read(red_band_index, window=window)
+                nir = image_reader.image.read(nir_band_index, window=window)
+                record_read(red.nbytes + nir.nbytes)
+                valid = (red.astype(np.float32) + nir) != 0
+                ndvi = ndvi_from_bands(red, nir).ravel()[valid.ravel()].astype(np.float64)
+                valid_zones = zones[valid.ravel()]
+                _combine_moments(ndvi_count, ndvi_mean, ndvi_m2, valid_zones, ndvi, n_bins)
+
+        # La zone 0 (hors polygones) est retirée
+        results = {"pixels": pixels[1:]}
+        if classes_reader is not None:
+            counts = class_counts.reshape(n_bins, n_classes + 1)[1:, 1:]
+            with np.errstate(divide="ignore", invalid="ignore"):
+                results["coverage"] = np.where(pixels[1:, None] > 0, counts / pixels[1:, None] * 100, np.nan)
+        if image_reader is not None:
+            count = ndvi_count[1:]
+            with np.errstate(divide="ignore", invalid="ignore"):
+                results["ndvi_mean"] = np.where(count > 0, ndvi_mean[1:], np.nan)
+                results["ndvi_std"] = np.where(count > 0, np.sqrt(np.maximum(ndvi_m2[1:] / count, 0)), np.nan)
+            results["ndvi_count"] = count.astype(np.int64)
+        return results
+
+    def to_dataframe(self, results):
+        """
+        Met les résultats de `compute` sous forme de DataFrame pandas (une ligne par zone).
+
+        Args:
+            results (dict): Résultats de `compute`.
+
+        Returns:
+            pandas.DataFrame: Colonnes "pixels", "class_1"... (en %), "ndvi_count", "ndvi_mean"
+                et "ndvi_std", indexées par identifiant de zone.
+        """
+        import pandas as pd
+
+        columns = {"pixels": results["pixels"]}
+        if "coverage" in results:
+            for i in range(results["coverage"].shape[1]):
+                columns[f"class_{i + 1}"] = results["coverage"][:, i]
+        for name in ("ndvi_count", "ndvi_mean", "ndvi_std"):
+            if name in results:
+                columns[name] = results[name]
+        return pd.DataFrame(columns, index=pd.Index(self.ids, name="zone"))
@@ -0,0 +1,16 @@
+import numpy as np
+from src.band_stats import BandStatsAccumulator
+
+
+def test_nan_nodata_is_ignored():
+    stats = BandStatsAccumulator([1])
+    stats.update(1, np.array([1, np.nan, 3], dtype=np.float32), nodata=np.nan)
+    assert stats.count[0] == 2
+    assert (stats.min[0], stats.max[0], stats.mean[0]) == (1, 3, 2)
+
+
+def test_nan_pixels_ignored_with_numeric_nodata():
+    stats = BandStatsAccumulator([1])
+    stats.update(1, np.array([1, np.nan, 3, -9], dtype=np.float32), nodata=-9)
+    assert stats.count[0] == 2
+    assert stats.mean[0] == 2
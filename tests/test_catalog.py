@@ -0,0 +1,39 @@
+import numpy as np
+import rasterio
+from rasterio.transform import from_origin
+from src.catalog import DatasetCatalog
+
+
+def write_raster(path, count):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with rasterio.open(
+        path,
+        "w",
+        driver="GTiff",
+        width=4,
+        height=4,
+        count=count,
+        dtype="uint8",
+        crs="EPSG:32610",
+        transform=from_origin(0, 0, 10, 10),
+    ) as dst:
+        dst.write(np.zeros((count, 4, 4), dtype=np.uint8))
+
+
+def test_label_folders(tmp_path):
+    """Seuls les dossiers feuilles `*-L3H-SR` de rasters à 7 bandes sont des séries de labels."""
+    raster = tmp_path / "1311_3077_13_10N" / "Labels" / "Raster"
+    leaf = raster / "10N-123W-36N-L3H-SR"
+    images = tmp_path / "1311_3077_13_10N" / "Images" / "10N-123W-36N-L3H-SR"
+    write_raster(raster / "lab_2020_01_01.tif", 7)
+    write_raster(leaf / "lab_2020_01_01.tif", 7)
+    write_raster(leaf / "lab_2020_01_02.tif", 7)
+    (leaf / "lab_2020_01_03.tif").write_bytes(b"pas un raster")
+    write_raster(images / "img_2020_01_01.tif", 4)
+
+    with DatasetCatalog(str(tmp_path / "catalog.sqlite"), str(tmp_path)) as catalog:
+        assert catalog.scan()["added"] == 5
+        assert len(catalog.folders()) == 3
+        assert catalog.label_folders() == [str(leaf)]
+        errors = [row for row in catalog.files(folder=str(leaf)) if row["error"] is not None]
+        assert [row["date"] for row in errors] == ["2020-01-03"]
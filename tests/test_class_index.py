@@ -0,0 +1,39 @@
+import numpy as np
+import pytest
+import rasterio
+from rasterio.transform import from_origin
+from src.class_index import decode_class_index, encode_class_index
+
+
+def write_onehot(path, onehot):
+    with rasterio.open(
+        path,
+        "w",
+        driver="GTiff",
+        width=onehot.shape[2],
+        height=onehot.shape[1],
+        count=onehot.shape[0],
+        dtype="uint8",
+        crs="EPSG:32610",
+        transform=from_origin(0, 0, 10, 10),
+    ) as dst:
+        dst.write(onehot)
+
+
+def test_round_trip(tmp_path):
+    index = np.random.default_rng(0).integers(0, 8, (32, 32))
+    onehot = np.stack([(index == c).astype(np.uint8) for c in range(1, 8)])
+    write_onehot(tmp_path / "onehot.tif", onehot)
+    encode_class_index(str(tmp_path / "onehot.tif"), str(tmp_path / "index.tif"))
+    decode_class_index(str(tmp_path / "index.tif"), str(tmp_path / "decoded.tif"))
+    with rasterio.open(tmp_path / "decoded.tif") as src:
+        assert np.array_equal(src.read(), onehot)
+
+
+def test_overlap_leaves_no_output(tmp_path):
+    onehot = np.zeros((7, 16, 16), dtype=np.uint8)
+    onehot[0:2, 3, 3] = 1
+    write_onehot(tmp_path / "onehot.tif", onehot)
+    with pytest.raises(ValueError):
+        encode_class_index(str(tmp_path / "onehot.tif"), str(tmp_path / "index.tif"))
+    assert sorted(path.name for path in tmp_path.iterdir()) == ["onehot.tif"]
@@ -0,0 +1,93 @@
+import warnings
+import numpy as np
+import pytest
+import rasterio
+from rasterio.transform import from_origin
+from src.compositing import TemporalCompositor, group_by_month, monthly_composites
+
+SIZE = 40
+NODATA = 0
+
+
+@pytest.fixture
+def scenes(tmp_path):
+    """Trois scènes à 4 bandes (nodata = 0), dont un pixel sans aucune observation valide."""
+    rng = np.random.default_rng(0)
+    data = rng.integers(1, 1000, size=(3, 4, SIZE, SIZE)).astype(np.uint16)
+    data[0, 2, :10, :] = NODATA  # Rouge manquant : pixel invalide dans la scène 0
+    data[1, :, 5:15, 5:15] = NODATA
+    data[:, 0, 0, 0] = NODATA  # Aucune observation valide
+    paths = []
+    for t, scene in enumerate(data):
+        path = str(tmp_path / f"scene_2020_01_{t + 1:02d}.tif")
+        with rasterio.open(
+            path,
+            "w",
+            driver="GTiff",
+            width=SIZE,
+            height=SIZE,
+            count=4,
+            dtype="uint16",
+            nodata=NODATA,
+            crs="EPSG:32631",
+            transform=from_origin(500000, 4000000, 3, 3),
+        ) as dst:
+            dst.write(scene)
+        paths.append(path)
+    return paths, data
+
+
+def brute_force(data, method):
+    stack = data.astype(np.float64)
+    invalid = (stack == NODATA).any(axis=1)
+    if method == "max_ndvi":
+        red, nir = stack[:, 2], stack[:, 3]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            ndvi = np.where(nir + red != 0, (nir - red) / (nir + red), 0)
+        ndvi[invalid] = -np.inf
+        best = np.argmax(ndvi, axis=0)
+        result = np.take_along_axis(stack, best[None, None], axis=0)[0]
+        result[:, invalid.all(axis=0)] = np.nan
+        return result
+    stack[np.broadcast_to(invalid[:, None], stack.shape)] = np.nan
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", RuntimeWarning)
+        return np.nanmedian(stack, axis=0) if method == "median" else np.nanmean(stack, axis=0)
+
+
+@pytest.mark.parametrize("method", ["median", "mean", "max_ndvi"])
+def test_write_matches_brute_force(scenes, tmp_path, method):
+    paths, data = scenes
+    output_path = TemporalCompositor(paths, method, block_size=16).write(str(tmp_path / "out.tif"), max_workers=1)
+    with rasterio.open(output_path) as src:
+        result = src.read()
+        assert src.tags()["method"] == method
+    expected = brute_force(data, method)
+    np.testing.assert_allclose(result, expected, rtol=1e-6)
+    assert np.isnan(result[:, 0, 0]).all()
+
+
+def test_invalid_inputs(scenes, tmp_path):
+    paths, _ = scenes
+    with pytest.raises(ValueError):
+        TemporalCompositor(paths, "mode")
+    with pytest.raises(ValueError):
+        TemporalCompositor([])
+    with pytest.raises(ValueError):
+        TemporalCompositor(paths, "max_ndvi", bands=[1, 2, 3])
+    with rasterio.open(paths[0]) as src:
+        profile = src.profile
+    profile.update(width=SIZE // 2)
+    other = str(tmp_path / "other_2020_02_01.tif")
+    with rasterio.open(other, "w", **profile):
+        pass
+    with pytest.raises(ValueError):
+        TemporalCompositor(paths + [other])
+
+
+def test_monthly_composites(scenes, tmp_path):
+    paths, data = scenes
+    assert list(group_by_month(paths)) == ["2020-01"]
+    results = monthly_composites(paths, str(tmp_path / "composites"), "mean", max_workers=1)
+    with rasterio.open(results["2020-01"]) as src:
+        np.testing.assert_allclose(src.read(), brute_force(data, "mean"), rtol=1e-6)
@@ -0,0 +1,61 @@
+import numpy as np
+import pytest
+import rasterio
+from rasterio.transform import from_origin
+from src.datacube import DataCube
+
+DATES = ["2020-01-01", "2020-01-02", "2020-01-03", "2020-01-04", "2020-01-05"]
+
+
+@pytest.fixture
+def cube(tmp_path):
+    """Cube de 5 dates (2 bandes, 4×4) : chaque pixel vaut l'indice de sa date."""
+    folder = tmp_path / "aoi"
+    folder.mkdir()
+    for t, date in enumerate(DATES):
+        with rasterio.open(
+            folder / f"lab_{date.replace('-', '_')}.tif",
+            "w",
+            driver="GTiff",
+            width=4,
+            height=4,
+            count=2,
+            dtype="uint8",
+            crs="EPSG:32610",
+            transform=from_origin(0, 0, 10, 10),
+        ) as dst:
+            dst.write(np.full((2, 4, 4), t, dtype=np.uint8))
+    return DataCube(str(folder), cache_dir=str(tmp_path / "cache"))
+
+
+def times_of(data):
+    return [int(frame[0, 0, 0]) for frame in data]
+
+
+def test_integer_and_date_keys(cube):
+    assert cube[1].shape == (2, 4, 4)
+    assert cube["2020-01-03"][0, 0, 0] == 2
+    assert cube[-1][0, 0, 0] == 4
+
+
+def test_numpy_integer_key(cube):
+    assert cube[np.int64(1)].shape == (2, 4, 4)
+    assert cube[np.int64(1), 0].shape == (4, 4)
+
+
+def test_stepped_slice(cube):
+    assert cube[::2].shape == (3, 2, 4, 4)
+    assert times_of(cube[::2]) == [0, 2, 4]
+    assert times_of(cube[1::2]) == [1, 3]
+
+
+def test_negative_slices(cube):
+    assert times_of(cube[::-1]) == [4, 3, 2, 1, 0]
+    assert times_of(cube[-2:]) == [3, 4]
+    assert times_of(cube[-3:-1, :1]) == [2, 3]
+
+
+def test_date_slices(cube):
+    assert times_of(cube["2020-01-02":"2020-01-04"]) == [1, 2, 3]
+    assert times_of(cube["2020-01-01":"2020-01-05":2]) == [0, 2, 4]
+    assert cube["2021-01-01":].shape[0] == 0
@@ -0,0 +1,62 @@
+import os
+import numpy as np
+from src.evolution_store import EvolutionStore
+
+DATES = ["2020-01-01", "2020-01-02", "2020-01-03"]
+
+
+def matrix(n_dates, offset=0.0):
+    return np.arange(n_dates * 7, dtype=np.float64).reshape(n_dates, 7) + offset
+
+
+def n_files(store, aoi):
+    return len([name for name in os.listdir(store.partition_dir(aoi)) if name.endswith(".parquet")])
+
+
+def test_empty_store(tmp_path):
+    store = EvolutionStore(str(tmp_path / "store"))
+    assert store.aois() == []
+    assert store.existing_dates("a") == set()
+    assert store.read_table().num_rows == 0
+    assert store.read_dataframe().empty
+    evol_matrix, dates = store.read_matrix("a")
+    assert evol_matrix.shape == (0, 0) and dates == []
+
+
+def test_append_only_new_dates(tmp_path):
+    store = EvolutionStore(str(tmp_path / "store"))
+    assert store.append("a", matrix(2), DATES[:2]) == 14
+    assert store.append("a", matrix(2), DATES[:2]) == 0
+    assert n_files(store, "a") == 1
+
+    evol_matrix = np.vstack([matrix(2), matrix(1, 100)])
+    assert store.append("a", evol_matrix, DATES) == 7
+    assert n_files(store, "a") == 2
+    read_matrix, dates = store.read_matrix("a")
+    np.testing.assert_array_equal(read_matrix, evol_matrix)
+    assert dates == DATES
+
+    store.compact("a")
+    assert n_files(store, "a") == 1
+    np.testing.assert_array_equal(store.read_matrix("a")[0], evol_matrix)
+
+
+def test_changed_date_rewrites_partition(tmp_path):
+    store = EvolutionStore(str(tmp_path / "store"))
+    store.append("a", matrix(2), DATES[:2])
+    store.append("a", matrix(1, 100), DATES[2:])
+    store.append("b", matrix(1), DATES[:1])
+
+    # Labels régénérés : la 2e date change, une 4e date apparaît
+    evol_matrix = np.vstack([matrix(1), matrix(1, 50), matrix(1, 100), matrix(1, 200)])
+    dates = DATES + ["2020-01-04"]
+    assert store.append("a", evol_matrix, dates) == 14
+    assert n_files(store, "a") == 1
+    read_matrix, read_dates = store.read_matrix("a")
+    np.testing.assert_array_equal(read_matrix, evol_matrix)
+    assert read_dates == dates
+
+    # Les autres AOI ne sont pas touchées
+    np.testing.assert_array_equal(store.read_matrix("b")[0], matrix(1))
+    assert store.aois() == ["a", "b"]
+    assert store.read_table(["a"]).num_rows == 28
@@ -0,0 +1,74 @@
+import os
+import threading
+import numpy as np
+import pytest
+import rasterio
+from benchmarks.synthetic import write_label_folder
+from src.dataset_pool import DatasetPool
+from src.ground_truth import GroundTruth
+from src.instrumentation import Profiler
+
+
+@pytest.fixture
+def folder(tmp_path):
+    folder = str(tmp_path / "labels")
+    write_label_folder(folder, n_dates=6, size=64)
+    return folder
+
+
+def test_prefetch_matches_sequential(folder):
+    ground_truth = GroundTruth()
+    evol_matrix, dates = ground_truth.mask_evolution(folder)
+    with Profiler() as profiler:
+        prefetched, prefetched_dates = ground_truth.mask_evolution(folder, prefetch=3, prefetch_workers=2)
+    np.testing.assert_array_equal(prefetched, evol_matrix)
+    assert prefetched_dates == dates
+
+    # Les événements des threads de lecture sont attribués au dossier traité
+    events = [event for event in profiler.events if "compute_file_evolution" in event["name"]]
+    assert len(events) == len(dates)
+    assert {event["section"] for event in events} == {folder}
+
+
+class FailingCache:
+    """Cache dont l'écriture échoue : l'erreur survient dans la boucle de `mask_evolution`."""
+
+    def get(self, tif_path):
+        return None
+
+    def put(self, tif_path, vector):
+        raise OSError("disque plein")
+
+
+def test_prefetch_error_stops_loader(folder):
+    threads = threading.active_count()
+    with pytest.raises(OSError, match="disque plein") as excinfo:
+        GroundTruth().mask_evolution(folder, cache=FailingCache(), prefetch=3, prefetch_workers=2)
+    # Les lectures anticipées sont annulées et les threads arrêtés avant la remontée de l'erreur,
+    # même si la trace de l'exception (qui référence le chargeur) est conservée
+    assert threading.active_count() == threads
+    assert excinfo.traceback
+
+
+def test_prefetch_file_error(folder):
+    with open(os.path.join(folder, "labels_2020_01_00.tif"), "wb") as f:
+        f.write(b"pas un raster")
+    threads = threading.active_count()
+    with pytest.raises(rasterio.errors.RasterioIOError) as excinfo:
+        GroundTruth().mask_evolution(folder, prefetch=3, prefetch_workers=2)
+    assert threading.active_count() == threads
+    assert excinfo.traceback
+
+
+def test_pool_reused_across_passes(folder):
+    ground_truth = GroundTruth()
+    expected, _ = ground_truth.mask_evolution(folder)
+    with DatasetPool() as pool:
+        for _ in range(2):
+            evol_matrix, _ = ground_truth.mask_evolution(folder, pool=pool)
+            np.testing.assert_array_equal(evol_matrix, expected)
+        results, _ = ground_truth.batch_mask_evolution([folder], max_workers=1, pool=pool)
+        np.testing.assert_array_equal(results[folder]["evol_matrix"], expected)
+        # Chaque fichier n'est ouvert qu'à la première passe
+        assert pool.get_stats()["misses"] == len(expected)
+        assert pool.get_stats()["hits"] == 2 * len(expected)
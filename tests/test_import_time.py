@@ -0,0 +1,50 @@
+import os
+import subprocess
+import sys
+from benchmarks import import_time
+from benchmarks.synthetic import write_image, write_label_folder
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Calculs courants, exécutés dans un interpréteur neuf : aucune bibliothèque lourde ne doit être chargée
+COMPUTE_SCRIPT = """
+import sys
+from src.classes_reader import ClassesReader
+from src.ground_truth import GroundTruth
+from src.sat_image_reader import SatImageReader
+
+image_path, label_folder, label_path = sys.argv[1:]
+with SatImageReader(image_path) as reader:
+    reader.calculate_ndvi()
+GroundTruth().mask_evolution(label_folder)
+with ClassesReader(label_path) as reader:
+    reader.detect_classes()
+print(",".join(sorted(name for name in {forbidden!r} if name in sys.modules)))
+"""
+
+
+def test_import_budget(monkeypatch):
+    """Les modules de calcul s'importent dans le budget, sans matplotlib, pandas, geopandas ni pyarrow."""
+    monkeypatch.chdir(ROOT)
+    assert import_time.check(budget=0.5, repeat=1) == []
+
+
+def test_compute_paths_skip_heavy_imports(tmp_path):
+    image_path = write_image(str(tmp_path / "img_2020_01_01.tif"), size=256)
+    label_paths = write_label_folder(str(tmp_path / "labels"), n_dates=2, size=256)
+
+    completed = subprocess.run(
+        [
+            sys.executable,
+            "-c",
+            COMPUTE_SCRIPT.format(forbidden=import_time.FORBIDDEN),
+            image_path,
+            str(tmp_path / "labels"),
+            label_paths[0],
+        ],
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    assert completed.stdout.strip() == ""
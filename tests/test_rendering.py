@@ -0,0 +1,29 @@
+import os
+import pytest
+from benchmarks.synthetic import write_image
+from src.rendering import batch_quicklooks
+
+
+def write_scene(folder):
+    os.makedirs(folder, exist_ok=True)
+    return write_image(os.path.join(folder, "scene_2020_01_01.tif"), size=64)
+
+
+def test_quicklooks_named_by_aoi(tmp_path):
+    """Deux AOI aux fichiers de même nom donnent deux aperçus distincts."""
+    paths = [write_scene(tmp_path / aoi) for aoi in ("1311_3077_13_10N", "2235_3403_13-17N")]
+    results = batch_quicklooks(paths, str(tmp_path / "png"), target_size=32, max_workers=1)
+    assert sorted(os.listdir(tmp_path / "png")) == [
+        "1311_3077_13_10N_scene_2020_01_01.png",
+        "2235_3403_13-17N_scene_2020_01_01.png",
+    ]
+    assert all(isinstance(result, str) for result in results.values())
+
+
+def test_quicklook_collision(tmp_path):
+    """Deux dossiers d'une même AOI aux fichiers de même nom : erreur avant toute écriture."""
+    folder = tmp_path / "1311_3077_13_10N"
+    paths = [write_scene(folder), write_scene(folder / "leaf")]
+    with pytest.raises(ValueError, match="conflit"):
+        batch_quicklooks(paths, str(tmp_path / "png"), max_workers=1)
+    assert not os.path.exists(tmp_path / "png")
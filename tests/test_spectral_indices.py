@@ -0,0 +1,25 @@
+import numpy as np
+import pytest
+import rasterio
+from benchmarks.synthetic import write_image
+from src.spectral_indices import SpectralIndexEngine
+
+
+@pytest.fixture
+def dataset(tmp_path):
+    with rasterio.open(write_image(str(tmp_path / "img.tif"), size=64)) as src:
+        yield src
+
+
+def test_ndvi(dataset):
+    red = dataset.read(3).astype(np.float32)
+    nir = dataset.read(4).astype(np.float32)
+    ndvi = SpectralIndexEngine(dataset).compute(["ndvi"])["ndvi"]
+    np.testing.assert_allclose(ndvi, (nir - red) / (nir + red), rtol=1e-6)
+
+
+@pytest.mark.parametrize("band_map", [{"red": 3, "nir": 4}, {"green": 0, "red": 3, "nir": 4}, {"green": 5, "nir": 4}])
+def test_missing_band(dataset, band_map):
+    """Bande absente de band_map ou hors du raster : erreur explicite avant toute lecture."""
+    with pytest.raises(ValueError, match="green"):
+        SpectralIndexEngine(dataset, band_map=band_map).compute(["ndwi"])
@@ -0,0 +1,83 @@
+import itertools
+import os
+import numpy as np
+import pytest
+from src import stats_cache
+from src.stats_cache import StatsCache
+
+
+@pytest.fixture
+def files(tmp_path):
+    paths = []
+    for i in range(4):
+        path = tmp_path / f"lab_{i}.tif"
+        path.write_bytes(b"x" * 10)
+        paths.append(str(path))
+    return paths
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Horloge strictement croissante : ordre LRU déterministe."""
+    ticks = itertools.count(1)
+    monkeypatch.setattr(stats_cache.time, "time", lambda: float(next(ticks)))
+
+
+def vector(i):
+    return np.full(7, float(i))
+
+
+def test_hit_and_persistence(tmp_path, files):
+    db_path = str(tmp_path / "cache.sqlite")
+    with StatsCache(db_path) as cache:
+        assert cache.get(files[0]) is None
+        cache.put(files[0], vector(1))
+    with StatsCache(db_path) as cache:
+        np.testing.assert_array_equal(cache.get(files[0]), vector(1))
+        assert cache.get_stats()["hits"] == 1
+
+
+def test_invalidation_on_mtime_or_size(tmp_path, files):
+    with StatsCache(str(tmp_path / "cache.sqlite")) as cache:
+        for i, path in enumerate(files[:2]):
+            cache.put(path, vector(i))
+        stat = os.stat(files[0])
+        os.utime(files[0], ns=(stat.st_atime_ns, stat.st_mtime_ns + 1))
+        with open(files[1], "ab") as f:
+            f.write(b"y")
+        assert cache.get(files[0]) is None
+        assert cache.get(files[1]) is None
+        stats = cache.get_stats()
+        assert stats["invalidations"] == 2 and stats["entries"] == 0
+
+
+def test_lru_eviction(tmp_path, files, clock):
+    with StatsCache(str(tmp_path / "cache.sqlite"), max_entries=2) as cache:
+        for i, path in enumerate(files[:3]):
+            cache.put(path, vector(i))
+        cache.get(files[0])  # files[1] devient le moins récemment utilisé
+        cache.commit()
+        assert cache.get_stats()["evictions"] == 1
+        assert cache.get(files[1]) is None
+        np.testing.assert_array_equal(cache.get(files[0]), vector(0))
+        np.testing.assert_array_equal(cache.get(files[2]), vector(2))
+
+
+def test_version_change_clears_cache(tmp_path, files):
+    db_path = str(tmp_path / "cache.sqlite")
+    with StatsCache(db_path, version=1) as cache:
+        cache.put(files[0], vector(1))
+    with StatsCache(db_path, version=1) as cache:
+        assert cache.get(files[0]) is not None
+    with StatsCache(db_path, version=2) as cache:
+        assert cache.get(files[0]) is None
+        assert cache.get_stats()["entries"] == 0
+
+
+def test_prune_missing(tmp_path, files):
+    with StatsCache(str(tmp_path / "cache.sqlite")) as cache:
+        for i, path in enumerate(files[:2]):
+            cache.put(path, vector(i))
+        os.remove(files[0])
+        assert cache.prune_missing() == 1
+        assert cache.get_stats()["entries"] == 1
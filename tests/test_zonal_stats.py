@@ -0,0 +1,79 @@
+import geopandas as gpd
+import numpy as np
+import pytest
+import rasterio
+from rasterio.features import geometry_mask
+from shapely.geometry import box
+from benchmarks.synthetic import CRS, write_image, write_labels
+from src.classes_reader import ClassesReader
+from src.sat_image_reader import SatImageReader, ndvi_from_bands
+from src.zonal_stats import ZonalStats
+
+SIZE = 96
+
+
+@pytest.fixture
+def rasters(tmp_path):
+    """Image (un coin sans donnée : rouge = infrarouge = 0) et labels sur la même grille."""
+    image_path = write_image(str(tmp_path / "img.tif"), size=SIZE, tiled=False)
+    with rasterio.open(image_path, "r+") as dst:
+        data = dst.read()
+        data[2:4, :20, :20] = 0
+        dst.write(data)
+    labels_path = write_labels(str(tmp_path / "labels.tif"), size=SIZE, tiled=False)
+    with SatImageReader(image_path) as image_reader, ClassesReader(labels_path) as classes_reader:
+        yield image_reader, classes_reader
+
+
+def polygons(dataset):
+    left, bottom, right, top = dataset.bounds
+    step = (right - left) / 4
+    geometries = [
+        box(left, top - 2 * step, left + 2 * step, top),  # Recouvre le coin sans donnée
+        box(left + step, bottom, right, top - step),
+        box(left + 0.1 * step, top - 0.1 * step, left + 0.2 * step, top),  # Seulement des pixels sans donnée
+        box(right + step, top, right + 2 * step, top + step),  # Hors du raster
+    ]
+    return gpd.GeoDataFrame({"pid": ["a", "b", "c", "d"]}, geometry=geometries, crs=CRS)
+
+
+def test_matches_brute_force(rasters):
+    image_reader, classes_reader = rasters
+    gdf = polygons(image_reader.image)
+    zonal = ZonalStats(gdf, image_reader.image, id_column="pid")
+    results = zonal.compute(classes_reader, image_reader)
+
+    image = image_reader.image.read()
+    ndvi = ndvi_from_bands(image[2], image[3]).astype(np.float64)
+    valid = (image[2].astype(np.float64) + image[3]) != 0
+    index = classes_reader.read_class_index()
+    for k, geometry in enumerate(gdf.geometry):
+        # Les polygones suivants l'emportent sur les recouvrements
+        inside = ~geometry_mask([geometry], (SIZE, SIZE), image_reader.image.transform)
+        for later in gdf.geometry[k + 1:]:
+            inside &= geometry_mask([later], (SIZE, SIZE), image_reader.image.transform)
+        assert results["pixels"][k] == inside.sum()
+        if inside.any():
+            expected = [(index[inside] == c).mean() * 100 for c in range(1, 8)]
+            np.testing.assert_allclose(results["coverage"][k], expected)
+        else:
+            assert np.isnan(results["coverage"][k]).all()
+        values = ndvi[inside & valid]
+        assert results["ndvi_count"][k] == values.size
+        if values.size:
+            assert results["ndvi_mean"][k] == pytest.approx(values.mean(), abs=1e-12)
+            assert results["ndvi_std"][k] == pytest.approx(values.std(), abs=1e-12)
+        else:
+            assert np.isnan(results["ndvi_mean"][k]) and np.isnan(results["ndvi_std"][k])
+
+    assert results["ndvi_count"][2] == 0 and results["pixels"][2] > 0
+    assert results["pixels"][3] == 0
+    assert list(zonal.to_dataframe(results).index) == ["a", "b", "c", "d"]
+
+
+def test_misaligned_raster(rasters, tmp_path):
+    image_reader, _ = rasters
+    zonal = ZonalStats(polygons(image_reader.image), image_reader.image)
+    with SatImageReader(write_image(str(tmp_path / "other.tif"), size=SIZE // 2)) as other:
+        with pytest.raises(ValueError):
+            zonal.compute(image_reader=other)